@@ -1,13 +1,411 @@
-import pywt  # Бібліотека для виконання дискретного вейвлет-перетворення (DWT)
 import cv2  # Бібліотека для роботи з зображеннями
+import io  # Кодування .npy у байти
+import lzma  # Стиснення LZMA для надлишкових повідомлень
 import numpy as np  # Бібліотека для роботи з числовими масивами
+import os  # Кількість ядер процесора
 import reedsolo  # Бібліотека для кодування та декодування Reed-Solomon
+import struct  # Пакування заголовка повідомлення
+import warnings  # Попередження про формати з втратами
+import zlib  # Контрольна сума заголовка та стиснення повідомлення
+from concurrent.futures import ThreadPoolExecutor  # Паралельна обробка каналів R, G, B
+
+from DWT_fec import Fec  # Табличний кодек Reed-Solomon з кешуванням
+from DWT_haar import Haar  # Швидке Хаар-перетворення лише для LL
+from DWT_layout import Layout  # Розкладка даних за площинами й підсмугами (заголовок версії 3)
+from DWT_stats import NULL_STATS  # Вимкнена інструментація за замовчуванням
 
 class DWT:
+    DECODE_WINDOW = 256  # Початковий розмір вікна читання (у байтах)
+    MAX_STOP_CANDIDATES = 16  # Скільки нульових байтів перевіряти як можливий стоп-байт
+
+    # Заголовок у перших коефіцієнтах кожного каналу: сигнатура, версія формату, далі поля версії
+    HEADER_MAGIC = b'DW'
+    HEADER_VERSION = 2
+    HEADER_PREFIX = struct.Struct('>2sB')  # сигнатура, версія
+    HEADER_FORMATS = {
+        1: struct.Struct('>2sBBIH'),  # сигнатура, версія, кількість перевірочних байтів RS, довжина даних, CRC16
+        2: struct.Struct('>2sBBBIH'),  # ... те саме + прапорці повідомлення (FLAG_*) після nsym
+        3: struct.Struct('>2sBBBBBIH'),  # ... те саме + маски площин і підсмуг (DWT_layout) після прапорців
+    }
+    LAYOUT_HEADER_VERSION = 3  # Версія заголовка для розкладки, відмінної від бітів 3-4 LL
+    TEXT_ENCODINGS = {1: 'latin-1', 2: 'utf-8', 3: 'utf-8'}  # Кодування тексту за версією заголовка
+
+    # Прапорці повідомлення (заголовок версії 2)
+    FLAG_BINARY = 0x01  # Довільні байти, а не текст
+    FLAG_ZLIB = 0x02  # Повідомлення стиснене zlib
+    FLAG_LZMA = 0x04  # Повідомлення стиснене LZMA (сирий потік LZMA2)
+    COMPRESSION_FLAGS = {"zlib": FLAG_ZLIB, "lzma": FLAG_LZMA}
+    LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 6}]
+    DEFAULT_COMPRESSION = "auto"  # "auto", "zlib", "lzma" або None
+    DEFAULT_NSYM = 20  # Кількість перевірочних байтів Reed-Solomon
+    RGB_CHANNELS = (2, 1, 0)  # Індекси каналів R, G, B у BGR-зображенні cv2
+    CHANNEL_NAMES = ("R", "G", "B")
+    CHANNEL_WORKERS = min(3, os.cpu_count() or 1)  # Потоків для каналів за замовчуванням (1 - послідовно)
+    EMBED_CHUNK = 1 << 16  # Коефіцієнтів за раз у embed_sums та extract_bytes
+    DECODE_STAGES = 4  # Етапів decode_channel на канал: header, forward_ll, extract, rs_decode
+
+    # Формати результату без втрат; решта (JPEG, AVIF, ...) зруйнує повідомлення
+    LOSSLESS_FORMATS = (".png", ".bmp", ".dib", ".tif", ".tiff", ".webp", ".ppm", ".pnm", ".npy")
+    PNG_STRATEGIES = {"default": cv2.IMWRITE_PNG_STRATEGY_DEFAULT, "filtered": cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+                      "huffman": cv2.IMWRITE_PNG_STRATEGY_HUFFMAN_ONLY, "rle": cv2.IMWRITE_PNG_STRATEGY_RLE,
+                      "fixed": cv2.IMWRITE_PNG_STRATEGY_FIXED}
+    TIFF_COMPRESSIONS = {"none": 1, "lzw": 5, "deflate": 8, "packbits": 32773}  # Коди стиснення TIFF
+    WEBP_LOSSLESS_QUALITY = 101  # Якість понад 100 вмикає у cv2 WebP без втрат
+    _executors = {}  # Спільні пули потоків за кількістю потоків
+
+    @staticmethod
+    def bits_to_symbols(binary_message):
+        """
+        Перетворює двійковий рядок у масив 2-бітних символів.
+
+        :param binary_message: Рядок з '0' та '1'.
+        :return: Масив np.uint8 зі значеннями 0..3 (неповна остання пара відкидається).
+        """
+        bits = np.frombuffer(binary_message.encode('ascii'), dtype=np.uint8) - ord('0')
+        if np.any(bits > 1):
+            raise ValueError("Двійкове повідомлення може містити лише '0' та '1'.")
+        bits = bits[:len(bits) - len(bits) % 2]  # Якщо залишилося менше 2 бітів, відкидаємо
+        return (bits[0::2] << 1) | bits[1::2]
+
+    @staticmethod
+    def bytes_to_symbols(data):
+        """
+        Перетворює байти у масив 2-бітних символів (старші біти першими).
+
+        :param data: bytes або масив np.uint8.
+        :return: Масив np.uint8 зі значеннями 0..3, по 4 символи на байт.
+        """
+        data = np.frombuffer(bytes(data), dtype=np.uint8)
+        symbols = np.empty(len(data) * 4, dtype=np.uint8)
+        for position in range(4):
+            np.right_shift(data, 6 - 2 * position, out=symbols[position::4])
+        symbols &= 0b11
+        return symbols
+
+    @staticmethod
+    def rs_encoded_length(length, nsym):
+        """
+        Обчислює довжину даних після кодування Reed-Solomon.
+
+        :param length: Довжина вихідних даних у байтах.
+        :param nsym: Кількість перевірочних байтів на блок (блок - 255 байтів).
+        :return: Довжина закодованих даних у байтах.
+        """
+        chunk = 255 - nsym
+        return length + -(-length // chunk) * nsym
+
+    @staticmethod
+    def rs_capacity(available, nsym):
+        """
+        Обчислює, скільки байтів даних вміщують available байтів після кодування Reed-Solomon.
+
+        :param available: Кількість байтів, які можна записати.
+        :param nsym: Кількість перевірочних байтів на блок.
+        :return: Максимальна довжина даних у байтах.
+        """
+        if available <= nsym:
+            return 0
+        # Кожен повний блок RS (255 байтів) несе 255 - nsym байтів даних
+        blocks, rest = divmod(available, 255)
+        return blocks * (255 - nsym) + max(rest - nsym, 0)
+
+    @staticmethod
+    def layout_first_row(ll_cols):
+        """
+        :param ll_cols: Ширина LL.
+        :return: Перший рядок блоків 2x2 з даними заголовка версії 3 (рядки вище зайняті заголовком).
+        """
+        return -(-DWT.HEADER_FORMATS[DWT.LAYOUT_HEADER_VERSION].size * 4 // ll_cols)
+
+    @staticmethod
+    def plan(shape, nsym=DEFAULT_NSYM, layout=None, length=None):
+        """
+        Планувальник місткості: скільки байтів вміщує зображення із заданою розкладкою.
+
+        Рахується наперед, лише за розміром зображення. Для розкладки за замовчуванням
+        повідомлення ділиться на рівні третини, для інших - пропорційно місткості каналів.
+
+        :param shape: Розмір зображення (висота, ширина[, канали]).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param layout: Розкладка даних (див. DWT_layout.Layout.per_channel); None - біти 3-4 LL.
+        :param length: Довжина (стисненого) повідомлення для розподілу між каналами (None - не розподіляти).
+        :return: Словник: usable_bytes (разом), channels - для R, G, B: planes, subbands, bits_per_block,
+                 raw_bytes (місце під дані з RS), usable_bytes; з length - ще fits і allocation (байтів на канал).
+        :raises ValueError: Якщо nsym поза межами 1..254 або розкладка недопустима, зокрема зсуває пікселі
+                            надто сильно (див. Layout.make).
+        """
+        nsym = Fec.check_nsym(nsym)
+        height, width = shape[:2]
+        ll_rows, ll_cols = Haar.ll_shape(shape)
+        layouts = Layout.per_channel(layout)
+        channels = []
+        for name, channel_layout in zip(DWT.CHANNEL_NAMES, layouts):
+            if Layout.is_default(channel_layout):
+                raw = ll_rows * ll_cols // 4 - DWT.HEADER_FORMATS[DWT.HEADER_VERSION].size
+            else:
+                rows = max(height // 2 - DWT.layout_first_row(ll_cols), 0)
+                raw = rows * (width // 2) * Layout.bits_per_block(channel_layout) // 8
+            channels.append({"channel": name, "planes": list(channel_layout["planes"]),
+                             "subbands": list(channel_layout["subbands"]),
+                             "bits_per_block": Layout.bits_per_block(channel_layout),
+                             "raw_bytes": max(raw, 0), "usable_bytes": DWT.rs_capacity(raw, nsym)})
+
+        if all(Layout.is_default(channel_layout) for channel_layout in layouts):
+            usable = min(channel["usable_bytes"] for channel in channels) * 3  # Рівні третини
+        else:
+            usable = sum(channel["usable_bytes"] for channel in channels)
+        result = {"shape": [height, width], "nsym": nsym, "usable_bytes": usable, "channels": channels}
+        if length is not None:
+            result["fits"] = length <= usable
+            result["allocation"] = DWT.split_payload(length, layouts, channels) if result["fits"] else None
+        return result
+
+    @staticmethod
+    def split_payload(length, layouts, channels):
+        """
+        Визначає, скільки байтів повідомлення отримує кожен канал.
+
+        :param length: Довжина (стисненого) повідомлення в байтах.
+        :param layouts: Розкладки каналів R, G, B (див. DWT_layout.Layout.per_channel).
+        :param channels: Місткість каналів (поле channels результату plan).
+        :return: Список довжин частин для R, G, B.
+        :raises ValueError: Якщо повідомлення не вміщується (для розкладки, відмінної від типової).
+        """
+        if all(Layout.is_default(channel_layout) for channel_layout in layouts):
+            part_size = -(-length // 3)  # Як і в encode_parts
+            return [min(part_size, max(length - index * part_size, 0)) for index in range(3)]
+        return Layout.allocate(length, [channel["usable_bytes"] for channel in channels])
+
+    @staticmethod
+    def capacity(shape, nsym=DEFAULT_NSYM, layout=None):
+        """
+        Обчислює, скільки байтів повідомлення вміщує зображення заданого розміру.
+
+        :param shape: Розмір зображення (висота, ширина[, канали]).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param layout: Розкладка даних (див. plan); None - біти 3-4 LL.
+        :return: Максимальна довжина повідомлення в байтах (для всіх трьох каналів разом).
+        """
+        return DWT.plan(shape, nsym, layout)["usable_bytes"]
+
+    @staticmethod
+    def pack_message(message, compression=DEFAULT_COMPRESSION):
+        """
+        Перетворює повідомлення на байти для вбудовування і за потреби стискає їх.
+
+        Текст кодується в UTF-8, bytes вбудовуються як є. У режимі "auto" стиснення
+        застосовується, лише якщо зменшує повідомлення: спочатку zlib, а для дуже
+        надлишкових даних (zlib стиснув більш ніж на чверть) ще й LZMA - береться менший результат.
+
+        :param message: Рядок або bytes (bytearray, memoryview).
+        :param compression: "auto", "zlib", "lzma" або None (без стиснення).
+        :return: Кортеж (байти повідомлення, прапорці FLAG_*).
+        """
+        if isinstance(message, str):
+            payload, flags = message.encode('utf-8'), 0
+        else:
+            payload, flags = bytes(message), DWT.FLAG_BINARY
+        if not payload or compression is None:
+            return payload, flags
+        if compression not in ("auto", *DWT.COMPRESSION_FLAGS):
+            raise ValueError(f"Невідомий тип стиснення: {compression}")
+
+        candidates = []
+        if compression in ("auto", "zlib"):
+            candidates.append((zlib.compress(payload, 9), DWT.FLAG_ZLIB))
+        if compression == "lzma" or (compression == "auto" and len(candidates[0][0]) < len(payload) * 3 // 4):
+            candidates.append((lzma.compress(payload, lzma.FORMAT_RAW, filters=DWT.LZMA_FILTERS), DWT.FLAG_LZMA))
+        compressed, compression_flag = min(candidates, key=lambda candidate: len(candidate[0]))
+        if compression == "auto" and len(compressed) >= len(payload):
+            return payload, flags
+        return compressed, flags | compression_flag
+
+    @staticmethod
+    def unpack_message(data, header):
+        """
+        Відновлює повідомлення з байтів, зібраних з усіх каналів.
+
+        :param data: Байти повідомлення (після Reed-Solomon).
+        :param header: Заголовок першого каналу (None - старий формат зі стоп-байтом).
+        :return: Рядок або bytes (якщо вбудовувалися довільні байти).
+        """
+        version = header["version"] if header else 1
+        flags = header["flags"] if header else 0
+        try:
+            if flags & DWT.FLAG_ZLIB:
+                data = zlib.decompress(data)
+            elif flags & DWT.FLAG_LZMA:
+                data = lzma.decompress(data, lzma.FORMAT_RAW, filters=DWT.LZMA_FILTERS)
+        except (zlib.error, lzma.LZMAError):
+            print("\033[91mПомилка розпакування повідомлення! Дані пошкоджені\033[0m")
+            return b"" if flags & DWT.FLAG_BINARY else ""
+        if flags & DWT.FLAG_BINARY:
+            return bytes(data)
+        return bytes(data).decode(DWT.TEXT_ENCODINGS[version], errors='replace')
+
+    @staticmethod
+    def join_parts(parts):
+        """
+        Збирає повідомлення з частин, декодованих з окремих каналів.
+
+        :param parts: Список кортежів (байти, заголовок) у порядку каналів R, G, B.
+        :return: Рядок або bytes.
+        """
+        header = next((header for _, header in parts if header is not None), None)
+        return DWT.unpack_message(b"".join(data for data, _ in parts), header)
+
+    @staticmethod
+    def pack_header(length, nsym, flags=0, layout=None):
+        """
+        Пакує заголовок каналу: версії 2 для розкладки за замовчуванням, версії 3 - для інших.
+
+        :param length: Довжина даних каналу (до кодування Reed-Solomon) у байтах.
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param flags: Прапорці повідомлення (FLAG_*).
+        :param layout: Розкладка даних каналу (див. DWT_layout.Layout.make); None - біти 3-4 LL.
+        :return: Байти заголовка.
+        :raises ValueError: Якщо nsym поза межами 1..254 (див. Fec.check_nsym).
+        """
+        nsym = Fec.check_nsym(nsym)
+        if layout is None or Layout.is_default(layout):
+            version, fields = DWT.HEADER_VERSION, (nsym, flags)
+        else:
+            version, fields = DWT.LAYOUT_HEADER_VERSION, (nsym, flags, *Layout.to_masks(layout))
+        body = DWT.HEADER_FORMATS[version].pack(DWT.HEADER_MAGIC, version, *fields, length, 0)[:-2]
+        return body + struct.pack('>H', zlib.crc32(body) & 0xFFFF)
+
+    @staticmethod
+    def read_header(matrix_coeff):
+        """
+        Читає заголовок каналу з перших коефіцієнтів DWT.
+
+        :param matrix_coeff: Матриця коефіцієнтів DWT.
+        :return: Словник з полями заголовка (version, nsym, flags, length, size, layout) або None,
+                 якщо заголовка немає (наприклад, старе зображення зі стоп-байтом).
+        """
+        prefix = DWT.extract_bytes(matrix_coeff, 0, DWT.HEADER_PREFIX.size).tobytes()
+        if len(prefix) < DWT.HEADER_PREFIX.size:
+            return None
+        magic, version = DWT.HEADER_PREFIX.unpack(prefix)
+        header_format = DWT.HEADER_FORMATS.get(version)
+        if magic != DWT.HEADER_MAGIC or header_format is None:
+            return None
+
+        raw = DWT.extract_bytes(matrix_coeff, 0, header_format.size).tobytes()
+        if len(raw) < header_format.size:
+            return None
+        fields = header_format.unpack(raw)
+        if zlib.crc32(raw[:-2]) & 0xFFFF != fields[-1]:
+            return None
+        nsym, length = fields[2], fields[-2]
+        if nsym not in Fec.NSYM_RANGE:
+            return None
+        flags = fields[3] if version >= 2 else 0
+        layout = Layout.from_masks(*fields[4:6]) if version >= 3 else Layout.make()
+        if layout is None:
+            return None
+        return {"version": version, "nsym": nsym, "flags": flags, "length": length, "size": header_format.size,
+                "layout": layout}
+
+    @staticmethod
+    def embed_symbols(values, symbols):
+        """
+        Записує 2-бітні символи у 4-й та 5-й біти цілої частини коефіцієнтів (векторизовано).
+
+        :param values: Одновимірний масив коефіцієнтів DWT (не змінюється).
+        :param symbols: Масив 2-бітних символів тієї ж довжини.
+        :return: Новий масив коефіцієнтів з вбудованими символами.
+        """
+        bit_pairs = np.asarray(symbols).astype(np.int64)
+
+        whole_part = np.trunc(values).astype(np.int64)  # Беремо цілу частину
+        decimal_part = values - whole_part  # Виділяємо дробову частину
+
+        # Змінюємо 4-5 біти для всіх коефіцієнтів одночасно
+        new_value = (whole_part & ~0b11000) | (bit_pairs << 3)
+        written = new_value + decimal_part
+
+        # Перевірка чи записи відбулись правильно (для всього масиву одразу)
+        stored_bits = (np.trunc(written).astype(np.int64) & 0b11000) >> 3
+        errors = np.flatnonzero(stored_bits != bit_pairs)
+        if errors.size:
+            print(f"Помилка запису в {errors.size} коефіцієнтах, застосовуємо корекцію")
+
+            # Корекція (відкидаємо дробову частину, як і поелементна версія)
+            corrected = np.trunc(written[errors]).astype(np.int64) & ~0b11000
+            corrected |= bit_pairs[errors] << 3
+            written[errors] = corrected
+
+            stored_after_correction = (np.trunc(written[errors]).astype(np.int64) & 0b11000) >> 3
+            failed = np.count_nonzero(stored_after_correction != bit_pairs[errors])
+            if failed:
+                print(f"Корекція не вдалася в {failed} коефіцієнтах!")
+
+        return written
+
+    @staticmethod
+    def embed_sums(sums, symbols, out=None):
+        """
+        Цілочисельне вбудовування 2-бітних символів у LL, задану сумами блоків (див. Haar.forward_sums).
+
+        LL = sums / 2 невід'ємна, тож ціла частина LL - це sums >> 1, а дробова (0 або 0.5)
+        не змінюється. Запис у 4-й та 5-й біти завжди точний, тому перевірка та корекція
+        float-версії (embed_symbols) тут не потрібні; результат збігається з нею.
+
+        :param sums: Масив uint16 сум блоків (перші рядки LL).
+        :param symbols: Масив 2-бітних символів (row-major порядок у LL).
+        :param out: Масив int16 розміром sums.shape для результату (None - новий); може бути
+                    видом на sums (sums.view(np.int16)) - тоді зміна записується на місці сум.
+        :return: Масив int16 - зміна LL для Haar.apply_ll_delta (нулі після останнього символу).
+        """
+        count = len(symbols)
+        if count > sums.size:
+            raise ValueError(f"Індекс ({sums.shape[0]}, 0) виходить за межі матриці.")
+        delta = np.empty(sums.shape, dtype=np.int16) if out is None else out
+
+        # Частинами, щоб тимчасові масиви не залежали від розміру зображення
+        flat_sums, flat_delta = sums.reshape(-1), delta.reshape(-1)
+        for start in range(0, count, DWT.EMBED_CHUNK):
+            stop = min(start + DWT.EMBED_CHUNK, count)
+            whole_part = flat_sums[start:stop] >> 1  # Ціла частина LL
+            new_value = whole_part & ~np.uint16(0b11000)
+            new_value |= symbols[start:stop].astype(np.uint16) << 3
+            np.subtract(new_value, whole_part, out=flat_delta[start:stop], dtype=np.int16, casting='unsafe')
+        flat_delta[count:] = 0
+        return delta
+
     @staticmethod
     def embed_bits_with_rs(matrix_coeff, binary_message):
         """
-        Вбудовує двійкове повідомлення у коефіцієнти DWT.
+        Вбудовує двійкове повідомлення у коефіцієнти DWT (векторизовано).
+
+        Результат збігається з embed_bits_with_rs_scalar, але всі коефіцієнти
+        змінюються однією операцією над масивом.
+
+        :param matrix_coeff: Матриця коефіцієнтів DWT (наприклад, HH_r).
+        :param binary_message: Двійкове повідомлення (рядок) або масив 2-бітних символів.
+        """
+        if isinstance(binary_message, str):
+            symbols = DWT.bits_to_symbols(binary_message)
+        else:
+            symbols = np.asarray(binary_message, dtype=np.uint8)
+
+        rows, cols = matrix_coeff.shape
+        count = len(symbols)
+        if count > rows * cols:
+            raise ValueError(f"Індекс ({rows}, 0) виходить за межі матриці.")
+        if count == 0:
+            return
+
+        # Перші count коефіцієнтів у row-major порядку, як і в поелементній версії
+        target = matrix_coeff.reshape(-1)[:count]
+        matrix_coeff.flat[:count] = DWT.embed_symbols(target, symbols)
+
+    @staticmethod
+    def embed_bits_with_rs_scalar(matrix_coeff, binary_message):
+        """
+        Еталонна (поелементна) версія вбудовування двійкового повідомлення у коефіцієнти DWT.
+        Залишена для перевірки векторизованого шляху embed_bits_with_rs.
         
         :param matrix_coeff: Матриця коефіцієнтів DWT (наприклад, HH_r).
         :param binary_message: Двійкове повідомлення, яке потрібно вбудувати.
@@ -49,146 +447,914 @@ class DWT:
                     print(f"Корекція не вдалася в ({row}, {col})! Очікувалося {bit_pair}, отримано {stored_bits_after_correction}")
 
     @staticmethod
-    def decode_message_with_rs(matrix_coeff):
+    def extract_symbols(matrix_coeff, start=0, count=None):
         """
-        Вилучає повідомлення з коефіцієнтів DWT.
-        
-        :param matrix_coeff: Матриця коефіцієнтів DWT (наприклад, HH_r).
-        :return: Декодоване повідомлення.
+        Витягує 2-бітні символи (4-й та 5-й біти цілої частини) з коефіцієнтів DWT.
+
+        :param matrix_coeff: Матриця коефіцієнтів DWT.
+        :param start: Індекс першого коефіцієнта (row-major).
+        :param count: Кількість коефіцієнтів (None - до кінця матриці).
+        :return: Масив np.uint8 зі значеннями 0..3.
         """
-        rows, cols = matrix_coeff.shape
-        binary_result = ""
-        decoded_message = ""
+        flat = matrix_coeff.reshape(-1)
+        stop = flat.size if count is None else min(flat.size, start + count)
+        if flat.dtype == np.uint16:
+            whole_part = flat[start:stop] >> 4  # Суми блоків (Haar.forward_sums): ціла частина LL = сума >> 1
+        else:
+            whole_part = flat[start:stop].astype(np.int32)  # Беремо цілу частину (відкидання дробової, як np.trunc)
+            whole_part >>= 3
+        whole_part &= 0b11
+        return whole_part.astype(np.uint8)
 
-        for row in range(rows):
-            for col in range(cols):
-                whole_part = int(matrix_coeff[row][col])  # Беремо цілу частину
-                # Витягуємо 4-й та 5-й біти (маска 0b11000 і зсув на 3 біти вправо)
-                two_bits = (whole_part & 0b11000) >> 3
-                binary_result += format(two_bits, '02b')  # Додаємо біти як рядок
+    @staticmethod
+    def symbols_to_bytes(symbols):
+        """
+        Пакує 2-бітні символи у байти (старші біти першими).
 
-                while len(binary_result) >= 8:
-                    byte = binary_result[:8]  # Беремо перші 8 бітів
-                    binary_result = binary_result[8:]  # Обрізаємо ці 8 бітів
+        :param symbols: Масив 2-бітних символів; неповний останній байт відкидається.
+        :return: Масив np.uint8.
+        """
+        symbols = np.asarray(symbols[:len(symbols) - len(symbols) % 4], dtype=np.uint8)
+        data = symbols[0::4] << 6
+        for position in range(1, 4):
+            data |= symbols[position::4] << (6 - 2 * position)
+        return data
 
-                    if byte == '00000000':  
-                        return decoded_message  # Зупиняємо функцію при стоп-байті
+    @staticmethod
+    def extract_bytes(matrix_coeff, start=0, count=None):
+        """
+        Витягує байти повідомлення з коефіцієнтів DWT (4 коефіцієнти на байт).
 
-                    decimal_value = int(byte, 2)  # Конвертуємо біти в десяткове число
-                    decoded_message += chr(decimal_value)  # Додаємо символ до результату
+        :param matrix_coeff: Матриця коефіцієнтів DWT або сум блоків uint16 (Haar.forward_sums).
+        :param start: Індекс першого байта.
+        :param count: Кількість байтів (None - до кінця матриці).
+        :return: Масив np.uint8.
+        """
+        available = max(matrix_coeff.size // 4 - start, 0)
+        count = available if count is None else min(count, available)
+        data = np.empty(count, dtype=np.uint8)
+        # Частинами, щоб тимчасові масиви не залежали від розміру зображення
+        chunk = DWT.EMBED_CHUNK // 4
+        for offset in range(0, count, chunk):
+            size = min(chunk, count - offset)
+            symbols = DWT.extract_symbols(matrix_coeff, (start + offset) * 4, size * 4)
+            data[offset:offset + size] = DWT.symbols_to_bytes(symbols)
+        return data
+
+    @staticmethod
+    def read_part(matrix_coeff):
+        """
+        Вилучає байти частини повідомлення з коефіцієнтів DWT одного каналу.
+
+        Якщо канал містить заголовок, читаються рівно ті коефіцієнти, де лежать дані;
+        інакше використовується сумісний шлях зі стоп-байтом.
+
+        :param matrix_coeff: Матриця коефіцієнтів DWT (наприклад, LL_r).
+        :return: Кортеж (байти частини, заголовок або None для старого формату).
+        :raises ValueError: Якщо дані записано в розкладці версії 3 (їх читає decode_channel з пікселів каналу).
+        """
+        header = DWT.read_header(matrix_coeff)
+        if header is None:
+            return DWT.decode_legacy_message_with_rs(matrix_coeff).encode('latin-1'), None
+
+        if header["length"] == 0:
+            return b"", header
+        if not Layout.is_default(header["layout"]):
+            raise ValueError("Дані записано в розкладці версії 3: вони читаються з пікселів каналу "
+                             "(decode_array, decode_channel), а не з коефіцієнтів LL.")
+        encoded_length = DWT.rs_encoded_length(header["length"], header["nsym"])
+        data = DWT.extract_bytes(matrix_coeff, header["size"], encoded_length)
+        if len(data) < encoded_length:
+            print("\033[91mЗаголовок вказує на більше даних, ніж вміщує канал\033[0m")
+            return b"", header
+
+        return DWT.decode_payload(data, header["nsym"]), header
+
+    @staticmethod
+    def decode_matrices(matrices):
+        """
+        Вилучає повідомлення з коефіцієнтів DWT каналів R, G, B.
+
+        :param matrices: Матриці коефіцієнтів (наприклад, [LL_r, LL_g, LL_b]).
+        :return: Декодоване повідомлення (рядок або bytes).
+        :raises ValueError: Якщо дані записано в розкладці версії 3 (див. read_part).
+        """
+        return DWT.join_parts([DWT.read_part(matrix_coeff) for matrix_coeff in matrices])
+
+    @staticmethod
+    def decode_message_with_rs(matrix_coeff):
+        """
+        Вилучає повідомлення з коефіцієнтів DWT одного каналу.
+
+        Стиснене повідомлення розподілене між каналами, тому його треба
+        декодувати разом - через decode_matrices.
 
+        :param matrix_coeff: Матриця коефіцієнтів DWT (наприклад, LL_r).
+        :return: Декодоване повідомлення.
+        """
+        return DWT.decode_matrices([matrix_coeff])
+
+    @staticmethod
+    def decode_payload(data, nsym):
+        """
+        Декодує Reed-Solomon дані каналу, прочитані після заголовка.
+
+        :param data: Закодовані байти каналу (масив np.uint8 або bytes).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :return: Виправлені байти частини повідомлення (b"", якщо дані пошкоджені).
+        """
         # ---- Декодування Reed-Solomon ----
         try:
-            rs = reedsolo.RSCodec(20)  # Використовуємо той самий рівень надмірності (5 перевірочних бітів)
-            corrected_message = rs.decode(bytearray(decoded_message, 'utf-8'))
-            # Повертаємо лише оригінальне повідомлення (без перевірочних бітів)
-            return corrected_message.decode()
+            return Fec.decode(data, nsym)
         except reedsolo.ReedSolomonError:
             print("\033[91mПомилка декодування Reed-Solomon! Дані пошкоджені\033[0m")
-            return ""
+            return b""
 
     @staticmethod
-    def encode_message(image_path, message):
+    def decode_legacy_message_with_rs(matrix_coeff, nsym=DEFAULT_NSYM):
         """
-        Виконує кодування повідомлення в зображення за допомогою DWT і Reed-Solomon.
-        :param image: Зображення для вбудовування повідомлення.
-        :param message: Повідомлення для вбудовування.
+        Вилучає повідомлення зі старих зображень без заголовка (зі стоп-байтом).
+
+        Байти читаються вікнами, що подвоюються, тож час декодування залежить
+        від довжини повідомлення, а не від розміру матриці. Повідомлення разом зі
+        стоп-байтом і перевірочними байтами передається декодеру Reed-Solomon.
+
+        :param matrix_coeff: Матриця коефіцієнтів DWT (наприклад, HH_r).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :return: Декодоване повідомлення.
         """
-        image = cv2.imread(image_path)  # Завантажуємо зображення
-        if image is None:
-            raise FileNotFoundError("Зображення не знайдено!")
+        rs = Fec.codec(nsym)
+        total = matrix_coeff.size // 4
+        window = min(total, DWT.DECODE_WINDOW)
+        first_stop = None
+        tried = 0
+        while True:
+            data = DWT.extract_bytes(matrix_coeff, 0, window)
+            # Кандидати на стоп-байт, після яких вже прочитано всі перевірочні байти
+            stops = np.flatnonzero(data[:max(len(data) - nsym, 0)] == 0)
+            if first_stop is None and stops.size:
+                first_stop = int(stops[0])
+            for stop in stops[tried:DWT.MAX_STOP_CANDIDATES]:
+                tried += 1
+                try:
+                    corrected_message = rs.decode(bytearray(data[:stop + 1 + nsym]))[0]
+                except reedsolo.ReedSolomonError:
+                    continue
+                # Повертаємо лише оригінальне повідомлення (без стоп-байта та перевірочних байтів)
+                return bytes(corrected_message[:-1]).decode('latin-1')
+            if window >= total or tried >= DWT.MAX_STOP_CANDIDATES:
+                break
+            window = min(total, window * 2)
+
+        if first_stop is not None:
+            print("\033[91mПомилка декодування Reed-Solomon! Повертаємо неперевірені дані\033[0m")
+            return bytes(data[:first_stop]).decode('latin-1')
+
+        print("\033[91mПомилка декодування Reed-Solomon! Дані пошкоджені\033[0m")
+        return ""
+
+    @staticmethod
+    def map_channels(function, arguments, workers=None):
+        """
+        Виконує function для кожного каналу - послідовно або в пулі потоків.
+
+        Канали незалежні, а NumPy відпускає GIL, тож три канали обробляються одночасно.
 
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)  # Перетворення в RGB
+        :param function: Функція, що обробляє один канал.
+        :param arguments: Список кортежів аргументів (по одному на канал).
+        :param workers: Кількість потоків (None - DWT.CHANNEL_WORKERS, 1 - без потоків).
+        :return: Список результатів у порядку каналів.
+        """
+        workers = DWT.CHANNEL_WORKERS if workers is None else workers
+        if workers <= 1:
+            return [function(*args) for args in arguments]
+        executor = DWT._executors.get(workers)
+        if executor is None:
+            executor = DWT._executors.setdefault(workers, ThreadPoolExecutor(workers, "dwt-channel"))
+        return list(executor.map(lambda args: function(*args), arguments))
+
+    @staticmethod
+    def decode_channel(channel, stats=NULL_STATS, name=None):
+        """
+        Декодує частину повідомлення з одного каналу, обчислюючи лише потрібні рядки LL.
 
-        # Розділення каналів
-        R, G, B = cv2.split(image)
+        :param channel: Канал зображення (2D масив).
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param name: Назва каналу для записів stats.
+        :return: Кортеж (байти частини, заголовок або None для старого формату) - див. join_parts.
+        """
+        ll_rows, ll_cols = Haar.ll_shape(channel.shape)
 
-        # Виконання DWT для кожного каналу
-        coeffs_r = pywt.dwt2(R, 'haar')
-        coeffs_g = pywt.dwt2(G, 'haar')
-        coeffs_b = pywt.dwt2(B, 'haar')
+        # Спочатку лише рядки із заголовком, потім - рівно ті, де лежать дані
+        with stats.stage("header", name) as record:
+            header_size = max(header_format.size for header_format in DWT.HEADER_FORMATS.values())
+            LL = Haar.forward_ll(channel, rows=-(-header_size * 4 // ll_cols))
+            header = DWT.read_header(LL)
+            record["bytes"] = LL.size * 4
+            record["allocated"] = LL.nbytes
 
-        LL_r, (LH_r, HL_r, HH_r) = coeffs_r
-        LL_g, (LH_g, HL_g, HH_g) = coeffs_g
-        LL_b, (LH_b, HL_b, HH_b) = coeffs_b
+        if header is None:
+            stats.expect(-1)  # forward_ll і legacy_decode замість трьох етапів (див. DECODE_STAGES)
+            with stats.stage("forward_ll", name) as record:
+                LL = Haar.forward_ll(channel)  # Старий формат: потрібна вся підсмуга
+                record["bytes"] = channel.size
+                record["allocated"] = LL.nbytes
+            with stats.stage("legacy_decode", name) as record:
+                record["bytes"] = LL.size
+                return DWT.decode_legacy_message_with_rs(LL).encode('latin-1'), None
 
-        # Повідомлення для вбудовування
-        binary_message = ''.join(format(ord(i), '08b') for i in message)  # Перетворення в двійковий формат
-        binary_message += '00000000'  # Додаємо стоп-байт
+        if header["length"] == 0:
+            stats.expect(1 - DWT.DECODE_STAGES)
+            return b"", header
+        encoded_length = DWT.rs_encoded_length(header["length"], header["nsym"])
+        if not Layout.is_default(header["layout"]):
+            stats.expect(-1)  # Без forward_ll: дані читаються з пікселів
+            with stats.stage("extract", name) as record:
+                data = DWT.read_layout_bytes(channel, header["layout"], encoded_length)
+                record["bytes"] = encoded_length * 8 // Layout.bits_per_block(header["layout"]) * 4
+                record["allocated"] = data.nbytes
+        else:
+            with stats.stage("forward_ll", name) as record:
+                rows = -(-(header["size"] + encoded_length) * 4 // ll_cols)
+                sums = Haar.forward_sums(channel, rows,
+                                         out=Haar.buffer("sums", (min(rows, ll_rows), ll_cols), np.uint16))
+                record["bytes"] = sums.size * 4
+                record["allocated"] = sums.nbytes
+            with stats.stage("extract", name) as record:
+                data = DWT.extract_bytes(sums, header["size"], encoded_length)
+                record["bytes"] = encoded_length * 4
+                record["allocated"] = data.nbytes
+        if len(data) < encoded_length:
+            print("\033[91mЗаголовок вказує на більше даних, ніж вміщує канал\033[0m")
+            stats.expect(-1)
+            return b"", header
+        with stats.stage("rs_decode", name) as record:
+            record["bytes"] = encoded_length
+            return DWT.decode_payload(data, header["nsym"]), header
 
-        # Розділити повідомлення на три частини
-        part_size = len(binary_message) // 3
-        parts = [
-            binary_message[:part_size],
-            binary_message[part_size:2*part_size],
-            binary_message[2*part_size:]
-        ]
-        parts[0] += '00000000'
-        parts[1] += '00000000'
+    @staticmethod
+    def encode_payload(message, nsym, capacity, compression=DEFAULT_COMPRESSION):
+        """
+        Готує дані для вбудовування у вигляді 2-бітних символів (див. encode_parts).
 
-        # Кодування Ріда-Соломона для кожної частини окремо
-        rs = reedsolo.RSCodec(20)  # Використовуємо 20 перевірочних бітів
+        :param message: Повідомлення для вбудовування (рядок або bytes).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param capacity: Кількість коефіцієнтів LL в одному каналі.
+        :param compression: Стиснення повідомлення (див. pack_message).
+        :return: Список із трьох масивів 2-бітних символів (для R, G, B).
+        """
+        return [DWT.bytes_to_symbols(part) for part in DWT.encode_parts(message, nsym, capacity, compression)]
+
+    @staticmethod
+    def encode_parts(message, nsym, capacity, compression=DEFAULT_COMPRESSION):
+        """
+        Готує дані для вбудовування: ділить повідомлення на три канали,
+        кодує кожну частину Reed-Solomon і додає заголовок.
+
+        :param message: Повідомлення для вбудовування (рядок або bytes).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param capacity: Кількість коефіцієнтів LL в одному каналі.
+        :param compression: Стиснення повідомлення (див. pack_message).
+        :return: Список із трьох bytes (для R, G, B), по 4 коефіцієнти на байт.
+        """
+        # Повідомлення для вбудовування (UTF-8 або байти, за потреби стиснене)
+        payload, flags = DWT.pack_message(message, compression)
+
+        # Розділити повідомлення на три частини (по байтах)
+        part_size = -(-len(payload) // 3)
+        parts = [payload[i * part_size:(i + 1) * part_size] for i in range(3)]
+
+        # Кодування Ріда-Соломона для кожної частини окремо та додавання заголовка
         encoded_parts = []
         for part in parts:
-            # Перетворення частини в байти
-            part_bytes = int(part, 2).to_bytes((len(part) + 7) // 8, byteorder='big')
-            # Кодування Ріда-Соломона
-            encoded_part = rs.encode(part_bytes)
-            # Перетворення назад у двійковий рядок
-            encoded_binary = ''.join(format(byte, '08b') for byte in encoded_part)
-            encoded_parts.append(encoded_binary)
-
-        # Вбудовування закодованих частин у коефіцієнти HH_r, HH_g, HH_b
-        DWT.embed_bits_with_rs(LL_r, encoded_parts[0])
-        DWT.embed_bits_with_rs(LL_g, encoded_parts[1])
-        DWT.embed_bits_with_rs(LL_b, encoded_parts[2])
-
-        # Зворотнє DWT (IDWT)
-        R_rec = pywt.idwt2((LL_r, (LH_r, HL_r, HH_r)), 'haar')
-        G_rec = pywt.idwt2((LL_g, (LH_g, HL_g, HH_g)), 'haar')
-        B_rec = pywt.idwt2((LL_b, (LH_b, HL_b, HH_b)), 'haar')
-
-        # Обмеження значень та перетворення в uint8
-        R_rec = np.clip(R_rec, 0, 255).astype(np.uint8)
-        G_rec = np.clip(G_rec, 0, 255).astype(np.uint8)
-        B_rec = np.clip(B_rec, 0, 255).astype(np.uint8)
-
-        # Об'єднання каналів
-        image_rec = cv2.merge((R_rec, G_rec, B_rec))
+            encoded_part = DWT.pack_header(len(part), nsym, flags)
+            if part:
+                encoded_part += Fec.encode(part, nsym)
+            if len(encoded_part) * 4 > capacity:
+                raise ValueError(f"Повідомлення не вміщується в зображення: потрібно {len(encoded_part) * 4} "
+                                 f"коефіцієнтів на канал, доступно {capacity}.")
+            encoded_parts.append(encoded_part)
+        return encoded_parts
 
-        # Збереження зображення
-        cv2.imwrite(image_path, cv2.cvtColor(image_rec, cv2.COLOR_RGB2BGR)) # поміняти шлях для збереження фотки
+    @staticmethod
+    def encode_layout_parts(message, nsym, shape, layouts, compression=DEFAULT_COMPRESSION):
+        """
+        Готує дані для вбудовування в розкладках layouts: ділить повідомлення між каналами
+        пропорційно їхній місткості (див. plan), кодує кожну частину Reed-Solomon і пакує заголовки.
+
+        :param message: Повідомлення для вбудовування (рядок або bytes).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param shape: Розмір зображення.
+        :param layouts: Розкладки каналів R, G, B (див. DWT_layout.Layout.per_channel).
+        :param compression: Стиснення повідомлення (див. pack_message).
+        :return: Список із трьох кортежів (заголовок, дані): заголовок вбудовується як у версії 2 (embed_part),
+                 дані - у розкладку каналу (embed_layout_data); для типової розкладки дані вже в заголовку.
+        :raises ValueError: Якщо повідомлення або заголовок не вміщується.
+        """
+        payload, flags = DWT.pack_message(message, compression)
+        channels = DWT.plan(shape, nsym, layouts)["channels"]
+        sizes = DWT.split_payload(len(payload), layouts, channels)
+        ll_rows, ll_cols = Haar.ll_shape(shape)
+
+        parts, start = [], 0
+        for size, channel_layout in zip(sizes, layouts):
+            part = payload[start:start + size]
+            start += size
+            header = DWT.pack_header(size, nsym, flags, channel_layout)
+            if len(header) * 4 > ll_rows * ll_cols:  # Як і в encode_parts: заголовок пишеться в LL
+                raise ValueError(f"Повідомлення не вміщується в зображення: потрібно {len(header) * 4} "
+                                 f"коефіцієнтів на канал, доступно {ll_rows * ll_cols}.")
+            data = Fec.encode(part, nsym) if part else b""
+            parts.append((header + data, b"") if Layout.is_default(channel_layout) else (header, bytes(data)))
+        return parts
 
     @staticmethod
-    def decode_message(image_path):
+    def embed_stages(shape, encoded_part, layout):
         """
-        Виконує декодування повідомлення з зображення за допомогою DWT і Reed-Solomon.
-        
-        :param image: Зображення з вбудованим повідомленням.
-        :return: Декодоване повідомлення.
+        Рахує записи stats, які embed_part і embed_layout_data створять для одного каналу:
+        по 3 етапи (forward_ll, embed, apply_delta) на кожну смугу з Haar.BAND_ROWS рядків.
+
+        :param shape: Розмір зображення.
+        :param encoded_part: Кортеж (заголовок, дані) каналу (див. encode_layout_parts).
+        :param layout: Розкладка каналу.
+        :return: Кількість етапів (для прогресу, див. DWT_stats.Stats.expect).
+        """
+        header, data = encoded_part
+        rows = -(-len(header) * 4 // Haar.ll_shape(shape)[1])
+        bands = -(-rows // Haar.BAND_ROWS)
+        if data:
+            data_rows = -(-len(data) * 8 // (Layout.bits_per_block(layout) * (shape[1] // 2)))
+            bands += -(-data_rows // Haar.BAND_ROWS)
+        return 3 * bands
+
+    @staticmethod
+    def embed_part(channel, encoded_part, stats=NULL_STATS, name=None):
+        """
+        Вбудовує закодовану частину (див. encode_parts) у біти 3-4 перших коефіцієнтів LL каналу.
+
+        Обчислюються лише ті рядки LL, у які вбудовуються дані, смугами по Haar.BAND_ROWS рядків.
+
+        :param channel: Канал зображення (uint8), змінюється на місці.
+        :param encoded_part: Байти частини, по 4 коефіцієнти на байт.
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param name: Назва каналу для записів stats.
+        """
+        ll_cols = Haar.ll_shape(channel.shape)[1]
+        count = len(encoded_part) * 4
+        rows = -(-count // ll_cols)
+        # Смугами рядків LL: робочі буфери не залежать від розміру зображення
+        for band in range(0, rows, Haar.BAND_ROWS):
+            band_rows = min(Haar.BAND_ROWS, rows - band)
+            band_channel = channel[2 * band:]
+            with stats.stage("forward_ll", name) as record:
+                sums = Haar.forward_sums(band_channel, band_rows,
+                                         out=Haar.buffer("sums", (band_rows, ll_cols), np.uint16))
+                record["bytes"] = sums.size * 4
+                record["allocated"] = sums.nbytes
+            with stats.stage("embed", name) as record:
+                start, stop = band * ll_cols, min((band + band_rows) * ll_cols, count)
+                symbols = DWT.bytes_to_symbols(encoded_part[start // 4:-(-stop // 4)])
+                symbols = symbols[start % 4:start % 4 + stop - start]
+                delta = DWT.embed_sums(sums, symbols, out=sums.view(np.int16))  # Зміна LL замість сум, на місці
+                record["bytes"] = symbols.nbytes
+                record["allocated"] = symbols.nbytes
+            with stats.stage("apply_delta", name) as record:
+                Haar.apply_ll_delta(band_channel, delta)
+                record["bytes"] = sums.size * 4
+                record["allocated"] = Haar.band_bytes(ll_cols)  # Смуга пікселів int16 (одна позиція блоку за раз)
+
+    @staticmethod
+    def embed_layout_data(channel, data, layout, nsym, stats=NULL_STATS, name=None):
+        """
+        Вбудовує дані заголовка версії 3 у розкладку layout - з першого рядка блоків після заголовка
+        (layout_first_row), смугами по Haar.BAND_ROWS рядків блоків.
+
+        Якщо частину пікселів довелося обмежити до 0..255, дані перечитуються з каналу: помилок
+        у кожному блоці Reed-Solomon має бути не більше nsym // 2, інакше повідомлення не декодується.
+
+        :param channel: Канал зображення (uint8, можна np.memmap), змінюється на місці.
+        :param data: Закодовані Reed-Solomon байти частини.
+        :param layout: Розкладка каналу (див. DWT_layout.Layout.make).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon, з якою закодовано data.
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param name: Назва каналу для записів stats.
+        :return: Кількість змінених блоків 2x2.
+        :raises ValueError: Якщо повідомлення не вміщується або обмеження пікселів пошкодило більше,
+                            ніж виправляє Reed-Solomon.
+        """
+        height, width = channel.shape[:2]
+        cols = width // 2
+        first_row = DWT.layout_first_row(Haar.ll_shape(channel.shape)[1])
+        per_block = Layout.bits_per_block(layout)
+        count = len(data) * 8
+        rows = -(-count // (per_block * cols)) if count else 0
+        if first_row + rows > height // 2:
+            raise ValueError(f"Повідомлення не вміщується в зображення: потрібно {rows} рядків блоків на канал, "
+                             f"доступно {max(height // 2 - first_row, 0)}.")
+
+        changed = clipped = 0
+        for band in range(0, rows, Haar.BAND_ROWS):
+            band_rows = min(Haar.BAND_ROWS, rows - band)
+            band_channel = channel[2 * (first_row + band):2 * (first_row + band + band_rows)]
+            with stats.stage("forward_ll", name) as record:
+                sums = Haar.block_sums(band_channel, band_rows,
+                                       out=Haar.buffer("block_sums", (4, band_rows, cols), np.int16))
+                record["bytes"] = band_channel.size
+                record["allocated"] = sums.nbytes
+            with stats.stage("embed", name) as record:
+                start, stop = band * cols * per_block, min((band + band_rows) * cols * per_block, count)
+                bits = np.unpackbits(np.frombuffer(data[start // 8:-(-stop // 8)], dtype=np.uint8))
+                bits = bits[start % 8:start % 8 + stop - start]
+                delta = Layout.embed(sums, bits, layout)  # Зміна коефіцієнтів замість сум, на місці
+                changed += int(np.count_nonzero(delta.any(axis=0)))
+                record["bytes"] = (stop - start) // 8
+                record["allocated"] = bits.nbytes
+            with stats.stage("apply_delta", name) as record:
+                clipped += Haar.apply_block_delta(band_channel, delta)
+                record["bytes"] = band_channel.size
+                record["allocated"] = Haar.band_bytes(cols) // Haar.BAND_ROWS * band_rows
+        if clipped:
+            # Біти обмежених блоків могли записатися хибно - перевіряємо, чи виправить їх Reed-Solomon
+            with stats.stage("verify", name) as record:
+                written = DWT.read_layout_bytes(channel, layout, len(data))
+                wrong = written != np.frombuffer(data, dtype=np.uint8)
+                errors = np.add.reduceat(wrong, np.arange(0, len(wrong), Fec.NSIZE)).max()
+                record["bytes"] = len(data)
+                record["allocated"] = written.nbytes
+            if errors > nsym // 2:
+                raise ValueError(f"Обмеження 0..255 у {clipped} пікселях{f' каналу {name}' if name else ''} "
+                                 f"пошкодило {errors} байтів блоку Reed-Solomon (виправляється {nsym // 2}): "
+                                 f"візьміть менше площин або підсмуг чи більший nsym.")
+        return changed
+
+    @staticmethod
+    def read_layout_bytes(channel, layout, count):
+        """
+        Читає байти даних заголовка версії 3 (див. embed_layout_data) смугами рядків блоків.
+
+        :param channel: Канал зображення (2D масив, можна np.memmap).
+        :param layout: Розкладка каналу із заголовка.
+        :param count: Кількість байтів.
+        :return: Масив np.uint8 (коротший за count, якщо канал менший, ніж вказує заголовок).
+        """
+        height, width = channel.shape[:2]
+        cols = width // 2
+        first_row = DWT.layout_first_row(Haar.ll_shape(channel.shape)[1])
+        per_block = Layout.bits_per_block(layout)
+        blocks = min(-(-count * 8 // per_block), max(height // 2 - first_row, 0) * cols)
+
+        data = np.empty(min(count, blocks * per_block // 8), dtype=np.uint8)
+        pending, written = np.zeros(0, dtype=np.uint8), 0
+        for band in range(0, -(-blocks // cols) if blocks else 0, Haar.BAND_ROWS):
+            band_rows = min(Haar.BAND_ROWS, -(-blocks // cols) - band)
+            band_channel = channel[2 * (first_row + band):2 * (first_row + band + band_rows)]
+            sums = Haar.block_sums(band_channel, band_rows,
+                                   out=Haar.buffer("block_sums", (4, band_rows, cols), np.int16))
+            bits = Layout.extract(sums, layout, min(band_rows * cols, blocks - band * cols))
+            if len(pending):
+                bits = np.concatenate([pending, bits])
+            whole = min(len(bits) // 8, len(data) - written)
+            data[written:written + whole] = np.packbits(bits[:whole * 8])
+            written += whole
+            pending = bits[whole * 8:]  # Неповний байт переходить у наступну смугу
+        return data[:written]
+
+    @staticmethod
+    def encode_array(image, message, nsym=DEFAULT_NSYM, copy=True, stats=NULL_STATS, workers=None,
+                     compression=DEFAULT_COMPRESSION, layout=None):
+        """
+        Вбудовує повідомлення в зображення, задане масивом.
+
+        Обчислюються лише ті рядки LL, у які вбудовуються дані, а зміна LL
+        переноситься на пікселі блоками 2x2 (див. DWT_haar.Haar). Уся арифметика цілочисельна
+        (суми блоків uint16, зміна int16) у робочих буферах потоку, що повторно використовуються
+        для всіх каналів і наступних зображень, а пікселі змінюються на місці.
+
+        :param image: Зображення BGR (масив uint8, як повертає cv2.imread).
+        :param message: Повідомлення для вбудовування (рядок або bytes).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon (записується в заголовок).
+        :param copy: False - змінювати переданий масив на місці.
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param workers: Кількість потоків для каналів (None - DWT.CHANNEL_WORKERS, 1 - послідовно).
+        :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+        :param layout: Розкладка даних (див. plan); None - біти 3-4 LL, як і раніше.
+        :return: Зображення BGR з вбудованим повідомленням.
+        """
+        if image.ndim != 3 or image.shape[2] < 3:
+            raise ValueError("Очікується кольорове зображення (висота, ширина, 3).")
+        if copy:
+            with stats.stage("copy") as record:
+                image = image.copy()
+                record["bytes"] = record["allocated"] = image.nbytes
+
+        ll_rows, ll_cols = Haar.ll_shape(image.shape)
+        layouts = Layout.per_channel(layout)
+        with stats.stage("rs_encode") as record:
+            if all(Layout.is_default(channel_layout) for channel_layout in layouts):
+                encoded_parts = [(part, b"") for part in DWT.encode_parts(message, nsym, ll_rows * ll_cols,
+                                                                         compression)]
+            else:
+                encoded_parts = DWT.encode_layout_parts(message, nsym, image.shape, layouts, compression)
+            record["bytes"] = len(message)
+            record["allocated"] = sum(len(header) + len(data) for header, data in encoded_parts)
+
+        stats.expect(sum(DWT.embed_stages(image.shape, encoded_part, channel_layout)
+                         for encoded_part, channel_layout in zip(encoded_parts, layouts)))
+
+        # Вбудовування закодованих частин у канали R, G, B (кожен канал пише лише у свої байти)
+        def embed_channel(encoded_part, channel_layout, index, name):
+            channel = image[:, :, index]
+            header, data = encoded_part
+            DWT.embed_part(channel, header, stats, name)
+            if data:
+                DWT.embed_layout_data(channel, data, channel_layout, nsym, stats, name)
+
+        DWT.map_channels(embed_channel, list(zip(encoded_parts, layouts, DWT.RGB_CHANNELS, DWT.CHANNEL_NAMES)),
+                         workers)
+        return image
+
+    @staticmethod
+    def update_channel(channel, encoded_part, stats=NULL_STATS, name=None):
+        """
+        Переписує в каналі лише ті коефіцієнти LL, чиї символи відрізняються від нових.
+
+        Поточні символи читаються з сум блоків у рядках, які займає нова частина, і
+        порівнюються з новими; змінюються лише блоки 2x2 пікселів з іншим символом.
+        Результат збігається з повним вбудовуванням (encode_array) у те саме зображення:
+        для однакового символу зміна LL нульова.
+
+        :param channel: Канал зображення (uint8, можна np.memmap), змінюється на місці.
+        :param encoded_part: Закодована частина каналу (див. encode_parts).
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param name: Назва каналу для записів stats.
+        :return: Кількість змінених блоків 2x2.
+        """
+        ll_rows, ll_cols = Haar.ll_shape(channel.shape)
+        symbols = DWT.bytes_to_symbols(encoded_part)
+        count = len(symbols)
+        if count > ll_rows * ll_cols:
+            raise ValueError(f"Повідомлення не вміщується в зображення: потрібно {count} коефіцієнтів на канал, "
+                             f"доступно {ll_rows * ll_cols}.")
+        rows = -(-count // ll_cols)
+
+        with stats.stage("forward_ll", name) as record:
+            sums = Haar.forward_sums(channel, rows, out=Haar.buffer("sums", (rows, ll_cols), np.uint16))
+            record["bytes"] = sums.size * 4
+            record["allocated"] = sums.nbytes
+        with stats.stage("diff", name) as record:
+            changed = np.flatnonzero(DWT.extract_symbols(sums, 0, count) != symbols)
+            record["bytes"] = count
+            record["allocated"] = changed.nbytes
+        if len(changed):
+            with stats.stage("patch", name) as record:
+                delta = DWT.embed_sums(sums.reshape(-1)[changed], symbols[changed])
+                Haar.patch_blocks(channel, changed // ll_cols, changed % ll_cols, delta)
+                record["bytes"] = len(changed) * 4
+                record["allocated"] = delta.nbytes
+        else:
+            stats.expect(-1)  # Етапу patch не буде (див. update_array)
+        return len(changed)
+
+    @staticmethod
+    def update_array(image, message, nsym=DEFAULT_NSYM, stats=NULL_STATS, workers=None,
+                     compression=DEFAULT_COMPRESSION, layout=None):
+        """
+        Замінює повідомлення в стеганозображенні, змінюючи лише потрібні блоки пікселів (на місці).
+
+        Коефіцієнти старого повідомлення за межами нового не змінюються: декодер читає
+        рівно стільки, скільки вказує новий заголовок.
+
+        :param image: Зображення BGR (масив uint8 або np.memmap), змінюється на місці.
+        :param message: Нове повідомлення (рядок або bytes).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param workers: Кількість потоків для каналів (None - DWT.CHANNEL_WORKERS, 1 - послідовно).
+        :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+        :param layout: Розкладка даних (див. plan). Для розкладки, відмінної від типової, так само
+                       точково оновлюється заголовок, а дані перераховуються смугами (незмінні блоки - нульова зміна).
+        :return: Кількість змінених блоків 2x2 (сумарно по каналах).
+        """
+        if image.ndim != 3 or image.shape[2] < 3:
+            raise ValueError("Очікується кольорове зображення (висота, ширина, 3).")
+        ll_rows, ll_cols = Haar.ll_shape(image.shape)
+        layouts = Layout.per_channel(layout)
+        with stats.stage("rs_encode") as record:
+            if all(Layout.is_default(channel_layout) for channel_layout in layouts):
+                encoded_parts = [(part, b"") for part in DWT.encode_parts(message, nsym, ll_rows * ll_cols,
+                                                                         compression)]
+            else:
+                encoded_parts = DWT.encode_layout_parts(message, nsym, image.shape, layouts, compression)
+            record["bytes"] = len(message)
+            record["allocated"] = sum(len(header) + len(data) for header, data in encoded_parts)
+
+        # update_channel - forward_ll, diff, patch; дані розкладки - смугами, як в encode_array
+        stats.expect(sum(3 + DWT.embed_stages(image.shape, (b"", data), channel_layout)
+                         for (_, data), channel_layout in zip(encoded_parts, layouts)))
+
+        def update_channel(encoded_part, channel_layout, index, name):
+            channel = image[:, :, index]
+            header, data = encoded_part
+            changed = DWT.update_channel(channel, header, stats, name)
+            if data:
+                changed += DWT.embed_layout_data(channel, data, channel_layout, nsym, stats, name)
+            return changed
+
+        arguments = list(zip(encoded_parts, layouts, DWT.RGB_CHANNELS, DWT.CHANNEL_NAMES))
+        return sum(DWT.map_channels(update_channel, arguments, workers))
+
+    @staticmethod
+    def decode_array(image, stats=NULL_STATS, workers=None):
         """
-        image = cv2.imread(image_path)  # Завантажуємо зображення
+        Декодує повідомлення з зображення, заданого масивом.
+
+        :param image: Зображення BGR (масив uint8).
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param workers: Кількість потоків для каналів (None - DWT.CHANNEL_WORKERS, 1 - послідовно).
+        :return: Декодоване повідомлення (рядок або bytes).
+        """
+        if image.ndim != 3 or image.shape[2] < 3:
+            raise ValueError("Очікується кольорове зображення (висота, ширина, 3).")
+
+        # Декодування повідомлення з каналів R, G, B
+        stats.expect(DWT.DECODE_STAGES * len(DWT.RGB_CHANNELS))
+        arguments = [(image[:, :, index], stats, name) for index, name in zip(DWT.RGB_CHANNELS, DWT.CHANNEL_NAMES)]
+        return DWT.join_parts(DWT.map_channels(DWT.decode_channel, arguments, workers))
+
+    @staticmethod
+    def image_params(ext, png_level=None, png_strategy=None, tiff_compression=None, allow_lossy=False):
+        """
+        Перевіряє формат результату і повертає параметри для cv2.imwrite/cv2.imencode.
+
+        :param ext: Розширення формату, наприклад ".png".
+        :param png_level: Рівень стиснення PNG 0..9 (None - за замовчуванням cv2; 0-1 - швидко, 9 - найменший файл).
+        :param png_strategy: Стратегія zlib для PNG (ключ PNG_STRATEGIES; "rle" - швидко й компактно для фото).
+        :param tiff_compression: Стиснення TIFF (ключ TIFF_COMPRESSIONS; "none" - також для DWT_tiles).
+        :param allow_lossy: True - формат з втратами лише з попередженням, False - ValueError.
+        :return: Список параметрів cv2.
+        :raises ValueError: Якщо формат може стискати з втратами (і allow_lossy=False) або параметр невідомий.
+        """
+        ext = ext.lower()
+        if ext not in DWT.LOSSLESS_FORMATS:
+            message = (f"Формат {ext} може стискати з втратами - повідомлення буде зруйноване. "
+                       f"Формати без втрат: {', '.join(DWT.LOSSLESS_FORMATS)}.")
+            if not allow_lossy:
+                raise ValueError(message)
+            warnings.warn(message, stacklevel=3)
+            return []
+
+        params = []
+        if ext == ".png":
+            if png_level is not None:
+                params += [cv2.IMWRITE_PNG_COMPRESSION, int(png_level)]
+            if png_strategy is not None:
+                params += [cv2.IMWRITE_PNG_STRATEGY, DWT.PNG_STRATEGIES[png_strategy]]
+        elif ext == ".webp":
+            params += [cv2.IMWRITE_WEBP_QUALITY, DWT.WEBP_LOSSLESS_QUALITY]
+        elif ext in (".tif", ".tiff") and tiff_compression is not None:
+            params += [cv2.IMWRITE_TIFF_COMPRESSION, DWT.TIFF_COMPRESSIONS[tiff_compression]]
+        return params
+
+    @staticmethod
+    def read_image(image_path):
+        """
+        Завантажує зображення BGR (.npy - через np.load, решта - cv2.imread).
+
+        :param image_path: Шлях до зображення.
+        :return: Зображення BGR (uint8).
+        """
+        if image_path.lower().endswith(".npy"):
+            return np.load(image_path)
+        image = cv2.imread(image_path)
         if image is None:
             raise FileNotFoundError("Зображення не знайдено!")
-        
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)  # Перетворення в RGB
+        return image
+
+    @staticmethod
+    def write_image(output_path, image, params=()):
+        """
+        Зберігає зображення (.npy - через np.save, решта - cv2.imwrite).
+
+        :param output_path: Шлях до файлу; формат визначає розширення.
+        :param image: Зображення BGR.
+        :param params: Параметри cv2 від image_params (формат перевіряється там, до вбудовування).
+        :raises ValueError: Якщо файл не записано.
+        """
+        if output_path.lower().endswith(".npy"):
+            np.save(output_path, image)
+        elif not cv2.imwrite(output_path, image, params):
+            raise ValueError(f"Не вдалося зберегти зображення: {output_path}")
+
+    @staticmethod
+    def image_to_bytes(image, ext=".png", params=()):
+        """
+        Кодує зображення у байти файлу (.npy - через np.save, решта - cv2.imencode).
+
+        :param image: Зображення BGR.
+        :param ext: Формат, наприклад ".png".
+        :param params: Параметри cv2 від image_params.
+        :return: bytes.
+        """
+        if ext.lower() == ".npy":
+            buffer = io.BytesIO()
+            np.save(buffer, image)
+            return buffer.getvalue()
+        ok, buffer = cv2.imencode(ext, image, params)
+        if not ok:
+            raise ValueError(f"Не вдалося закодувати зображення у формат {ext}!")
+        return buffer.tobytes()
 
-        # Розділення каналів
-        R, G, B = cv2.split(image)
+    @staticmethod
+    def image_from_bytes(data):
+        """
+        Декодує закодоване зображення (PNG, BMP, ...) з байтів.
 
-        # Виконання DWT для кожного каналу
-        coeffs_r = pywt.dwt2(R, 'haar')
-        coeffs_g = pywt.dwt2(G, 'haar')
-        coeffs_b = pywt.dwt2(B, 'haar')
+        :param data: bytes, bytearray або memoryview із вмістом файлу.
+        :return: Зображення BGR.
+        """
+        if bytes(data[:6]) == b"\x93NUMPY":
+            return np.load(io.BytesIO(data))  # .npy (див. image_to_bytes)
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Не вдалося декодувати зображення з байтів!")
+        return image
 
-        LL_r, (LH_r, HL_r, HH_r) = coeffs_r
-        LL_g, (LH_g, HL_g, HH_g) = coeffs_g
-        LL_b, (LH_b, HL_b, HH_b) = coeffs_b
+    @staticmethod
+    def encode_bytes(data, message, ext=".png", nsym=DEFAULT_NSYM, stats=NULL_STATS, workers=None,
+                     compression=DEFAULT_COMPRESSION, image_options=None, layout=None):
+        """
+        Вбудовує повідомлення в зображення, передане байтами.
+
+        :param data: Вміст файлу зображення.
+        :param message: Повідомлення для вбудовування (рядок або bytes).
+        :param ext: Формат результату без втрат (розширення для cv2.imencode), наприклад ".png".
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param workers: Кількість потоків для каналів (None - DWT.CHANNEL_WORKERS, 1 - послідовно).
+        :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+        :param image_options: Параметри формату результату (див. image_params), наприклад {"png_level": 1}.
+        :param layout: Розкладка даних (див. plan); None - біти 3-4 LL.
+        :return: Байти закодованого зображення з вбудованим повідомленням.
+        """
+        params = DWT.image_params(ext, **(image_options or {}))  # Формат перевіряється до вбудовування
+        with stats.stage("imdecode") as record:
+            image = DWT.image_from_bytes(data)
+            record["bytes"] = len(data)
+            record["allocated"] = image.nbytes
+        image = DWT.encode_array(image, message, nsym, copy=False, stats=stats, workers=workers,
+                                 compression=compression, layout=layout)
+        with stats.stage("imencode") as record:
+            encoded = DWT.image_to_bytes(image, ext, params)
+            record["bytes"] = image.nbytes
+            record["allocated"] = len(encoded)
+        return encoded
+
+    @staticmethod
+    def decode_bytes(data, stats=NULL_STATS, workers=None):
+        """
+        Декодує повідомлення з зображення, переданого байтами.
+
+        :param data: Вміст файлу зображення.
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param workers: Кількість потоків для каналів (None - DWT.CHANNEL_WORKERS, 1 - послідовно).
+        :return: Декодоване повідомлення (рядок або bytes).
+        """
+        with stats.stage("imdecode") as record:
+            image = DWT.image_from_bytes(data)
+            record["bytes"] = len(data)
+            record["allocated"] = image.nbytes
+        return DWT.decode_array(image, stats, workers)
+
+    @staticmethod
+    def output_target(image_path, output_path, overwrite=False):
+        """
+        Визначає, куди зберегти результат: вхідне зображення перезаписується лише на явний запит.
+
+        :param image_path: Шлях до вхідного зображення.
+        :param output_path: Шлях результату (None - лише з overwrite=True, тоді результат замінює вхідне зображення).
+        :param overwrite: True - дозволити перезапис вхідного зображення.
+        :return: Шлях результату.
+        :raises ValueError: Якщо результат не задано або він збігається з вхідним зображенням без overwrite.
+        """
+        if output_path is None:
+            if not overwrite:
+                raise ValueError("Не вказано, куди зберегти результат; щоб перезаписати вхідне зображення, "
+                                 "передайте overwrite=True.")
+            return image_path
+        if not overwrite and os.path.realpath(output_path) == os.path.realpath(image_path):
+            raise ValueError(f"Результат перезаписав би вхідне зображення {image_path}; "
+                             f"передайте overwrite=True, якщо це навмисно.")
+        return output_path
+
+    @staticmethod
+    def encode_file(image_path, message, output_path=None, nsym=DEFAULT_NSYM, stats=NULL_STATS, workers=None,
+                    compression=DEFAULT_COMPRESSION, image_options=None, layout=None, overwrite=False):
+        """
+        Вбудовує повідомлення у зображення з файлу, але не зберігає результат (див. encode_message).
+
+        Параметри ті самі, що й у encode_message; шлях і формат результату перевіряються до читання файлу.
+
+        :return: Кортеж (шлях результату, зображення BGR з повідомленням, параметри cv2 для write_image).
+        :raises ValueError: Див. encode_message.
+        """
+        output_path = DWT.output_target(image_path, output_path, overwrite)
+        params = DWT.image_params(os.path.splitext(output_path)[1], **(image_options or {}))
+
+        with stats.stage("imread") as record:
+            image = DWT.read_image(image_path)  # Завантажуємо зображення (BGR)
+            record["bytes"] = record["allocated"] = image.nbytes
+
+        image = DWT.encode_array(image, message, nsym, copy=False, stats=stats, workers=workers,
+                                 compression=compression, layout=layout)
+        return output_path, image, params
+
+    @staticmethod
+    def encode_message(image_path, message, output_path=None, nsym=DEFAULT_NSYM, stats=NULL_STATS, workers=None,
+                       compression=DEFAULT_COMPRESSION, image_options=None, layout=None, overwrite=False):
+        """
+        Виконує кодування повідомлення в зображення за допомогою DWT і Reed-Solomon.
+
+        :param image_path: Шлях до зображення для вбудовування повідомлення.
+        :param message: Повідомлення для вбудовування (рядок або bytes).
+        :param output_path: Куди зберегти результат (обов'язковий, якщо не overwrite); формат - за розширенням.
+        :param nsym: Кількість перевірочних байтів Reed-Solomon (записується в заголовок).
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів (див. DWT_stats).
+        :param workers: Кількість потоків для каналів (None - DWT.CHANNEL_WORKERS, 1 - послідовно).
+        :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+        :param image_options: Параметри формату результату (див. image_params), наприклад {"png_level": 1}.
+        :param layout: Розкладка даних (див. plan): бітові площини й підсмуги; None - біти 3-4 LL.
+        :param overwrite: True - дозволити перезапис вхідного зображення (output_path=None або той самий шлях).
+        :return: Шлях до збереженого зображення.
+        :raises ValueError: Якщо формат результату стискає з втратами (JPEG тощо) або результат перезаписав би
+                            вхідне зображення без overwrite - до будь-якої роботи.
+        """
+        output_path, image, params = DWT.encode_file(image_path, message, output_path, nsym, stats, workers,
+                                                     compression, image_options, layout, overwrite)
+
+        # Збереження зображення
+        with stats.stage("imwrite") as record:
+            DWT.write_image(output_path, image, params)
+            record["bytes"] = image.nbytes
+        return output_path
+
+    @staticmethod
+    def update_message(image_path, message, output_path=None, nsym=DEFAULT_NSYM, stats=NULL_STATS, workers=None,
+                       compression=DEFAULT_COMPRESSION, image_options=None, layout=None):
+        """
+        Замінює повідомлення у стеганозображенні (див. update_array).
+
+        Файл записується лише тоді, коли змінився хоча б один блок (або результат іде в інший файл).
+        Для запису на місці лише змінених пікселів великих нестиснених файлів див. DWT_tiles.Tiles.update_tiled.
+
+        :param image_path: Шлях до стеганозображення.
+        :param message: Нове повідомлення (рядок або bytes).
+        :param output_path: Куди зберегти результат (None - перезаписати вхідне зображення).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів.
+        :param workers: Кількість потоків для каналів (None - DWT.CHANNEL_WORKERS, 1 - послідовно).
+        :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+        :param image_options: Параметри формату результату (див. image_params).
+        :param layout: Розкладка даних (див. plan); None - біти 3-4 LL.
+        :return: Кортеж (шлях до зображення, кількість змінених блоків 2x2).
+        """
+        output_path = image_path if output_path is None else output_path
+        params = DWT.image_params(os.path.splitext(output_path)[1], **(image_options or {}))
+
+        with stats.stage("imread") as record:
+            image = DWT.read_image(image_path)  # Завантажуємо зображення (BGR)
+            record["bytes"] = record["allocated"] = image.nbytes
+
+        changed = DWT.update_array(image, message, nsym, stats, workers, compression, layout)
+
+        if changed or output_path != image_path:
+            with stats.stage("imwrite") as record:
+                DWT.write_image(output_path, image, params)
+                record["bytes"] = image.nbytes
+        return output_path, changed
+
+    @staticmethod
+    def decode_message(image_path, stats=NULL_STATS, workers=None, cache=None):
+        """
+        Виконує декодування повідомлення з зображення за допомогою DWT і Reed-Solomon.
+        
+        :param image: Зображення з вбудованим повідомленням.
+        :param stats: Об'єкт DWT_stats.Stats для вимірювання етапів (див. DWT_stats).
+        :param workers: Кількість потоків для каналів (None - DWT.CHANNEL_WORKERS, 1 - послідовно).
+        :param cache: Об'єкт DWT_cache.DecodeCache (None - без кешу).
+        :return: Декодоване повідомлення (рядок або bytes).
+        """
+        key = cache.key(image_path) if cache is not None else None
+        decoded_message = cache.get(key) if cache is not None else None
+        if decoded_message is None:
+            with stats.stage("imread") as record:
+                image = DWT.read_image(image_path)  # Завантажуємо зображення (BGR)
+                record["bytes"] = record["allocated"] = image.nbytes
 
-        # Декодування повідомлення
-        decoded_message = DWT.decode_message_with_rs(LL_r)
-        decoded_message += DWT.decode_message_with_rs(LL_g)
-        decoded_message += DWT.decode_message_with_rs(LL_b)
+            decoded_message = DWT.decode_array(image, stats, workers)
+            if cache is not None:
+                cache.put(key, decoded_message)
 
-        print("Декодоване повідомлення:", decoded_message)
+        if isinstance(decoded_message, bytes):
+            print(f"Декодовано {len(decoded_message)} байтів даних")
+        else:
+            print("Декодоване повідомлення:", decoded_message)
         return decoded_message
@@ -0,0 +1,348 @@
+import argparse  # Розбір аргументів командного рядка
+import base64  # Двійкові повідомлення у JSONL
+import contextlib  # Перенаправлення print() робочих процесів
+import glob  # Пошук файлів за шаблоном
+import json  # Потоковий вивід результатів у форматі JSONL
+import os  # Робота з шляхами та розмірами файлів
+import sys  # Потоки stdout/stderr
+import time  # Вимірювання пропускної здатності
+from concurrent.futures import ThreadPoolExecutor  # Фоновий запис результатів кодування
+from multiprocessing import Pool  # Пул процесів
+
+from DWT import DWT
+from DWT_cache import DecodeCache
+from DWT_cli import add_image_arguments, add_layout_arguments, image_options, layout_option, nsym_value
+from DWT_stats import NULL_STATS, Stats
+
+IMAGE_EXTENSIONS = (".png", ".bmp", ".tif", ".tiff", ".webp", ".jpg", ".jpeg")
+worker_cache = None  # Кеш декодування робочого процесу (див. init_worker)
+
+
+def collect_items(source, message=None):
+    """
+    Формує список завдань з каталогу, шаблону glob або маніфесту.
+
+    Маніфест - файл .jsonl (об'єкти з полями path і, за бажанням, message)
+    або текстовий файл зі шляхом на кожному рядку.
+
+    :param source: Каталог, шаблон glob або шлях до маніфесту.
+    :param message: Повідомлення за замовчуванням для вбудовування.
+    :return: Список словників {"path": ..., "message": ...}.
+    """
+    if os.path.isdir(source):
+        paths = sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        return [{"path": path, "message": message} for path in paths]
+
+    if os.path.isfile(source) and not source.lower().endswith(IMAGE_EXTENSIONS):
+        items = []
+        with open(source, encoding="utf-8") as manifest:
+            for line in manifest:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("{"):
+                    entry = json.loads(line)
+                    items.append({"path": entry["path"], "message": entry.get("message", message)})
+                else:
+                    items.append({"path": line, "message": message})
+        return items
+
+    return [{"path": path, "message": message} for path in sorted(glob.glob(source))]
+
+
+def load_done(results_path):
+    """
+    Читає попередній файл результатів і повертає шляхи, оброблені успішно.
+
+    :param results_path: Файл JSONL з результатами попереднього запуску.
+    :return: Множина шляхів.
+    """
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    with open(results_path, encoding="utf-8") as results:
+        for line in results:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Незавершений рядок після перерваного запуску
+            if result.get("ok"):
+                done.add(result["path"])
+    return done
+
+
+def output_path(path, output_dir=None, output_format=None):
+    """
+    Визначає шлях результату кодування.
+
+    :param path: Шлях до вхідного зображення.
+    :param output_dir: Каталог для результатів (None - поруч із вхідним файлом).
+    :param output_format: Розширення результату, наприклад ".png" (None - як у вхідного файлу).
+    :return: Шлях до результату.
+    """
+    target = os.path.join(output_dir, os.path.basename(path)) if output_dir else path
+    return os.path.splitext(target)[0] + output_format if output_format else target
+
+
+def refuse_collisions(items, output_dir=None, output_format=None):
+    """
+    Позначає завдання кодування, результати яких потрапили б в один файл (однакові імена
+    вхідних файлів з різних каталогів або різні формати з тим самим ім'ям).
+
+    Інакше пізніше завдання мовчки перезаписало б результат попереднього. Жодне із завдань,
+    що збігаються, не виконується: у результат потрапляє помилка (див. run_item).
+
+    :param items: Список завдань (див. collect_items).
+    :param output_dir: Каталог для результатів (див. output_path).
+    :param output_format: Розширення результатів (див. output_path).
+    :return: Список завдань; завдання, що збігаються, - копії з полем error.
+    """
+    targets = {}
+    for index, item in enumerate(items):
+        targets.setdefault(os.path.realpath(output_path(item["path"], output_dir, output_format)), []).append(index)
+    items = list(items)
+    for target, indices in targets.items():
+        if len(indices) > 1:
+            paths = ", ".join(items[index]["path"] for index in indices)
+            for index in indices:
+                items[index] = dict(items[index], error=f"ValueError: Результати {paths} записувалися б в один "
+                                                        f"файл {target}: перейменуйте вхідні файли.")
+    return items
+
+
+def init_worker(cache_dir=None):
+    """
+    Готує робочий процес: один кеш декодування на процес, щоб записи в пам'яті й лічильники
+    зберігалися між завданнями.
+
+    :param cache_dir: Каталог дискового кешу декодування (None - без кешу).
+    """
+    global worker_cache
+    worker_cache = DecodeCache(directory=cache_dir) if cache_dir else None
+
+
+def run_item(task, writer=None):
+    """
+    Виконує одне завдання у робочому процесі.
+
+    Помилки не переривають пакет, а повертаються в полі error. Якщо задано writer,
+    стиснення й запис результату кодування передаються йому (див. run_chunk), а в
+    результаті з'являється поле write - Future, який завершує finish_write.
+
+    :param task: Кортеж (mode, item, output_dir, with_stats, channel_workers, nsym, compression, image_options,
+                 output_format, layout, overwrite).
+    :param writer: ThreadPoolExecutor для фонового запису (None - запис одразу).
+    :return: Словник з результатом.
+    """
+    (mode, item, output_dir, with_stats, channel_workers, nsym, compression, options, output_format, layout,
+     overwrite) = task
+    path = item["path"]
+    result = {"path": path, "ok": False}
+    if "error" in item:  # Відхилене до запуску (див. refuse_collisions)
+        result["error"] = item["error"]
+        return result
+    stats = Stats() if with_stats else NULL_STATS
+    start = time.perf_counter()
+    try:
+        result["bytes"] = os.path.getsize(path)
+        # print() рушія не повинен змішуватися з JSONL у stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            if mode == "encode" and writer is None:
+                target = output_path(path, output_dir, output_format)
+                result["output"] = DWT.encode_message(path, item["message"], target, nsym=nsym, stats=stats,
+                                                      workers=channel_workers, compression=compression,
+                                                      image_options=options, layout=layout, overwrite=overwrite)
+            elif mode == "encode":
+                target, image, params = DWT.encode_file(path, item["message"],
+                                                        output_path(path, output_dir, output_format), nsym=nsym,
+                                                        stats=stats, workers=channel_workers, compression=compression,
+                                                        image_options=options, layout=layout, overwrite=overwrite)
+                result["output"] = target
+                result["write"] = writer.submit(timed_write, target, image, params)
+            else:
+                message = DWT.decode_message(path, stats=stats, workers=channel_workers, cache=worker_cache)
+                if isinstance(message, bytes):
+                    result["message_base64"] = base64.b64encode(message).decode('ascii')
+                else:
+                    result["message"] = message
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    if with_stats:
+        result["stages"] = stats.summary()
+    return result
+
+
+def timed_write(target, image, params):
+    """
+    Записує зображення у фоновому потоці (cv2 відпускає GIL під час стиснення).
+
+    :return: Тривалість запису в секундах.
+    """
+    start = time.perf_counter()
+    DWT.write_image(target, image, params)
+    return time.perf_counter() - start
+
+
+def finish_write(result):
+    """
+    Чекає фоновий запис результату кодування і доповнює результат (write_seconds або error).
+
+    :param result: Словник з run_item.
+    :return: Той самий словник без поля write.
+    """
+    write = result.pop("write", None)
+    if write is not None:
+        try:
+            result["write_seconds"] = round(write.result(), 6)
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def run_chunk(tasks):
+    """
+    Виконує кілька завдань у робочому процесі по черзі.
+
+    Під час кодування стиснення й запис зображення (imwrite) іде у фоновому потоці
+    паралельно з вбудовуванням у наступне; у пам'яті не більше двох готових зображень.
+
+    :param tasks: Список кортежів завдань (див. run_item).
+    :return: Список результатів у тому самому порядку.
+    """
+    results = []
+    with ThreadPoolExecutor(1, "dwt-write") as writer:
+        previous = None
+        for task in tasks:
+            result = run_item(task, writer)
+            if previous is not None:
+                results.append(finish_write(previous))
+            previous = result
+        if previous is not None:
+            results.append(finish_write(previous))
+    return results
+
+
+def run_batch(mode, items, workers=None, output_dir=None, results=sys.stdout, chunksize=4, with_stats=False,
+              channel_workers=1, nsym=DWT.DEFAULT_NSYM, compression=DWT.DEFAULT_COMPRESSION, cache_dir=None,
+              image_options=None, output_format=None, layout=None, overwrite=False):
+    """
+    Обробляє завдання у пулі процесів і пише результати у порядку вхідного списку.
+
+    :param mode: "encode" або "decode".
+    :param items: Список завдань (див. collect_items).
+    :param workers: Кількість процесів (None - кількість ядер).
+    :param output_dir: Каталог для вихідних зображень (None - поруч із вхідними, див. output_path). Завдання,
+                       результати яких потрапили б в один файл, не виконуються (див. refuse_collisions).
+    :param results: Відкритий потік для JSONL-результатів.
+    :param chunksize: Кількість завдань, що передаються процесу за раз.
+    :param with_stats: Додавати до результатів час і пам'ять кожного етапу (DWT_stats).
+    :param channel_workers: Потоків на канали всередині процесу (1 - паралелізм лише на рівні процесів).
+    :param nsym: Кількість перевірочних байтів Reed-Solomon на блок (записується в заголовок зображення).
+    :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+    :param cache_dir: Каталог дискового кешу декодування, спільний для процесів (None - без кешу); кеш
+                      створюється один раз на робочий процес (див. init_worker).
+    :param image_options: Параметри формату результату кодування (див. DWT.image_params).
+    :param output_format: Розширення результатів кодування, наприклад ".png" (None - як у вхідних файлів).
+    :param layout: Розкладка даних кодування (див. DWT.plan); None - біти 3-4 LL.
+    :param overwrite: True - дозволити перезапис вхідних зображень результатами кодування (див. DWT.output_target).
+    :return: Словник із підсумком (кількість, помилки, зображень/с, МБ/с).
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    if mode == "encode":
+        items = refuse_collisions(items, output_dir, output_format)
+    tasks = [(mode, item, output_dir, with_stats, channel_workers, nsym, compression, image_options, output_format,
+              layout, overwrite) for item in items]
+    chunks = [tasks[index:index + chunksize] for index in range(0, len(tasks), chunksize)]
+    summary = {"items": 0, "failed": 0, "bytes": 0}
+    start = time.perf_counter()
+    with Pool(processes=workers, initializer=init_worker, initargs=(cache_dir,)) as pool:
+        for chunk in pool.imap(run_chunk, chunks):
+            for result in chunk:
+                summary["items"] += 1
+                summary["bytes"] += result.get("bytes", 0)
+                if not result["ok"]:
+                    summary["failed"] += 1
+                results.write(json.dumps(result, ensure_ascii=False) + "\n")
+            results.flush()
+
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = round(elapsed, 3)
+    summary["images_per_s"] = round(summary["items"] / elapsed, 2) if elapsed else 0.0
+    summary["mb_per_s"] = round(summary["bytes"] / 1e6 / elapsed, 2) if elapsed else 0.0
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch DWT steganography (encode/decode many images).")
+    parser.add_argument("mode", choices=("encode", "decode"))
+    parser.add_argument("source", help="Directory, glob pattern or manifest (.jsonl or list of paths).")
+    parser.add_argument("-m", "--message", help="Message to embed (encode mode, unless set in the manifest).")
+    parser.add_argument("--message-file", help="Read the message to embed from a UTF-8 text file.")
+    parser.add_argument("--payload-file", help="Embed the raw bytes of this file (decoded as message_base64).")
+    parser.add_argument("-o", "--output-dir", help="Encode mode: directory for stego images.")
+    parser.add_argument("--in-place", action="store_true",
+                        help="Encode mode: overwrite the input images (needed without --output-dir/--output-format).")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--channel-workers", type=int, default=1,
+                        help="Threads per image for the R/G/B channels (1 = rely on the process pool).")
+    parser.add_argument("--nsym", type=nsym_value, default=DWT.DEFAULT_NSYM, metavar="1-254",
+                        help="Reed-Solomon parity bytes per 255-byte block (encode mode; stored in the image header).")
+    parser.add_argument("--compression", choices=("auto", "zlib", "lzma", "none"), default="auto",
+                        help="Payload compression (auto = only when it makes the payload smaller).")
+    parser.add_argument("--cache-dir", help="Decode mode: reuse payloads cached here (shared between processes).")
+    parser.add_argument("--output-format", choices=DWT.LOSSLESS_FORMATS,
+                        help="Encode mode: write stego images in this format (e.g. JPEG inputs to .png).")
+    add_image_arguments(parser)
+    add_layout_arguments(parser)
+    parser.add_argument("--chunksize", type=int, default=4, help="Items sent to a worker at a time.")
+    parser.add_argument("-r", "--results", help="Append JSONL results to this file instead of stdout.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip items already marked ok in the --results file.")
+    parser.add_argument("--stats", action="store_true", help="Include per-stage timings in each result.")
+    args = parser.parse_args(argv)
+
+    message = args.message
+    if args.message_file:
+        with open(args.message_file, encoding="utf-8") as message_file:
+            message = message_file.read()
+    if args.payload_file:
+        with open(args.payload_file, "rb") as payload_file:
+            message = payload_file.read()
+
+    items = collect_items(args.source, message)
+    if args.mode == "encode" and any(item["message"] is None for item in items):
+        parser.error("encode mode needs --message, --message-file, --payload-file or a message in the manifest")
+    if args.mode == "encode" and not (args.output_dir or args.output_format or args.in_place):
+        parser.error("encode mode needs --output-dir, --output-format or --in-place")
+    if args.resume:
+        if not args.results:
+            parser.error("--resume needs --results")
+        done = load_done(args.results)
+        items = [item for item in items if item["path"] not in done]
+
+    results = open(args.results, "a", encoding="utf-8") if args.results else sys.stdout
+    try:
+        summary = run_batch(args.mode, items, args.workers, args.output_dir, results, args.chunksize, args.stats,
+                            args.channel_workers, args.nsym,
+                            None if args.compression == "none" else args.compression, args.cache_dir,
+                            image_options(args), args.output_format, layout_option(args), args.in_place)
+    finally:
+        if results is not sys.stdout:
+            results.close()
+
+    print(f"Оброблено: {summary['items']}, помилок: {summary['failed']}, "
+          f"{summary['images_per_s']} зображень/с, {summary['mb_per_s']} МБ/с, {summary['seconds']} с",
+          file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+import argparse  # Розбір аргументів командного рядка
+import json  # Збереження результатів і базової лінії
+import os  # Каталог модулів для запуску DWT_cli
+import platform  # Опис машини в результатах
+import resource  # Пікова пам'ять процесу (запасний варіант)
+import statistics  # Медіана повторів
+import subprocess  # Холодний запуск DWT_cli в окремому інтерпретаторі
+import sys  # Код виходу
+import tempfile  # Тимчасове зображення для холодного запуску
+import time  # Вимірювання часу
+import tracemalloc  # Пікова пам'ять масивів NumPy під час кодування/декодування
+
+import cv2  # Бібліотека для роботи з зображеннями
+import numpy as np  # Бібліотека для роботи з числовими масивами
+
+from DWT import DWT
+from DWT_cli import nsym_value
+from DWT_haar import Haar
+from DWT_stats import Stats
+
+DEFAULT_SIZES = (256, 1024, 4096)  # Повний набір: --sizes 256 512 1024 2048 4096 8192
+DEFAULT_FRACTIONS = (0.01, 0.1, 1.0)  # Частка місткості зображення, зайнята повідомленням
+PEAK_RATIO_TARGET = 0.5  # Ціль для --max-peak-ratio: робоча пам'ять не більше половини розміру зображення
+# Найменша сторона носія, до якої застосовується --max-peak-ratio: на менших носіях переважають постійні
+# витрати (смуги BAND_ROWS, стан zlib/LZMA, таблиці GF) - 256x256 дає ~1.5x, 512x512 до ~1x, 1024x1024 ~0.4x
+PEAK_MIN_SIZE = 1024
+COLD_START_TARGET_MS = 250  # Ціль для --max-cold-start-ms: запуск DWT_cli понад голий інтерпретатор
+COLD_START_SIZE = 256  # Сторона зображення для холодного запуску (імпорти, а не обчислення)
+# Формати результату для --formats: назва, розширення, параметри DWT.image_params
+FORMAT_CASES = (
+    ("png-0", ".png", {"png_level": 0}),
+    ("png-1", ".png", {"png_level": 1}),
+    ("png-1-rle", ".png", {"png_level": 1, "png_strategy": "rle"}),
+    ("png-3", ".png", {"png_level": 3}),
+    ("png-9", ".png", {"png_level": 9}),
+    ("webp-lossless", ".webp", {}),
+    ("tiff-none", ".tiff", {"tiff_compression": "none"}),
+    ("tiff-lzw", ".tiff", {"tiff_compression": "lzw"}),
+    ("tiff-packbits", ".tiff", {"tiff_compression": "packbits"}),
+    ("bmp", ".bmp", {}),
+    ("npy", ".npy", {}),
+)
+# Розкладки даних для --layouts: назва, розкладка DWT.plan (None - біти 3-4 LL)
+LAYOUT_CASES = (
+    ("LL:3-4", None),
+    ("LL:2-5", {"planes": "2-5"}),
+    ("LL+HH:3-4", {"planes": "3-4", "subbands": "LL,HH"}),
+    ("all:3-4", {"planes": "3-4", "subbands": "LL,LH,HL,HH"}),
+    ("LL+HH:2-5", {"planes": "2-5", "subbands": "LL,HH"}),
+)
+
+
+def make_carrier(size, seed=0):
+    """
+    Генерує синтетичне гладке кольорове зображення (градієнт + слабкий шум).
+
+    :param size: Сторона квадратного зображення в пікселях.
+    :param seed: Зерно генератора для відтворюваності.
+    :return: Зображення BGR (uint8).
+    """
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(40, 215, size, dtype=np.float32)
+    image = np.empty((size, size, 3), dtype=np.float32)
+    image[:, :, 0] = ramp[None, :]
+    image[:, :, 1] = ramp[:, None]
+    image[:, :, 2] = 127.0
+    image += rng.normal(0, 2, image.shape).astype(np.float32)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def make_message(length, seed=0):
+    """
+    Генерує відтворюване ASCII-повідомлення заданої довжини.
+
+    :param length: Довжина в байтах.
+    :param seed: Зерно генератора.
+    :return: Рядок.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(32, 127, length, dtype=np.uint8).tobytes().decode('ascii')
+
+
+def reset_peak_rss():
+    """
+    Скидає пік пам'яті процесу (Linux, /proc/self/clear_refs).
+
+    :return: True, якщо скидання підтримується.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """
+    :return: Пікова резидентна пам'ять процесу в МБ (VmHWM або ru_maxrss).
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def traced_peak(function):
+    """
+    Вимірює пікову пам'ять, виділену під час виклику (tracemalloc, включно з масивами NumPy).
+
+    Робочі буфери Haar поточного потоку звільняються заздалегідь, тож у пік входить і їх виділення.
+
+    :param function: Функція без аргументів.
+    :return: Пік у байтах.
+    """
+    Haar.release_buffers()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def cold_start(repeat):
+    """
+    Вимірює холодний запуск `python -m DWT_cli` (новий інтерпретатор на кожен виклик) на малому зображенні.
+
+    :param repeat: Кількість запусків кожної команди (береться мінімум).
+    :return: Словник мілісекунд: python (порожній інтерпретатор), inspect, decode.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        image_path = os.path.join(directory, "cold.png")
+        cv2.imwrite(image_path, DWT.encode_array(make_carrier(COLD_START_SIZE), "cold start", workers=1))
+        commands = {
+            "python": [sys.executable, "-c", "pass"],
+            "inspect": [sys.executable, "-m", "DWT_cli", "inspect", image_path],
+            "decode": [sys.executable, "-m", "DWT_cli", "decode", image_path],
+        }
+        result = {}
+        for name, command in commands.items():
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                subprocess.run(command, cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                times.append(time.perf_counter() - start)
+            result[name] = min(times) * 1000
+    return result
+
+
+def run_formats(size, repeat, nsym):
+    """
+    Порівнює формати результату без втрат: час запису й читання, розмір файлу, цілість повідомлення.
+
+    :param size: Сторона зображення.
+    :param repeat: Кількість повторів (береться медіана).
+    :param nsym: Кількість перевірочних байтів Reed-Solomon.
+    :return: Список словників (по одному на FORMAT_CASES).
+    """
+    carrier = make_carrier(size)
+    message = make_message(max(1, DWT.capacity(carrier.shape, nsym) // 10))
+    stego = DWT.encode_array(carrier, message, nsym)
+    results = []
+    for name, ext, options in FORMAT_CASES:
+        params = DWT.image_params(ext, **options)
+        write_s, _, data, _ = timed(lambda stats: DWT.image_to_bytes(stego, ext, params), repeat)
+        read_s, _, image, _ = timed(lambda stats: DWT.image_from_bytes(data), repeat)
+        results.append({
+            "format": name,
+            "size": size,
+            "write_s": write_s,
+            "read_s": read_s,
+            "file_mb": len(data) / 1e6,
+            "ratio": len(data) / stego.nbytes,
+            "write_mb_s": stego.nbytes / 1e6 / write_s if write_s else 0.0,
+            "correct": bool(np.array_equal(image, stego)) and DWT.decode_array(image, workers=1) == message,
+        })
+    return results
+
+
+def run_layouts(size, repeat, nsym):
+    """
+    Порівнює розкладки даних на повному навантаженні: місткість, швидкість, спотворення (PSNR), цілість.
+
+    :param size: Сторона зображення.
+    :param repeat: Кількість повторів (береться медіана).
+    :param nsym: Кількість перевірочних байтів Reed-Solomon.
+    :return: Список словників (по одному на LAYOUT_CASES).
+    """
+    carrier = make_carrier(size)
+    results = []
+    for name, layout in LAYOUT_CASES:
+        capacity = DWT.capacity(carrier.shape, nsym, layout)
+        message = np.random.default_rng(0).integers(0, 256, capacity, dtype=np.uint8).tobytes()
+        encode_s, _, stego, _ = timed(lambda stats: DWT.encode_array(carrier, message, nsym, stats=stats,
+                                                                     compression=None, layout=layout), repeat)
+        decode_s, _, decoded, _ = timed(lambda stats: DWT.decode_array(stego, stats), repeat)
+        error = np.mean((stego.astype(np.float64) - carrier) ** 2)
+        results.append({
+            "layout": name,
+            "size": size,
+            "capacity_bytes": capacity,
+            "capacity_ratio": capacity / DWT.capacity(carrier.shape, nsym),
+            "encode_s": encode_s,
+            "decode_s": decode_s,
+            "encode_mb_s": capacity / 1e6 / encode_s if encode_s else 0.0,
+            "psnr_db": 10 * np.log10(255 ** 2 / error) if error else float("inf"),
+            "correct": decoded == message,
+        })
+    return results
+
+
+def timed(function, repeat):
+    """
+    Виконує функцію repeat разів і вимірює час.
+
+    :param function: Функція function(stats), що виконує вимірювану дію.
+    :param repeat: Кількість повторів.
+    :return: Кортеж (медіана секунд, мінімум секунд, результат останнього виклику, Stats останнього виклику).
+    """
+    times = []
+    result = stats = None
+    for _ in range(repeat):
+        stats = Stats()
+        start = time.perf_counter()
+        result = function(stats)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times), result, stats
+
+
+def run_case(size, fraction, repeat, ext, nsym):
+    """
+    Вимірює один випадок: кодування, декодування та повний цикл через байти файлу.
+
+    :param size: Сторона зображення.
+    :param fraction: Частка місткості, яку займає повідомлення.
+    :param repeat: Кількість повторів.
+    :param ext: Формат файлу для повного циклу (".png", ".bmp", ...).
+    :param nsym: Кількість перевірочних байтів Reed-Solomon.
+    :return: Словник з результатами.
+    """
+    carrier = make_carrier(size)
+    length = max(1, int(DWT.capacity(carrier.shape, nsym) * fraction))
+    message = make_message(length)
+    rss_reset = reset_peak_rss()
+
+    encode_s, encode_min, stego, encode_stats = timed(
+        lambda stats: DWT.encode_array(carrier, message, nsym, stats=stats), repeat)
+    decode_s, decode_min, decoded, decode_stats = timed(
+        lambda stats: DWT.decode_array(stego, stats=stats), repeat)
+
+    # Робоча пам'ять понад саме зображення: кодування на місці та декодування в одному потоці
+    target = carrier.copy()
+    encode_peak = traced_peak(lambda: DWT.encode_array(target, message, nsym, copy=False, workers=1))
+    decode_peak = traced_peak(lambda: DWT.decode_array(target, workers=1))
+
+    carrier_bytes = cv2.imencode(ext, carrier)[1].tobytes()
+    roundtrip_s, roundtrip_min, roundtrip, _ = timed(
+        lambda stats: DWT.decode_bytes(DWT.encode_bytes(carrier_bytes, message, ext, nsym, stats), stats), repeat)
+
+    return {
+        "case": f"{size}x{size}@{fraction:g}",
+        "size": size,
+        "fraction": fraction,
+        "payload_bytes": length,
+        "encode_s": encode_s,
+        "encode_min_s": encode_min,
+        "decode_s": decode_s,
+        "decode_min_s": decode_min,
+        "roundtrip_s": roundtrip_s,
+        "roundtrip_min_s": roundtrip_min,
+        "encode_stages": {stage: total["seconds"] for stage, total in encode_stats.summary().items()},
+        "decode_stages": {stage: total["seconds"] for stage, total in decode_stats.summary().items()},
+        "encode_mb_s": carrier.nbytes / 1e6 / encode_s if encode_s else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "encode_peak_mb": encode_peak / 1e6,
+        "decode_peak_mb": decode_peak / 1e6,
+        "peak_ratio": max(encode_peak, decode_peak) / carrier.nbytes,
+        "carrier_mb": carrier.nbytes / 1e6,
+        "peak_rss_is_per_case": rss_reset,
+        "correct": decoded == message and roundtrip == message,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Порівнює результати з базовою лінією.
+
+    :param results: Список результатів поточного запуску.
+    :param baseline: Список результатів базової лінії.
+    :param threshold: Допустиме сповільнення (0.2 = на 20%).
+    :return: Список описів регресій.
+    """
+    previous = {result["case"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(result["case"])
+        if old is None:
+            continue
+        for metric in ("encode_s", "decode_s", "roundtrip_s"):
+            if old[metric] and result[metric] > old[metric] * (1 + threshold):
+                regressions.append(f"{result['case']} {metric}: {old[metric]:.4f} -> {result[metric]:.4f} с "
+                                   f"(+{(result[metric] / old[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DWT steganography throughput and payload scaling.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Carrier side lengths.")
+    parser.add_argument("--fractions", type=float, nargs="+", default=DEFAULT_FRACTIONS,
+                        help="Payload sizes as fractions of carrier capacity.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per case (median is reported).")
+    parser.add_argument("--format", default=".png", help="File format for the round-trip case.")
+    parser.add_argument("--nsym", type=nsym_value, default=DWT.DEFAULT_NSYM, metavar="1-254",
+                        help="Reed-Solomon parity bytes.")
+    parser.add_argument("-o", "--output", help="Write results JSON here.")
+    parser.add_argument("--save-baseline", help="Save results as a baseline JSON.")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%).")
+    parser.add_argument("--max-peak-ratio", type=float, nargs="?", const=PEAK_RATIO_TARGET,
+                        help=f"Fail if encode/decode working memory exceeds this fraction of the image size "
+                             f"(default target {PEAK_RATIO_TARGET}). Only carriers of at least "
+                             f"{PEAK_MIN_SIZE}x{PEAK_MIN_SIZE} are checked: below that, fixed buffers dominate.")
+    parser.add_argument("--formats", action="store_true",
+                        help="Also compare lossless output formats (write/read speed, file size) on the largest size.")
+    parser.add_argument("--layouts", action="store_true",
+                        help="Also compare payload layouts (capacity, speed, PSNR) at full capacity "
+                             "on the largest size.")
+    parser.add_argument("--cold-start", action="store_true",
+                        help="Also measure `python -m DWT_cli` start-up (inspect/decode of a small image).")
+    parser.add_argument("--max-cold-start-ms", type=float, nargs="?", const=COLD_START_TARGET_MS,
+                        help=f"Fail if DWT_cli start-up exceeds a bare interpreter by more than this "
+                             f"(default target {COLD_START_TARGET_MS} ms; implies --cold-start).")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        for fraction in args.fractions:
+            result = run_case(size, fraction, args.repeat, args.format, args.nsym)
+            results.append(result)
+            print(f"{result['case']:>16}  payload {result['payload_bytes']:>10} Б  "
+                  f"encode {result['encode_s'] * 1000:9.2f} мс  decode {result['decode_s'] * 1000:9.2f} мс  "
+                  f"roundtrip {result['roundtrip_s'] * 1000:9.2f} мс  RSS {result['peak_rss_mb']:8.1f} МБ  "
+                  f"пік {result['peak_ratio']:5.2f}x  "
+                  f"{'OK' if result['correct'] else 'ПОМИЛКА'}")
+
+    report = {"machine": platform.platform(), "python": platform.python_version(), "results": results}
+    if args.formats:
+        report["formats"] = run_formats(max(args.sizes), args.repeat, args.nsym)
+        for result in report["formats"]:
+            print(f"{result['format']:>16}  {result['size']}x{result['size']}  "
+                  f"запис {result['write_s'] * 1000:9.2f} мс  читання {result['read_s'] * 1000:9.2f} мс  "
+                  f"файл {result['file_mb']:8.2f} МБ ({result['ratio']:.2f}x)  "
+                  f"{'OK' if result['correct'] else 'ПОМИЛКА'}")
+    if args.layouts:
+        report["layouts"] = run_layouts(max(args.sizes), args.repeat, args.nsym)
+        for result in report["layouts"]:
+            print(f"{result['layout']:>16}  {result['size']}x{result['size']}  "
+                  f"місткість {result['capacity_bytes']:>10} Б ({result['capacity_ratio']:.1f}x)  "
+                  f"encode {result['encode_s'] * 1000:9.2f} мс  decode {result['decode_s'] * 1000:9.2f} мс  "
+                  f"PSNR {result['psnr_db']:6.2f} дБ  {'OK' if result['correct'] else 'ПОМИЛКА'}")
+    if args.cold_start or args.max_cold_start_ms is not None:
+        report["cold_start_ms"] = cold_start(max(args.repeat, 3))
+        print("Холодний запуск: " + "  ".join(f"{name} {ms:.1f} мс" for name, ms in report["cold_start_ms"].items()))
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+
+    failed = not all(result["correct"] for result in results + report.get("formats", []) + report.get("layouts", []))
+    if args.max_peak_ratio is not None:
+        checked = [result for result in results if result["size"] >= PEAK_MIN_SIZE]
+        if len(checked) < len(results):
+            print(f"Пік пам'яті не перевіряється для носіїв менших за {PEAK_MIN_SIZE}x{PEAK_MIN_SIZE}")
+        for result in checked:
+            if result["peak_ratio"] > args.max_peak_ratio:
+                print(f"Перевищено пік пам'яті: {result['case']} {result['peak_ratio']:.2f}x > {args.max_peak_ratio}x")
+                failed = True
+    if args.max_cold_start_ms is not None:
+        overhead = max(report["cold_start_ms"]["inspect"], report["cold_start_ms"]["decode"]) - \
+            report["cold_start_ms"]["python"]
+        if overhead > args.max_cold_start_ms:
+            print(f"Повільний холодний запуск: +{overhead:.1f} мс > {args.max_cold_start_ms} мс")
+            failed = True
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print("Регресія:", regression)
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import hashlib  # Ключі кешу (вміст файлу або шлях + час зміни + розмір)
+import os  # Робота з файлами кешу
+import tempfile  # Атомарний запис записів на диск
+import threading  # Кеш використовується з фонових потоків GUI
+from collections import OrderedDict  # LRU-порядок записів у пам'яті
+
+
+class DecodeCache:
+    """
+    Кеш декодованих повідомлень з витісненням LRU.
+
+    Ключ - хеш вмісту файлу або (швидка перевірка) хеш шляху, часу зміни та розміру.
+    Записи зберігаються в пам'яті, а якщо задано directory - ще й у каталозі на диску,
+    який можуть спільно використовувати кілька процесів (запис атомарний, через os.replace).
+    Обидва рівні обмежені кількістю записів і сумарним розміром. Зберігаються лише успішно
+    декодовані непорожні повідомлення: невдале декодування повторюється при кожному запиті.
+    """
+
+    TEXT, BINARY = b"T", b"B"  # Тип збереженого значення (перший байт запису)
+    DEFAULT_MAX_ENTRIES = 256
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 МБ
+    HASH_CHUNK = 1024 * 1024  # Читання файлу для хешу вмісту частинами по 1 МБ
+    KEY_LENGTH = 64  # Довжина ключа: шістнадцятковий SHA-256
+    KEY_DIGITS = frozenset("0123456789abcdef")
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, directory=None,
+                 content_hash=False):
+        """
+        :param max_entries: Максимальна кількість записів (у пам'яті та на диску окремо).
+        :param max_bytes: Максимальний сумарний розмір записів у байтах.
+        :param directory: Каталог дискового кешу (None - лише пам'ять).
+        :param content_hash: True - ключ за вмістом файлу, False - за шляхом, часом зміни та розміром.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.content_hash = content_hash
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, path):
+        """
+        Обчислює ключ кешу для файлу.
+
+        :param path: Шлях до файлу зображення.
+        :return: Шістнадцятковий рядок.
+        """
+        if self.content_hash:
+            digest = hashlib.sha256()
+            with open(path, "rb") as image_file:
+                for chunk in iter(lambda: image_file.read(DecodeCache.HASH_CHUNK), b""):
+                    digest.update(chunk)
+            return digest.hexdigest()
+        info = os.stat(path)
+        fingerprint = f"{os.path.realpath(path)}\0{info.st_mtime_ns}\0{info.st_size}"
+        return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def is_entry(name):
+        """
+        Перевіряє, чи файл у каталозі кешу є записом кешу (а не чужим файлом).
+
+        :param name: Ім'я файлу.
+        :return: True, якщо ім'я - ключ кешу (див. key).
+        """
+        return len(name) == DecodeCache.KEY_LENGTH and DecodeCache.KEY_DIGITS.issuperset(name)
+
+    @staticmethod
+    def pack(value):
+        """
+        :param value: Повідомлення (рядок або bytes).
+        :return: Байти запису.
+        """
+        if isinstance(value, str):
+            return DecodeCache.TEXT + value.encode('utf-8')
+        return DecodeCache.BINARY + bytes(value)
+
+    @staticmethod
+    def unpack(record):
+        """
+        :param record: Байти запису.
+        :return: Повідомлення (рядок або bytes).
+        """
+        if record[:1] == DecodeCache.TEXT:
+            return record[1:].decode('utf-8')
+        return record[1:]
+
+    def get(self, key):
+        """
+        Повертає збережене повідомлення.
+
+        :param key: Ключ (див. key).
+        :return: Повідомлення або None, якщо запису немає.
+        """
+        with self.lock:
+            record = self.entries.get(key)
+            if record is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return DecodeCache.unpack(record)
+
+        record = self.read_disk(key)
+        with self.lock:
+            if record is None or len(record) <= len(DecodeCache.TEXT):  # Порожні записи старих версій - промах
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.remember(key, record)
+        return DecodeCache.unpack(record)
+
+    def put(self, key, value):
+        """
+        Зберігає повідомлення; None і порожні повідомлення (невдале декодування) не зберігаються.
+
+        :param key: Ключ (див. key).
+        :param value: Повідомлення (рядок або bytes).
+        """
+        if not value:
+            return
+        record = DecodeCache.pack(value)
+        with self.lock:
+            self.remember(key, record)
+        self.write_disk(key, record)
+
+    def remember(self, key, record):
+        """ Додає запис у пам'ять і витісняє найдавніші (викликається під self.lock). """
+        if len(record) > self.max_bytes:
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self.entries[key] = record
+        self.size += len(record)
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def read_disk(self, key):
+        """
+        :param key: Ключ.
+        :return: Байти запису з дискового кешу або None.
+        """
+        if not self.directory:
+            return None
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as entry:
+                record = entry.read()
+            os.utime(path)  # Час зміни - час останнього використання (для LRU)
+        except OSError:
+            return None  # Немає запису або його щойно витіснив інший процес
+        return record
+
+    def write_disk(self, key, record):
+        """
+        Атомарно записує запис у дисковий кеш і витісняє найдавніші.
+
+        :param key: Ключ.
+        :param record: Байти запису.
+        """
+        if not self.directory or len(record) > self.max_bytes:
+            return
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(descriptor, "wb") as entry:
+            entry.write(record)
+        os.replace(temporary, os.path.join(self.directory, key))
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not DecodeCache.is_entry(entry.name):
+                continue  # Незавершені записи та чужі файли
+            try:
+                info = entry.stat()
+            except OSError:
+                continue
+            entries.append((info.st_mtime_ns, info.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            total -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Вже видалено іншим процесом
+            with self.lock:
+                self.evictions += 1
+
+    def clear(self):
+        """ Видаляє всі записи (у пам'яті та на диску); інші файли в каталозі кешу не зачіпаються. """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+        if self.directory:
+            for entry in os.scandir(self.directory):
+                if not DecodeCache.is_entry(entry.name):
+                    continue
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        """
+        :return: Словник лічильників: hits, misses, evictions, entries, bytes (записи в пам'яті).
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self.entries), "bytes": self.size}
@@ -0,0 +1,317 @@
+import argparse  # Розбір аргументів командного рядка
+import sys  # Потоки stdout/stderr, код виходу
+
+# Решта модулів (NumPy, OpenCV, PIL, рушій DWT) імпортується всередині підкоманд: кожна
+# підкоманда завантажує лише те, що їй потрібно, а GUI і графіки не імпортуються зовсім.
+# Так запуск `python -m DWT_cli ...` у циклі оболонки не впирається в імпорти.
+
+COMPRESSION_CHOICES = ("auto", "zlib", "lzma", "none")
+PNG_STRATEGY_CHOICES = ("default", "filtered", "huffman", "rle", "fixed")  # Ключі DWT.PNG_STRATEGIES
+TIFF_COMPRESSION_CHOICES = ("none", "lzw", "deflate", "packbits")  # Ключі DWT.TIFF_COMPRESSIONS
+DEFAULT_NSYM = 20  # DWT.DEFAULT_NSYM
+NSYM_RANGE = range(1, 255)  # DWT_fec.Fec.NSYM_RANGE
+
+
+def nsym_value(value):
+    """
+    Тип аргументу --nsym: ціле число в межах NSYM_RANGE (перевіряється до запуску рушія).
+
+    :param value: Рядок з командного рядка.
+    :return: int.
+    :raises argparse.ArgumentTypeError: Якщо значення поза межами 1..254.
+    """
+    nsym = int(value)
+    if nsym not in NSYM_RANGE:
+        raise argparse.ArgumentTypeError(f"must be between {NSYM_RANGE.start} and {NSYM_RANGE.stop - 1}, got {nsym}")
+    return nsym
+
+
+def add_image_arguments(parser):
+    """
+    Додає параметри формату результату (див. DWT.image_params).
+
+    :param parser: argparse.ArgumentParser.
+    """
+    group = parser.add_argument_group("output format (chosen by the output extension; lossless only)")
+    group.add_argument("--png-level", type=int, choices=range(10), metavar="0-9",
+                       help="PNG zlib level: 0-1 fast, 9 smallest and slowest.")
+    group.add_argument("--png-strategy", choices=PNG_STRATEGY_CHOICES,
+                       help="PNG zlib strategy (rle is fast and compact for photos).")
+    group.add_argument("--tiff-compression", choices=TIFF_COMPRESSION_CHOICES,
+                       help="TIFF compression (none also allows in-place tiled updates).")
+    group.add_argument("--allow-lossy", action="store_true",
+                       help="Only warn instead of failing when the output format is lossy (destroys the payload).")
+
+
+def image_options(args):
+    """
+    :param args: Аргументи з add_image_arguments.
+    :return: Словник image_options для DWT.encode_message та інших.
+    """
+    return {"png_level": args.png_level, "png_strategy": args.png_strategy,
+            "tiff_compression": args.tiff_compression, "allow_lossy": args.allow_lossy}
+
+
+def add_layout_arguments(parser):
+    """
+    Додає параметри розкладки даних (див. DWT_layout.Layout).
+
+    :param parser: argparse.ArgumentParser.
+    """
+    group = parser.add_argument_group("payload layout (default: bit-planes 3-4 of LL)")
+    group.add_argument("--planes", help="Bit-planes 1-7 of each coefficient, e.g. 3-4 or 2-5; "
+                                        "separate R/G/B values with '/', e.g. 3-4/3-4/2-5.")
+    group.add_argument("--subbands", help="Haar subbands that carry data: LL, LH, HL, HH, e.g. LL,HH; "
+                                          "separate R/G/B values with '/'.")
+
+
+def layout_option(args):
+    """
+    :param args: Аргументи з add_layout_arguments.
+    :return: Розкладка для DWT (None - за замовчуванням, словник - для всіх каналів, список - для R, G, B).
+    :raises ValueError: Якщо значень для каналів не 1 і не 3.
+    """
+    if not args.planes and not args.subbands:
+        return None
+    planes, subbands = (args.planes or "").split("/"), (args.subbands or "").split("/")
+    if len(planes) == len(subbands) == 1:
+        return {"planes": args.planes or None, "subbands": args.subbands or None}
+    if {len(planes), len(subbands)} - {1, 3}:
+        raise ValueError("--planes і --subbands приймають одне значення або три (R/G/B) через '/'.")
+    planes, subbands = planes * (3 // len(planes)), subbands * (3 // len(subbands))
+    return [{"planes": plane or None, "subbands": subband or None} for plane, subband in zip(planes, subbands)]
+
+
+def read_message(args, parser):
+    """
+    Повертає повідомлення для вбудовування з аргументів командного рядка.
+
+    :param args: Розібрані аргументи (message, message_file, payload_file).
+    :param parser: argparse.ArgumentParser для повідомлення про помилку.
+    :return: Рядок або bytes.
+    """
+    message = args.message
+    if args.message_file:
+        with open(args.message_file, encoding="utf-8") as message_file:
+            message = message_file.read()
+    if args.payload_file:
+        with open(args.payload_file, "rb") as payload_file:
+            message = payload_file.read()
+    if message is None:
+        parser.error("encode needs --message, --message-file or --payload-file")
+    return message
+
+
+def write_message(message, output=None):
+    """
+    Виводить декодоване повідомлення: текст - у stdout, bytes - у stdout без змін.
+
+    :param message: Рядок або bytes.
+    :param output: Шлях до файлу для запису (None - stdout).
+    """
+    if output:
+        with open(output, "wb") as output_file:
+            output_file.write(message if isinstance(message, bytes) else message.encode('utf-8'))
+    elif isinstance(message, bytes):
+        sys.stdout.buffer.write(message)
+        sys.stdout.buffer.flush()
+    else:
+        print(message)
+
+
+def run_encode(args, parser):
+    """ Підкоманда encode: вбудовує повідомлення в одне зображення. """
+    import contextlib
+
+    from DWT import DWT
+
+    if args.output is None and not args.in_place:
+        parser.error("encode needs an output path or --in-place")
+    message = read_message(args, parser)
+    # print() рушія йде в stderr, щоб stdout містив лише шлях до результату
+    with contextlib.redirect_stdout(sys.stderr):
+        output = DWT.encode_message(args.image, message, args.output, nsym=args.nsym,
+                                    workers=args.workers,
+                                    compression=None if args.compression == "none" else args.compression,
+                                    image_options=image_options(args), layout=layout_option(args),
+                                    overwrite=args.in_place)
+    print(output)
+    return 0
+
+
+def run_update(args, parser):
+    """ Підкоманда update: замінює повідомлення, змінюючи лише потрібні блоки пікселів. """
+    import contextlib
+    import os
+
+    from DWT import DWT
+
+    message = read_message(args, parser)
+    nsym = args.nsym
+    compression = None if args.compression == "none" else args.compression
+    layout = layout_option(args)
+    output, changed = args.output or args.image, None
+    if (output == args.image and layout is None
+            and os.path.splitext(args.image)[1].lower() in (".npy", ".tif", ".tiff")):
+        from DWT_tiles import Tiles
+        try:
+            changed = Tiles.update_tiled(args.image, message, nsym, compression=compression)  # Запис на місці
+        except ValueError:
+            changed = None  # Напр., стиснений TIFF - звичайний шлях через cv2
+    if changed is None:
+        with contextlib.redirect_stdout(sys.stderr):
+            output, changed = DWT.update_message(args.image, message, args.output, nsym, workers=args.workers,
+                                                 compression=compression, image_options=image_options(args),
+                                                 layout=layout)
+    print(f"Змінено блоків 2x2: {changed}", file=sys.stderr)
+    print(output)
+    return 0
+
+
+def run_decode(args, parser):
+    """ Підкоманда decode: одне зображення - повідомлення як є, кілька - JSONL (як у DWT_batch). """
+    import contextlib
+
+    from DWT import DWT
+
+    if args.output and len(args.images) > 1:
+        parser.error("--output needs a single image")
+    cache = None
+    if args.cache_dir:
+        from DWT_cache import DecodeCache
+        cache = DecodeCache(directory=args.cache_dir)
+
+    status = 0
+    for path in args.images:
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                message = DWT.decode_message(path, workers=args.workers, cache=cache)
+        except Exception as e:
+            print(f"{path}: {type(e).__name__}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        if len(args.images) == 1:
+            write_message(message, args.output)
+            continue
+
+        import base64
+        import json
+        result = {"path": path}
+        if isinstance(message, bytes):
+            result["message_base64"] = base64.b64encode(message).decode('ascii')
+        else:
+            result["message"] = message
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    return status
+
+
+def run_inspect(args, parser):
+    """ Підкоманда inspect: перевіряє заголовки без повного декодування (див. DWT_triage). """
+    import json
+
+    from DWT_triage import Triage
+
+    status = 0
+    for path in args.images:
+        result = Triage.inspect(path)
+        if not result["payload"]:
+            status = 1
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    return status
+
+
+def run_plan(args, parser):
+    """ Підкоманда plan: місткість зображень у заданій розкладці - лише за розміром, без читання пікселів. """
+    import json
+
+    from DWT import DWT
+    from DWT_shards import Shards
+
+    layout = layout_option(args)
+    length = None
+    if args.length is not None or args.payload_file:
+        import os
+        length = args.length if args.length is not None else os.path.getsize(args.payload_file)
+    status = 0
+    for path in args.images:
+        result = {"path": path, **DWT.plan(Shards.image_shape(path), args.nsym, layout, length)}
+        status |= not result.get("fits", True)
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    return status
+
+
+def build_parser():
+    """
+    :return: argparse.ArgumentParser з підкомандами encode, update, decode, inspect, plan.
+    """
+    parser = argparse.ArgumentParser(prog="python -m DWT_cli",
+                                     description="Headless DWT steganography: encode, update, decode, inspect "
+                                                 "or plan capacity.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    encode = commands.add_parser("encode", help="Embed a message into an image.")
+    encode.add_argument("image", help="Carrier image.")
+    encode.add_argument("output", nargs="?", help="Stego image (required unless --in-place).")
+    encode.add_argument("--in-place", action="store_true", help="Overwrite the carrier image with the stego image.")
+    encode.add_argument("-m", "--message", help="Message to embed.")
+    encode.add_argument("--message-file", help="Read the message to embed from a UTF-8 text file.")
+    encode.add_argument("--payload-file", help="Embed the raw bytes of this file.")
+    encode.add_argument("--nsym", type=nsym_value, default=DEFAULT_NSYM, metavar="1-254",
+                        help="Reed-Solomon parity bytes per 255-byte block.")
+    encode.add_argument("--compression", choices=COMPRESSION_CHOICES, default="auto",
+                        help="Payload compression (auto = only when it makes the payload smaller).")
+    encode.add_argument("-j", "--workers", type=int, default=None, help="Threads for the R/G/B channels.")
+    add_image_arguments(encode)
+    add_layout_arguments(encode)
+    encode.set_defaults(run=run_encode)
+
+    update = commands.add_parser("update", help="Replace the message, rewriting only the changed pixel blocks.")
+    update.add_argument("image", help="Stego image (.npy and uncompressed TIFF are patched in place).")
+    update.add_argument("output", nargs="?", help="Stego image (default: overwrite the input).")
+    update.add_argument("-m", "--message", help="New message.")
+    update.add_argument("--message-file", help="Read the new message from a UTF-8 text file.")
+    update.add_argument("--payload-file", help="Embed the raw bytes of this file.")
+    update.add_argument("--nsym", type=nsym_value, default=DEFAULT_NSYM, metavar="1-254",
+                        help="Reed-Solomon parity bytes per 255-byte block.")
+    update.add_argument("--compression", choices=COMPRESSION_CHOICES, default="auto",
+                        help="Payload compression (auto = only when it makes the payload smaller).")
+    update.add_argument("-j", "--workers", type=int, default=None, help="Threads for the R/G/B channels.")
+    add_image_arguments(update)
+    add_layout_arguments(update)
+    update.set_defaults(run=run_update)
+
+    decode = commands.add_parser("decode", help="Extract the message from one or more images.")
+    decode.add_argument("images", nargs="+", help="Stego images (several images print JSONL).")
+    decode.add_argument("-o", "--output", help="Write the payload to this file (single image only).")
+    decode.add_argument("--cache-dir", help="Shared on-disk decode cache directory.")
+    decode.add_argument("-j", "--workers", type=int, default=None, help="Threads for the R/G/B channels.")
+    decode.set_defaults(run=run_decode)
+
+    inspect = commands.add_parser("inspect", help="Check payload headers without decoding (exit 1 if any is missing).")
+    inspect.add_argument("images", nargs="+", help="Images to check.")
+    inspect.set_defaults(run=run_inspect)
+
+    plan = commands.add_parser("plan", help="Report usable payload bytes per image for a layout "
+                                            "(exit 1 if --length does not fit).")
+    plan.add_argument("images", nargs="+", help="Carrier images (only the size is read).")
+    plan.add_argument("--length", type=int, help="Payload size in bytes to check and split across channels.")
+    plan.add_argument("--payload-file", help="Use the size of this file as --length (not compressed first).")
+    plan.add_argument("--nsym", type=nsym_value, default=DEFAULT_NSYM, metavar="1-254",
+                        help="Reed-Solomon parity bytes per 255-byte block.")
+    add_layout_arguments(plan)
+    plan.set_defaults(run=run_plan)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args, parser)
+    except (OSError, ValueError) as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
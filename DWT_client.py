@@ -0,0 +1,297 @@
+import argparse  # Розбір аргументів командного рядка
+import base64  # Двійкові повідомлення в JSON-заголовку
+import json  # Заголовки запитів і відповідей
+import os  # Шлях до сокета за замовчуванням
+import socket  # З'єднання з демоном через Unix-сокет
+import struct  # Довжини частин кадру
+import sys  # Потоки stdout/stderr, код виходу
+import tempfile  # Каталог для сокета за замовчуванням
+
+from DWT_cli import nsym_value  # Лише argparse: рушій DWT_cli імпортує ліниво
+
+# Клієнт навмисно не імпортує NumPy, OpenCV чи рушій DWT: скрипт, що лише надсилає
+# завдання демону (DWT_daemon), запускається так само швидко, як і голий інтерпретатор.
+
+DEFAULT_SOCKET = os.environ.get("DWT_SOCKET") or os.path.join(tempfile.gettempdir(), f"dwt-{os.getuid()}.sock")
+FRAME = struct.Struct(">II")  # Довжина JSON-заголовка, довжина двійкових даних
+MAX_HEADER = 64 * 1024 * 1024  # Захист від пошкоджених кадрів
+MAX_BLOB = 1024 * 1024 * 1024
+
+
+class DaemonError(RuntimeError):
+    """
+    Помилка, повернута демоном.
+
+    kind: "busy" (черга заповнена), "timeout" (завдання не встигло), "error" (помилка рушія).
+    """
+
+    def __init__(self, message, kind="error"):
+        super().__init__(message)
+        self.kind = kind
+
+
+def recv_exact(sock, size):
+    """
+    Читає рівно size байтів.
+
+    :param sock: З'єднаний сокет.
+    :param size: Кількість байтів.
+    :return: bytearray або None, якщо з'єднання закрито до першого байта.
+    :raises ConnectionError: Якщо з'єднання обірвалося посередині.
+    """
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            if received == 0:
+                return None
+            raise ConnectionError("З'єднання обірвалося посередині кадру.")
+        received += count
+    return data
+
+
+def send_frame(sock, header, blob=b""):
+    """
+    Надсилає кадр: FRAME, JSON-заголовок (UTF-8), двійкові дані.
+
+    :param sock: З'єднаний сокет.
+    :param header: Словник, що серіалізується в JSON.
+    :param blob: Двійкові дані (bytes, bytearray або memoryview).
+    """
+    data = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    sock.sendall(FRAME.pack(len(data), len(blob)) + data)
+    if len(blob):
+        sock.sendall(blob)
+
+
+def recv_frame(sock):
+    """
+    Читає кадр (див. send_frame).
+
+    :param sock: З'єднаний сокет.
+    :return: Кортеж (заголовок, двійкові дані) або None, якщо з'єднання закрито.
+    :raises ConnectionError: Якщо кадр пошкоджений або обірваний.
+    """
+    sizes = recv_exact(sock, FRAME.size)
+    if sizes is None:
+        return None
+    header_size, blob_size = FRAME.unpack(sizes)
+    if header_size > MAX_HEADER or blob_size > MAX_BLOB:
+        raise ConnectionError(f"Завеликий кадр: {header_size} + {blob_size} байтів.")
+    header = json.loads(recv_exact(sock, header_size) or b"{}")
+    blob = bytes(recv_exact(sock, blob_size) or b"") if blob_size else b""
+    return header, blob
+
+
+class DaemonClient:
+    """
+    Тонкий клієнт DWT_daemon: одне постійне з'єднання, запит - відповідь.
+
+    Зображення передається шляхом (демон читає файл сам), байтами в кадрі або,
+    з shared_memory=True, через сегмент спільної пам'яті без копіювання в сокет.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, timeout=None):
+        """
+        :param socket_path: Шлях до Unix-сокета демона.
+        :param timeout: Тайм-аут сокета в секундах (None - без обмеження; тайм-аут завдання задає демон).
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """ Закриває з'єднання (наступний запит відкриє нове). """
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def request(self, header, blob=b""):
+        """
+        Надсилає запит і чекає відповідь.
+
+        :param header: Заголовок запиту (op та параметри).
+        :param blob: Двійкові дані запиту.
+        :return: Кортеж (заголовок відповіді, двійкові дані).
+        :raises DaemonError: Якщо демон повернув помилку.
+        """
+        if self.sock is None:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(self.timeout)
+            try:
+                self.sock.connect(self.socket_path)
+            except OSError:
+                self.close()
+                raise
+        try:
+            send_frame(self.sock, header, blob)
+            response = recv_frame(self.sock)
+        except OSError:
+            self.close()  # З'єднання в невідомому стані
+            raise
+        if response is None:
+            self.close()
+            raise ConnectionError("Демон закрив з'єднання.")
+        reply, data = response
+        if not reply.get("ok"):
+            raise DaemonError(reply.get("error", "невідома помилка"), reply.get("kind", "error"))
+        return reply, data
+
+    def submit(self, header, image, shared_memory=False):
+        """
+        Надсилає завдання із зображенням.
+
+        :param header: Заголовок запиту без джерела зображення.
+        :param image: Шлях до зображення (str) або байти закодованого зображення (PNG, BMP, ...).
+        :param shared_memory: Передати байти через multiprocessing.shared_memory, а не через сокет.
+        :return: Кортеж (заголовок відповіді, двійкові дані).
+        """
+        if isinstance(image, str):
+            return self.request({**header, "path": os.path.abspath(image)})
+        if not shared_memory:
+            return self.request(header, image)
+
+        from multiprocessing import shared_memory as shm  # Лише для цього режиму
+        segment = shm.SharedMemory(create=True, size=max(len(image), 1))
+        try:
+            segment.buf[:len(image)] = image
+            return self.request({**header, "shm": segment.name, "size": len(image), "pid": os.getpid()})
+        finally:
+            segment.close()
+            segment.unlink()
+
+    def ping(self):
+        """ :return: True, якщо демон відповідає. """
+        return self.request({"op": "ping"})[0]["ok"]
+
+    def stats(self):
+        """ :return: Словник статистики демона (див. Daemon.stats). """
+        return self.request({"op": "stats"})[0]["stats"]
+
+    def encode(self, image, message, output=None, ext=".png", nsym=None, compression="auto", timeout=None,
+               shared_memory=False, image_options=None, layout=None, overwrite=False):
+        """
+        Вбудовує повідомлення.
+
+        :param image: Шлях до зображення або його байти.
+        :param message: Повідомлення (рядок або bytes).
+        :param output: Шлях для результату на боці демона (None - повернути байти).
+        :param ext: Формат результату, якщо повертаються байти.
+        :param nsym: Кількість перевірочних байтів Reed-Solomon (None - за замовчуванням рушія).
+        :param compression: Стиснення: "auto", "zlib", "lzma" або None.
+        :param timeout: Тайм-аут завдання в секундах (None - тайм-аут демона).
+        :param shared_memory: Див. submit.
+        :param image_options: Параметри формату результату (див. DWT.image_params), наприклад {"png_level": 1}.
+        :param layout: Розкладка даних (див. DWT.plan), наприклад {"planes": "2-5", "subbands": "LL,HH"}.
+        :param overwrite: True - дозволити перезапис вхідного зображення-шляху (output=None або той самий шлях).
+        :return: Шлях до збереженого зображення або байти стеганозображення.
+        """
+        header = {"op": "encode", "output": os.path.abspath(output) if output else None, "ext": ext,
+                  "nsym": nsym, "compression": compression, "timeout": timeout, "image_options": image_options,
+                  "layout": layout, "overwrite": overwrite}
+        if isinstance(message, str):
+            header["message"] = message
+        else:
+            header["message_base64"] = base64.b64encode(bytes(message)).decode('ascii')
+        reply, data = self.submit(header, image, shared_memory)
+        return reply["output"] if "output" in reply else data
+
+    def decode(self, image, timeout=None, shared_memory=False):
+        """
+        Декодує повідомлення.
+
+        :param image: Шлях до зображення або його байти.
+        :param timeout: Тайм-аут завдання в секундах (None - тайм-аут демона).
+        :param shared_memory: Див. submit.
+        :return: Декодоване повідомлення (рядок або bytes).
+        """
+        reply, data = self.submit({"op": "decode", "timeout": timeout}, image, shared_memory)
+        return data if reply["binary"] else data.decode('utf-8')
+
+    def triage(self, image, timeout=None, shared_memory=False):
+        """
+        Перевіряє заголовки без повного декодування (див. DWT_triage).
+
+        :param image: Шлях до зображення або його байти.
+        :param timeout: Тайм-аут завдання в секундах (None - тайм-аут демона).
+        :param shared_memory: Див. submit.
+        :return: Словник результату Triage.
+        """
+        return self.submit({"op": "triage", "timeout": timeout}, image, shared_memory)[0]["result"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send jobs to a running DWT daemon.")
+    parser.add_argument("command", choices=("ping", "stats", "encode", "decode", "triage"))
+    parser.add_argument("images", nargs="*", help="Images for encode/decode/triage (paths are read by the daemon).")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Daemon Unix socket.")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-job timeout in seconds.")
+    encode = parser.add_argument_group("encode")
+    encode.add_argument("-m", "--message", help="Message to embed.")
+    encode.add_argument("--payload-file", help="Embed the raw bytes of this file.")
+    encode.add_argument("-o", "--output", help="Stego image, written by the daemon (default: PNG bytes to stdout).")
+    encode.add_argument("--in-place", action="store_true", help="Overwrite the carrier image.")
+    encode.add_argument("--nsym", type=nsym_value, default=None, metavar="1-254",
+                        help="Reed-Solomon parity bytes per 255-byte block (default: the daemon's).")
+    encode.add_argument("--compression", choices=("auto", "zlib", "lzma", "none"), default="auto",
+                        help="Payload compression (auto = only when it makes the payload smaller).")
+    args = parser.parse_args(argv)
+
+    if args.command == "encode":
+        if len(args.images) != 1:
+            parser.error("encode takes exactly one carrier image")
+        if args.payload_file:
+            with open(args.payload_file, "rb") as payload_file:
+                args.message = payload_file.read()
+        if args.message is None:
+            parser.error("encode needs --message or --payload-file")
+        if args.output and args.in_place:
+            parser.error("--output and --in-place are mutually exclusive")
+
+    status = 0
+    with DaemonClient(args.socket) as client:
+        if args.command == "encode":
+            try:
+                result = client.encode(args.images[0], args.message, args.output, nsym=args.nsym,
+                                       compression=None if args.compression == "none" else args.compression,
+                                       timeout=args.timeout, overwrite=args.in_place)
+            except (DaemonError, OSError) as e:
+                print(json.dumps({"path": args.images[0], "error": f"{type(e).__name__}: {e}"}, ensure_ascii=False))
+                return 1
+            if isinstance(result, bytes):
+                sys.stdout.buffer.write(result)
+                sys.stdout.buffer.flush()
+            else:
+                print(json.dumps({"path": args.images[0], "output": result}, ensure_ascii=False))
+        elif args.command == "ping":
+            print("ok" if client.ping() else "error")
+        elif args.command == "stats":
+            print(json.dumps(client.stats(), ensure_ascii=False, indent=2))
+        for path in args.images if args.command in ("decode", "triage") else ():
+            try:
+                if args.command == "decode":
+                    message = client.decode(path, args.timeout)
+                    result = {"path": path}
+                    if isinstance(message, bytes):
+                        result["message_base64"] = base64.b64encode(message).decode('ascii')
+                    else:
+                        result["message"] = message
+                else:
+                    result = client.triage(path, args.timeout)
+            except (DaemonError, OSError) as e:
+                result = {"path": path, "error": f"{type(e).__name__}: {e}"}
+                status = 1
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+import argparse  # Розбір аргументів командного рядка
+import base64  # Двійкові повідомлення в JSON-заголовку
+import os  # Файл сокета, кількість ядер
+import queue  # Обмежена черга завдань
+import signal  # Коректна зупинка за SIGTERM/SIGINT
+import socket  # Unix-сокет
+import sys  # Потоки stdout/stderr, код виходу
+import threading  # Пул робочих потоків і потоки з'єднань
+import time  # Тривалість завдань і час роботи
+import traceback  # Звільнення кадрів помилки, що тримають вид на спільну пам'ять
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeout  # Результат завдання
+
+from DWT import DWT
+from DWT_cache import DecodeCache
+from DWT_client import DEFAULT_SOCKET, recv_frame, send_frame
+from DWT_triage import Triage
+
+
+class Daemon:
+    """
+    Локальний демон, що тримає рушій DWT "теплим" і виконує завдання з Unix-сокета.
+
+    Інтерпретатор, імпорти (NumPy, OpenCV, reedsolo), таблиці GF(2^8), робочі буфери Haar
+    і кеш декодування живуть увесь час роботи демона. Завдання (encode, decode, triage)
+    приходять кадрами DWT_client, стають в обмежену чергу і виконуються пулом потоків:
+    якщо черга заповнена довше за wait секунд, клієнт отримує "busy" (зворотний тиск), а якщо
+    завдання не завершилося за timeout секунд від подання - "timeout". Завдання, що вже
+    виконується, не переривається: його результат просто відкидається.
+    """
+
+    OPERATIONS = ("encode", "decode", "triage")
+    DEFAULT_WORKERS = os.cpu_count() or 1
+    DEFAULT_JOB_TIMEOUT = 60.0  # секунд від подання до результату
+    DEFAULT_SUBMIT_WAIT = 1.0  # секунд очікування місця в черзі
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, workers=None, queue_size=None, job_timeout=DEFAULT_JOB_TIMEOUT,
+                 submit_wait=DEFAULT_SUBMIT_WAIT, cache_dir=None):
+        """
+        :param socket_path: Шлях до Unix-сокета.
+        :param workers: Кількість робочих потоків (None - кількість ядер).
+        :param queue_size: Максимум завдань у черзі (None - 4 * workers).
+        :param job_timeout: Тайм-аут завдання за замовчуванням (секунд).
+        :param submit_wait: Скільки чекати місця в заповненій черзі, перш ніж відповісти "busy".
+        :param cache_dir: Каталог дискового кешу декодування (None - лише пам'ять).
+        """
+        self.socket_path = socket_path
+        self.workers = workers or Daemon.DEFAULT_WORKERS
+        self.jobs = queue.Queue(maxsize=queue_size or 4 * self.workers)
+        self.job_timeout = job_timeout
+        self.submit_wait = submit_wait
+        self.cache = DecodeCache(directory=cache_dir)
+        self.listener = None
+        self.threads = []
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "timeouts": 0, "running": 0,
+                         "connections": 0}
+        self.operations = {operation: {"count": 0, "seconds": 0.0} for operation in Daemon.OPERATIONS}
+
+    def count(self, name, delta=1):
+        """ Змінює лічильник статистики. """
+        with self.lock:
+            self.counters[name] += delta
+
+    def stats(self):
+        """
+        :return: Словник: час роботи, розмір пулу й черги, лічильники завдань, середній час за операціями, кеш.
+        """
+        with self.lock:
+            operations = {operation: {"count": total["count"], "seconds": round(total["seconds"], 6),
+                                      "mean_s": round(total["seconds"] / total["count"], 6) if total["count"] else 0.0}
+                          for operation, total in self.operations.items()}
+            return {"uptime_s": round(time.monotonic() - self.started, 3), "workers": self.workers,
+                    "queue_size": self.jobs.maxsize, "queued": self.jobs.qsize(), **self.counters,
+                    "operations": operations, "cache": self.cache.stats()}
+
+    @staticmethod
+    def attach_shared(name, owner_pid=None):
+        """
+        Підключається до сегмента спільної пам'яті клієнта, не беручи його у володіння.
+
+        :param name: Ім'я сегмента.
+        :param owner_pid: PID процесу клієнта, що створив сегмент (None - невідомий, інший процес).
+        :return: multiprocessing.shared_memory.SharedMemory.
+        """
+        from multiprocessing import resource_tracker, shared_memory
+
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name=name, track=False)
+        segment = shared_memory.SharedMemory(name=name)
+        # До Python 3.13 підключення реєструє сегмент у трекері процесу, і трекер демона видалив би його
+        # під час зупинки. У процесі клієнта (демон у тому самому процесі) реєстрація належить клієнту.
+        if owner_pid != os.getpid():
+            resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+    @staticmethod
+    def detach_shared(segment, view):
+        """
+        Відключається від сегмента (див. attach_shared); сам сегмент видаляє клієнт.
+
+        :param segment: multiprocessing.shared_memory.SharedMemory.
+        :param view: Вид на segment.buf, переданий завданню (або None).
+        """
+        try:
+            if view is not None:
+                view.release()  # Вид на сегмент має зникнути до close()
+            segment.close()
+        except BufferError:
+            pass  # Вид ще експортовано: сегмент закриється разом з останнім посиланням, результат завдання важливіший
+
+    def decode_path(self, path):
+        """
+        Декодує файл з використанням кешу демона.
+
+        :param path: Шлях до зображення.
+        :return: Декодоване повідомлення (рядок або bytes).
+        """
+        key = self.cache.key(path)
+        message = self.cache.get(key)
+        if message is None:
+            with open(path, "rb") as image_file:
+                message = DWT.decode_bytes(image_file.read(), workers=1)
+            self.cache.put(key, message)
+        return message
+
+    def execute(self, header, data):
+        """
+        Виконує завдання рушієм DWT (у робочому потоці).
+
+        :param header: Заголовок запиту.
+        :param data: Байти зображення (bytes або memoryview) або None, якщо задано path.
+        :return: Кортеж (заголовок відповіді, двійкові дані).
+        """
+        operation, path = header["op"], header.get("path")
+        if operation == "triage":
+            result = Triage.inspect(path) if data is None else Triage.inspect_array(DWT.image_from_bytes(data))
+            return {"ok": True, "result": result}, b""
+
+        if operation == "decode":
+            message = self.decode_path(path) if data is None else DWT.decode_bytes(data, workers=1)
+            binary = isinstance(message, bytes)
+            return {"ok": True, "binary": binary}, message if binary else message.encode('utf-8')
+
+        message = header.get("message")
+        if message is None:
+            message = base64.b64decode(header.get("message_base64") or "")
+        nsym = DWT.DEFAULT_NSYM if header.get("nsym") is None else header["nsym"]
+        compression, options, layout = header.get("compression"), header.get("image_options"), header.get("layout")
+        output, overwrite = header.get("output"), bool(header.get("overwrite"))
+        if data is None and (output or overwrite):
+            output = DWT.encode_message(path, message, output, nsym, workers=1, compression=compression,
+                                        image_options=options, layout=layout, overwrite=overwrite)
+            return {"ok": True, "output": output}, b""
+        if data is None:
+            with open(path, "rb") as image_file:  # Без output результат повертається байтами, носій не змінюється
+                data = image_file.read()
+        encoded = DWT.encode_bytes(data, message, os.path.splitext(output)[1] if output else header.get("ext", ".png"),
+                                   nsym, workers=1, compression=compression, image_options=options, layout=layout)
+        if not output:
+            return {"ok": True}, encoded
+        with open(output, "wb") as output_file:
+            output_file.write(encoded)
+        return {"ok": True, "output": output}, b""
+
+    def run_job(self, header, blob):
+        """
+        Виконує одне завдання: готує джерело зображення (сокет, спільна пам'ять або шлях) і викликає execute.
+
+        :return: Кортеж (заголовок відповіді, двійкові дані).
+        """
+        start = time.perf_counter()
+        segment = data = None
+        try:
+            if header.get("shm"):
+                segment = Daemon.attach_shared(header["shm"], header.get("pid"))
+                data = segment.buf[:header["size"]]
+            elif blob:
+                data = blob
+            elif not header.get("path"):
+                raise ValueError("Завдання без зображення: потрібен path, байти або shm.")
+            return self.execute(header, data)
+        except Exception as e:
+            if segment is not None:
+                traceback.clear_frames(e.__traceback__)  # Масиви в кадрах помилки тримали б вид на сегмент
+            raise
+        finally:
+            if segment is not None:
+                Daemon.detach_shared(segment, data)
+            with self.lock:
+                self.operations[header["op"]]["count"] += 1
+                self.operations[header["op"]]["seconds"] += time.perf_counter() - start
+
+    def worker(self):
+        """ Робочий потік: бере завдання з черги, доки не отримає None або демон не почне зупинку. """
+        while True:
+            job = self.jobs.get()
+            if job is None or self.stopping.is_set():
+                if job is not None:
+                    job[0].cancel()  # Демон зупиняється: завдання з черги не виконуються
+                return
+            future, header, blob = job
+            if not future.set_running_or_notify_cancel():
+                continue  # Клієнт уже отримав "timeout"
+            self.count("running")
+            try:
+                future.set_result(self.run_job(header, blob))
+                self.count("completed")
+            except Exception as e:
+                future.set_exception(e)
+                self.count("failed")
+            finally:
+                self.count("running", -1)
+
+    def dispatch(self, header, blob):
+        """
+        Обробляє запит з'єднання: службові запити - одразу, завдання - через чергу.
+
+        :param header: Заголовок запиту.
+        :param blob: Двійкові дані запиту.
+        :return: Кортеж (заголовок відповіді, двійкові дані).
+        """
+        operation = header.get("op")
+        if operation == "ping":
+            return {"ok": True}, b""
+        if operation == "stats":
+            return {"ok": True, "stats": self.stats()}, b""
+        if operation not in Daemon.OPERATIONS:
+            return {"ok": False, "kind": "error", "error": f"Невідома операція: {operation}"}, b""
+
+        if self.stopping.is_set():
+            return {"ok": False, "kind": "busy", "error": "Демон зупиняється."}, b""
+        timeout = header.get("timeout") or self.job_timeout
+        deadline = time.monotonic() + timeout
+        future = Future()
+        try:
+            self.jobs.put((future, header, blob), timeout=min(self.submit_wait, timeout))
+        except queue.Full:
+            self.count("rejected")
+            return {"ok": False, "kind": "busy", "error": f"Черга заповнена ({self.jobs.maxsize} завдань)."}, b""
+        self.count("submitted")
+
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeout:
+            future.cancel()  # Ще в черзі - не виконуватиметься; вже виконується - результат відкинеться
+            self.count("timeouts")
+            return {"ok": False, "kind": "timeout", "error": f"Завдання не завершилося за {timeout} с."}, b""
+        except CancelledError:
+            return {"ok": False, "kind": "busy", "error": "Демон зупиняється: завдання скасовано."}, b""
+        except Exception as e:
+            return {"ok": False, "kind": "error", "error": f"{type(e).__name__}: {e}"}, b""
+
+    def handle_connection(self, connection):
+        """ Потік з'єднання: послідовно обробляє запити, доки клієнт не закриє з'єднання. """
+        self.count("connections")
+        with connection:
+            try:
+                while not self.stopping.is_set():
+                    request = recv_frame(connection)
+                    if request is None:
+                        return
+                    send_frame(connection, *self.dispatch(*request))
+            except (OSError, ValueError) as e:
+                print(f"З'єднання закрито: {type(e).__name__}: {e}", file=sys.stderr)
+            finally:
+                self.count("connections", -1)
+
+    def bind(self):
+        """
+        Створює сокет, прибираючи файл сокета від попереднього (завершеного) демона.
+
+        :raises RuntimeError: Якщо на цьому сокеті вже працює інший демон.
+        """
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)  # Застарілий файл
+            else:
+                raise RuntimeError(f"Демон уже працює: {self.socket_path}")
+            finally:
+                probe.close()
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Лише власник: демон читає й пише файли від його імені. Права задаються umask під час bind(), а не
+        # chmod після нього, щоб сокет ні на мить не був доступний іншим (робочі потоки ще не запущено)
+        previous = os.umask(0o177)
+        try:
+            self.listener.bind(self.socket_path)
+        finally:
+            os.umask(previous)
+        self.listener.listen()
+
+    def serve_forever(self):
+        """ Запускає пул і приймає з'єднання до виклику stop(). """
+        self.bind()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self.worker, name=f"dwt-worker-{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        try:
+            while not self.stopping.is_set():
+                try:
+                    connection, _ = self.listener.accept()
+                except OSError:
+                    break  # Сокет закрито в stop()
+                threading.Thread(target=self.handle_connection, args=(connection,), daemon=True).start()
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        """ Зупиняє приймання з'єднань (можна викликати з обробника сигналу). """
+        self.stopping.set()
+        if self.listener is not None:
+            try:
+                self.listener.shutdown(socket.SHUT_RDWR)  # Будить accept() в іншому потоці
+            except OSError:
+                pass  # Не всі платформи дозволяють shutdown для сокета, що слухає
+            self.listener.close()
+
+    def shutdown(self):
+        """
+        Завершує робочі потоки після поточних завдань і видаляє файл сокета.
+
+        Не чекає місця в черзі: сигнал зупинки кладеться без блокування, а завдання, що ще в черзі,
+        скасовуються (робочий потік, що взяв завдання після stop(), скасовує його й завершується).
+        """
+        self.stopping.set()
+        for thread in self.threads:
+            while thread.is_alive():
+                try:
+                    self.jobs.put_nowait(None)
+                except queue.Full:
+                    pass  # Черга заповнена - робочі потоки звільнять місце, скасовуючи завдання
+                thread.join(0.1)
+        self.threads.clear()
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job[0].cancel()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a warm DWT steganography daemon on a Unix socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path (or $DWT_SOCKET).")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker threads (default: CPU count).")
+    parser.add_argument("--queue-size", type=int, default=None, help="Maximum queued jobs (default 4 x workers).")
+    parser.add_argument("--timeout", type=float, default=Daemon.DEFAULT_JOB_TIMEOUT, help="Default per-job timeout, s.")
+    parser.add_argument("--submit-wait", type=float, default=Daemon.DEFAULT_SUBMIT_WAIT,
+                        help="How long a full queue may block a client before it gets 'busy', s.")
+    parser.add_argument("--cache-dir", help="On-disk decode cache directory.")
+    args = parser.parse_args(argv)
+
+    daemon = Daemon(args.socket, args.workers, args.queue_size, args.timeout, args.submit_wait, args.cache_dir)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: daemon.stop())
+    print(f"Демон DWT слухає {args.socket} ({daemon.workers} потоків, черга {daemon.jobs.maxsize})", file=sys.stderr)
+    daemon.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,76 +1,58 @@
-import pywt
-import cv2
-import reedsolo
-import matplotlib.pyplot as plt
+import argparse  # Розбір аргументів командного рядка
+import sys  # Код виходу
 
+from DWT import DWT
+
+DEFAULT_IMAGE = "output_image1.png"
 #output_image.png
 #"output_image_copy3.png"
 #"output_image_copy1.png"
 #"output_image_copy.png"
-image = cv2.imread("output_image1.png") 
 
-image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)# to RGB
 
-# Відображення зображення
-plt.imshow(image)
-plt.axis("off")  # Прибрати координатні осі
-plt.title("Зображення output_image_copy.png")
-plt.show()
+def show_image(image_path):
+    """
+    Показує зображення у вікні matplotlib (блокує до закриття вікна).
+
+    :param image_path: Шлях до зображення.
+    """
+    import cv2  # Лише для показу: декодування читає зображення саме
+    import matplotlib.pyplot as plt  # Імпортується тільки з --show, щоб модуль працював без GUI
 
-# Розділяємо канали
-R, G, B = cv2.split(image)
+    image = cv2.imread(image_path)
+    if image is None:
+        raise FileNotFoundError("Зображення не знайдено!")
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)  # to RGB
 
-# Виконуємо DWT для кожного каналу
-coeffs_r = pywt.dwt2(R, 'haar')
-coeffs_g = pywt.dwt2(G, 'haar')
-coeffs_b = pywt.dwt2(B, 'haar')
+    # Відображення зображення
+    plt.imshow(image)
+    plt.axis("off")  # Прибрати координатні осі
+    plt.title(f"Зображення {image_path}")
+    plt.show()
 
-LL_r, (LH_r, HL_r, HH_r) = coeffs_r
-LL_g, (LH_g, HL_g, HH_g) = coeffs_g
-LL_b, (LH_b, HL_b, HH_b) = coeffs_b
 
-# Функція для вилучення повідомлення з коефіцієнтів DWT
-def decode_message_with_rs(matrix_coeff):
-    """
-    Вилучає повідомлення з коефіцієнтів DWT.
-    
-    :param matrix_coeff: Матриця коефіцієнтів DWT (наприклад, HH_r).
-    :return: Декодоване повідомлення.
+def decode_image(image_path, show=False):
     """
-    rows, cols = matrix_coeff.shape
-    binary_result = ""
-    decoded_message = ""
+    Вилучає повідомлення з зображення (LL каналів R, G, B, див. DWT.decode_message).
 
-    for row in range(rows):
-        for col in range(cols):
-            whole_part = int(matrix_coeff[row][col])  # Беремо цілу частину
-            # Витягуємо 4-й та 5-й біти (маска 0b11000 і зсув на 3 біти вправо)
-            two_bits = (whole_part & 0b11000) >> 3
-            binary_result += format(two_bits, '02b')  # Додаємо біти як рядок
+    :param image_path: Шлях до зображення.
+    :param show: True - спочатку показати зображення (show_image).
+    :return: Декодоване повідомлення (рядок або bytes).
+    """
+    if show:
+        show_image(image_path)
+    return DWT.decode_message(image_path)
 
-            while len(binary_result) >= 8:
-                byte = binary_result[:8]  # Беремо перші 8 бітів
-                binary_result = binary_result[8:]  # Обрізаємо ці 8 бітів
 
-                if byte == '00000000':  
-                    return decoded_message  # Зупиняємо функцію при стоп-байті
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode the message embedded in an image.")
+    parser.add_argument("image", nargs="?", default=DEFAULT_IMAGE, help=f"Stego image (default {DEFAULT_IMAGE}).")
+    parser.add_argument("--show", action="store_true", help="Show the image with matplotlib before decoding.")
+    args = parser.parse_args(argv)
 
-                decimal_value = int(byte, 2)  # Конвертуємо біти в десяткове число
-                decoded_message += chr(decimal_value)  # Додаємо символ до результату
+    decode_image(args.image, args.show)  # decode_message сам друкує результат
+    return 0
 
-     # ---- Декодування Reed-Solomon ----
-    try:
-        rs = reedsolo.RSCodec()  # Використовуємо той самий рівень надмірності (5 перевірочних бітів)
-        corrected_message = rs.decode(bytearray(decoded_message, 'utf-8'))
-        # Повертаємо лише оригінальне повідомлення (без перевірочних бітів)
-        return corrected_message.decode()
-    except reedsolo.ReedSolomonError:
-        print("\033[91mПомилка декодування Reed-Solomon! Дані пошкоджені\033[0m")
-        return ""
 
-# Вилучення повідомлення
-decoded_message = decode_message_with_rs(LL_r)
-decoded_message += decode_message_with_rs(LL_g)
-decoded_message += decode_message_with_rs(LL_b)
-    
-print("Декодоване повідомлення:", decoded_message)
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
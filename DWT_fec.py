@@ -0,0 +1,173 @@
+import functools  # Кешування кодеків за параметрами
+
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import reedsolo  # Бібліотека для кодування та декодування Reed-Solomon
+
+
+class Fec:
+    """
+    Табличний кодек Reed-Solomon, сумісний з reedsolo.RSCodec(nsym) (GF(2^8), prim=0x11d, generator=2, fcr=0).
+
+    Дані діляться на блоки по 255 - nsym байтів, як і в reedsolo, але всі блоки
+    кодуються одночасно операціями NumPy над таблицею множення GF(2^8).
+    Декодування спочатку пакетно рахує синдроми: блоки без помилок беруться як є,
+    і лише пошкоджені блоки виправляються через reedsolo.
+    """
+
+    NSIZE = 255  # Довжина блоку (дані + перевірочні байти)
+    PRIM = 0x11d  # Примітивний многочлен поля
+    GENERATOR = 2
+    NSYM_RANGE = range(1, NSIZE)  # Допустимі nsym: байт у заголовку каналу й хоча б байт даних у блоці
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def tables():
+        """
+        Будує таблиці поля GF(2^8).
+
+        :return: Кортеж (exp, mul): степені генератора (512 значень) і таблиця множення 256x256.
+        """
+        exp = np.zeros(512, dtype=np.uint8)
+        log = np.zeros(256, dtype=np.int64)
+        value = 1
+        for power in range(255):
+            exp[power] = value
+            log[value] = power
+            value <<= 1
+            if value & 0x100:
+                value ^= Fec.PRIM
+        exp[255:510] = exp[:255]
+
+        mul = np.zeros((256, 256), dtype=np.uint8)
+        mul[1:, 1:] = exp[(log[1:, None] + log[None, 1:]) % 255]
+        return exp, mul
+
+    @staticmethod
+    def check_nsym(nsym):
+        """
+        Перевіряє кількість перевірочних байтів.
+
+        :param nsym: Кількість перевірочних байтів на блок.
+        :return: nsym як int.
+        :raises ValueError: Якщо nsym не ціле число в межах 1..254.
+        """
+        if isinstance(nsym, bool) or not isinstance(nsym, (int, np.integer)) or nsym not in Fec.NSYM_RANGE:
+            raise ValueError(f"Кількість перевірочних байтів Reed-Solomon має бути в межах "
+                             f"{Fec.NSYM_RANGE.start}..{Fec.NSYM_RANGE.stop - 1}, отримано: {nsym!r}")
+        return int(nsym)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def generator_poly(nsym):
+        """
+        Породжувальний многочлен g(x) = (x - a^0)(x - a^1)...(x - a^(nsym-1)), старші коефіцієнти першими.
+
+        :param nsym: Кількість перевірочних байтів.
+        :return: Масив np.uint8 довжиною nsym + 1.
+        """
+        exp, mul = Fec.tables()
+        poly = np.array([1], dtype=np.uint8)
+        for power in range(nsym):
+            shifted = np.append(poly, 0)  # poly * x
+            shifted[1:] ^= mul[poly, exp[power]]  # + poly * a^power
+            poly = shifted
+        return poly
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def codec(nsym):
+        """
+        Повертає спільний екземпляр reedsolo.RSCodec для заданої кількості перевірочних байтів.
+
+        :param nsym: Кількість перевірочних байтів.
+        :return: reedsolo.RSCodec.
+        """
+        return reedsolo.RSCodec(nsym)
+
+    @staticmethod
+    def split_blocks(data, size):
+        """
+        Розкладає дані на блоки однакової довжини; останній (коротший) блок доповнюється
+        нулями спереду, що не змінює ні остачі від ділення, ні синдромів.
+
+        :param data: Масив np.uint8.
+        :param size: Довжина блоку.
+        :return: Кортеж (масив блоків (n, size), довжина останнього блоку).
+        """
+        count = -(-len(data) // size)
+        last = len(data) - (count - 1) * size
+        blocks = np.zeros((count, size), dtype=np.uint8)
+        blocks.reshape(-1)[:(count - 1) * size] = data[:(count - 1) * size]
+        blocks[-1, size - last:] = data[(count - 1) * size:]
+        return blocks, last
+
+    @staticmethod
+    def encode(data, nsym):
+        """
+        Кодує дані Reed-Solomon (результат байт у байт збігається з reedsolo.RSCodec(nsym).encode).
+
+        :param data: bytes або масив np.uint8.
+        :param nsym: Кількість перевірочних байтів на блок.
+        :return: bytes - блоки даних, кожен з перевірочними байтами в кінці.
+        :raises ValueError: Якщо nsym поза межами 1..254.
+        """
+        nsym = Fec.check_nsym(nsym)
+        data = np.frombuffer(bytes(data), dtype=np.uint8)
+        if len(data) == 0:
+            return b""
+        _, mul = Fec.tables()
+        generator = Fec.generator_poly(nsym)[1:]
+        chunk = Fec.NSIZE - nsym
+        blocks, last = Fec.split_blocks(data, chunk)
+
+        # Регістр зсуву (LFSR) для всіх блоків одночасно: остача від ділення на g(x)
+        remainder = np.zeros((len(blocks), nsym), dtype=np.uint8)
+        for column in range(chunk):
+            feedback = blocks[:, column] ^ remainder[:, 0]
+            remainder[:, :-1] = remainder[:, 1:]
+            remainder[:, -1] = 0
+            remainder ^= mul[feedback[:, None], generator[None, :]]
+
+        encoded = np.concatenate((blocks, remainder), axis=1).reshape(-1)
+        # Прибираємо нульове доповнення останнього блоку
+        return encoded[:(len(blocks) - 1) * Fec.NSIZE].tobytes() + \
+            encoded[(len(blocks) - 1) * Fec.NSIZE + chunk - last:].tobytes()
+
+    @staticmethod
+    def decode(data, nsym):
+        """
+        Декодує дані Reed-Solomon, виправляючи помилки лише у пошкоджених блоках.
+
+        :param data: Закодовані байти (bytes або масив np.uint8).
+        :param nsym: Кількість перевірочних байтів на блок.
+        :return: bytes - дані без перевірочних байтів.
+        :raises reedsolo.ReedSolomonError: Якщо блок неможливо виправити.
+        :raises ValueError: Якщо nsym поза межами 1..254.
+        """
+        nsym = Fec.check_nsym(nsym)
+        data = np.frombuffer(bytes(data), dtype=np.uint8)
+        if len(data) == 0:
+            return b""
+        exp, mul = Fec.tables()
+        blocks, last = Fec.split_blocks(data, Fec.NSIZE)
+        if last <= nsym:
+            raise reedsolo.ReedSolomonError("Забагато (або замало) даних для декодування")
+
+        # Синдроми S_i = c(a^i) для всіх блоків одночасно (схема Горнера)
+        roots = exp[:nsym]
+        syndromes = np.zeros((len(blocks), nsym), dtype=np.uint8)
+        for column in range(Fec.NSIZE):
+            syndromes = mul[syndromes, roots[None, :]] ^ blocks[:, column, None]
+
+        chunk = Fec.NSIZE - nsym
+        payload = blocks[:, :chunk].copy()
+        for index in np.flatnonzero(syndromes.any(axis=1)):
+            # Пошкоджений блок: виправлення через reedsolo (без нульового доповнення)
+            length = Fec.NSIZE if index < len(blocks) - 1 else last
+            block = blocks[index, Fec.NSIZE - length:]
+            corrected = Fec.codec(nsym).decode(bytearray(block.tobytes()))[0]
+            payload[index, chunk - len(corrected):] = np.frombuffer(bytes(corrected), dtype=np.uint8)
+
+        payload = payload.reshape(-1)
+        return payload[:(len(blocks) - 1) * chunk].tobytes() + \
+            payload[(len(blocks) - 1) * chunk + Fec.NSIZE - last:].tobytes()
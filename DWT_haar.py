@@ -0,0 +1,250 @@
+import threading  # Окремі робочі буфери для кожного потоку
+
+import numpy as np  # Бібліотека для роботи з числовими масивами
+
+
+class Haar:
+    """
+    Швидке Хаар-перетворення лише для підсмуги LL.
+
+    Значення LL збігаються з pywt.dwt2(channel, 'haar')[0] (режим 'symmetric'),
+    але обчислюються напряму з сум блоків 2x2, без LH/HL/HH. Деталі LH/HL/HH (для розкладок
+    DWT_layout) рахуються окремо й так само цілочисельно - див. block_sums.
+    """
+
+    _buffers = threading.local()  # Робочі масиви, що повторно використовуються (див. buffer)
+    BAND_ROWS = 256  # Рядків LL (блоків 2x2) за раз у apply_ll_delta та смугах DWT
+
+    @staticmethod
+    def ll_shape(shape):
+        """
+        Повертає розмір підсмуги LL для каналу заданого розміру.
+
+        :param shape: Розмір каналу (висота, ширина).
+        :return: Розмір LL (висота, ширина).
+        """
+        height, width = shape[:2]
+        return (height + 1) // 2, (width + 1) // 2
+
+    @staticmethod
+    def buffer(name, shape, dtype):
+        """
+        Повертає робочий масив, що повторно використовується в межах потоку.
+
+        Масив виділяється один раз і збільшується лише для більшого зображення, тож
+        канали та наступні зображення пакета не виділяють пам'ять заново. Вміст не
+        обнуляється; масив дійсний до наступного виклику з тим самим name у цьому потоці.
+
+        :param name: Назва буфера.
+        :param shape: Потрібний розмір.
+        :param dtype: Тип елементів.
+        :return: Масив заданого розміру (вид на буфер).
+        """
+        buffers = Haar._buffers.__dict__
+        size = int(np.prod(shape))
+        array = buffers.get(name)
+        if array is None or array.size < size or array.dtype != dtype:
+            array = buffers[name] = np.empty(size, dtype=dtype)
+        return array[:size].reshape(shape)
+
+    @staticmethod
+    def band_bytes(ll_cols):
+        """
+        :param ll_cols: Ширина LL.
+        :return: Розмір робочої смуги apply_ll_delta у байтах (ціла delta).
+        """
+        return Haar.BAND_ROWS * ll_cols * np.dtype(np.int16).itemsize
+
+    @staticmethod
+    def release_buffers():
+        """ Звільняє робочі масиви поточного потоку. """
+        Haar._buffers.__dict__.clear()
+
+    @staticmethod
+    def forward_sums(channel, rows=None, out=None):
+        """
+        Обчислює суми блоків 2x2 (тобто 2 * LL) у цілих числах, без float-копій каналу.
+
+        Непарні розміри доповнюються дзеркально (як у режимі 'symmetric' pywt).
+
+        :param channel: Канал зображення uint8 (2D масив, може бути видом на 3D масив).
+        :param rows: Кількість рядків LL, які потрібно обчислити (None - усі).
+        :param out: Масив uint16 розміром (rows, ширина LL) для результату (None - новий).
+        :return: Масив uint16 розміром (rows, ширина LL).
+        """
+        ll_rows, ll_cols = Haar.ll_shape(channel.shape)
+        rows = ll_rows if rows is None else min(rows, ll_rows)
+        if out is None:
+            out = np.empty((rows, ll_cols), dtype=np.uint16)
+
+        region = channel[:2 * rows]
+        top_left = region[0::2, 0::2]
+        top_right = region[0::2, 1::2]
+        bottom_left = region[1::2, 0::2]
+        cols, full_rows = top_right.shape[1], bottom_left.shape[0]
+
+        np.copyto(out, top_left)
+        out[:, :cols] += top_right
+        out[:full_rows] += bottom_left
+        out[:full_rows, :cols] += region[1::2, 1::2]
+        if cols < ll_cols:  # Непарна ширина: правий стовпець блоку повторює лівий
+            out[:, cols] += top_left[:, cols]
+            out[:full_rows, cols] += bottom_left[:, cols]
+        if full_rows < rows:  # Непарна висота: нижній рядок блоку повторює верхній
+            out[full_rows] += top_left[full_rows]
+            out[full_rows, :cols] += top_right[full_rows]
+            if cols < ll_cols:
+                out[full_rows, cols] += top_left[full_rows, cols]
+        return out
+
+    @staticmethod
+    def forward_ll(channel, rows=None):
+        """
+        Обчислює підсмугу LL з сум блоків 2x2.
+
+        :param channel: Канал зображення (2D масив, може бути видом на 3D масив).
+        :param rows: Кількість рядків LL, які потрібно обчислити (None - усі).
+        :return: Масив float32 розміром (rows, ширина LL); значення точні (кратні 0.5).
+        """
+        ll_rows, ll_cols = Haar.ll_shape(channel.shape)
+        rows = ll_rows if rows is None else min(rows, ll_rows)
+        ll = Haar.forward_sums(channel, rows, Haar.buffer("ll_sums", (rows, ll_cols), np.uint16)).astype(np.float32)
+        ll *= 0.5
+        return ll
+
+    @staticmethod
+    def block_sums(channel, rows=None, out=None):
+        """
+        Обчислює чотири суми кожного повного блоку 2x2 зі знаками Адамара (тобто 2 * LL, LH, HL, HH).
+
+        Для блоку [[a, b], [c, d]]: LL = a + b + c + d, LH = a + b - c - d, HL = a - b + c - d,
+        HH = a - b - c + d. Неповні блоки непарного краю пропускаються: після дзеркального
+        доповнення їхні деталі нульові й не можуть нести даних.
+
+        :param channel: Канал зображення uint8 (2D масив, може бути видом на 3D масив).
+        :param rows: Кількість рядків блоків (None - усі повні).
+        :param out: Масив int16 розміром (4, rows, ширина // 2) для результату (None - новий).
+        :return: Масив int16 розміром (4, rows, ширина // 2) у порядку LL, LH, HL, HH.
+        """
+        height, width = channel.shape[:2]
+        rows = height // 2 if rows is None else min(rows, height // 2)
+        cols = width // 2
+        if out is None:
+            out = np.empty((4, rows, cols), dtype=np.int16)
+
+        region = channel[:2 * rows, :2 * cols]
+        ll, lh, hl, hh = out
+        np.add(region[0::2, 0::2], region[0::2, 1::2], out=ll, dtype=np.int16)  # a + b
+        np.add(region[1::2, 0::2], region[1::2, 1::2], out=lh, dtype=np.int16)  # c + d
+        np.subtract(region[0::2, 0::2], region[0::2, 1::2], out=hl, dtype=np.int16)  # a - b
+        np.subtract(region[1::2, 0::2], region[1::2, 1::2], out=hh, dtype=np.int16)  # c - d
+        Haar.butterfly(ll, lh)
+        Haar.butterfly(hl, hh)
+        return out
+
+    @staticmethod
+    def butterfly(first, second):
+        """ Замінює (x, y) на (x + y, x - y) на місці, без тимчасових масивів. """
+        first += second
+        second *= -2
+        second += first
+
+    @staticmethod
+    def apply_block_delta(channel, delta):
+        """
+        Переносить зміну коефіцієнтів LL, LH, HL, HH повних блоків 2x2 у пікселі.
+
+        Це обернене перетворення Адамара: піксель a змінюється на (dLL + dLH + dHL + dHH) / 2 і т. д.
+        Для парних змін зсуви пікселів цілі, а кожна сума блоку змінюється рівно на 2 * d своєї
+        підсмуги (поза обмеженням 0..255). Для лише LL результат збігається з apply_ll_delta.
+
+        :param channel: Канал зображення (uint8), змінюється на місці (рядки блоків delta).
+        :param delta: Масив int16 (4, рядки, стовпці) - парні зміни коефіцієнтів; використовується як робочий.
+        :return: Кількість пікселів, обмежених до 0..255 (їхні блоки можуть нести хибні біти).
+        """
+        rows, cols = delta.shape[1:]
+        ll, lh, hl, hh = delta
+        Haar.butterfly(ll, lh)  # dLL ± dLH
+        Haar.butterfly(hl, hh)  # dHL ± dHH
+        Haar.butterfly(ll, hl)  # a, b
+        Haar.butterfly(lh, hh)  # c, d
+        delta >>= 1
+        clipped = 0
+        for (row, col), change in zip(((0, 0), (0, 1), (1, 0), (1, 1)), (ll, hl, lh, hh)):
+            view = channel[row:2 * rows:2, col:2 * cols:2]
+            region = Haar.buffer("region", view.shape, np.int16)
+            np.add(view, change, out=region, dtype=np.int16)
+            clipped += np.count_nonzero(region < 0) + np.count_nonzero(region > 255)
+            np.clip(region, 0, 255, out=region)
+            view[...] = region
+        return int(clipped)
+
+    @staticmethod
+    def apply_ll_delta(channel, delta):
+        """
+        Переносить зміну LL назад у пікселі без повного idwt2.
+
+        Зміна коефіцієнта LL на delta змінює кожен піксель свого блоку 2x2 на delta / 2.
+        Змінюються лише рядки пікселів, що відповідають рядкам delta. Ціла delta
+        обробляється точно в int16: піксель = floor((2 * p + delta) / 2), обмежений 0..255 -
+        так само, як і float-шлях, але без float-копій.
+
+        :param channel: Канал зображення (uint8), змінюється на місці.
+        :param delta: Різниця LL (нові - старі коефіцієнти), перші рядки LL.
+        """
+        height = channel.shape[0]
+        exact = delta.dtype.kind in "iu"
+
+        # Смугами рядків і по одній з чотирьох позицій блоку 2x2 - робочий масив не залежить від розміру зображення
+        for band in range(0, delta.shape[0], Haar.BAND_ROWS):
+            band_delta = delta[band:band + Haar.BAND_ROWS]
+            band_channel = channel[2 * band:min(2 * (band + len(band_delta)), height)]
+            for row, col in ((0, 0), (0, 1), (1, 0), (1, 1)):
+                view = band_channel[row::2, col::2]
+                Haar.apply_view_delta(view, band_delta[:view.shape[0], :view.shape[1]], exact)
+
+    @staticmethod
+    def patch_blocks(channel, rows, cols, delta):
+        """
+        Переносить цілу зміну окремих коефіцієнтів LL на їхні блоки 2x2 (лише ці пікселі).
+
+        Арифметика та сама, що й у apply_ll_delta: піксель = floor((2 * p + delta) / 2), обмежений 0..255.
+
+        :param channel: Канал зображення (uint8, можна np.memmap), змінюється на місці.
+        :param rows: Рядки коефіцієнтів LL (масив цілих).
+        :param cols: Стовпці коефіцієнтів LL (масив цілих).
+        :param delta: Зміна кожного коефіцієнта (int16).
+        """
+        height, width = channel.shape[:2]
+        for row, col in ((0, 0), (0, 1), (1, 0), (1, 1)):
+            pixel_rows, pixel_cols = 2 * rows + row, 2 * cols + col
+            inside = (pixel_rows < height) & (pixel_cols < width)  # Непарний край: половина блоку - доповнення
+            pixel_rows, pixel_cols = pixel_rows[inside], pixel_cols[inside]
+            region = channel[pixel_rows, pixel_cols].astype(np.int16)
+            region += region
+            region += delta[inside]
+            region >>= 1
+            np.clip(region, 0, 255, out=region)
+            channel[pixel_rows, pixel_cols] = region
+
+    @staticmethod
+    def apply_view_delta(view, change, exact):
+        """
+        Додає change / 2 до пікселів однієї позиції блоку 2x2.
+
+        :param view: Вид на пікселі (uint8), змінюється на місці.
+        :param change: Зміна LL того ж розміру.
+        :param exact: True - change цілочисельна (точна арифметика int16).
+        """
+        if exact:
+            region = Haar.buffer("region", view.shape, np.int16)
+            np.add(view, view, out=region, dtype=np.int16)
+            region += change
+            region >>= 1  # Ділення з округленням донизу, як і відкидання дробової частини після обмеження
+        else:
+            region = Haar.buffer("region_float", view.shape, np.float64)
+            np.multiply(change, 0.5, out=region)
+            region += view
+        # Обмеження значень та перетворення в uint8
+        np.clip(region, 0, 255, out=region)
+        view[...] = region
@@ -0,0 +1,234 @@
+import numpy as np  # Бібліотека для роботи з числовими масивами
+
+
+class Layout:
+    """
+    Розкладка даних: які бітові площини та які підсмуги Хаара несуть повідомлення.
+
+    Розкладка за замовчуванням - біти 3 і 4 цілої частини LL (заголовок версії 2).
+    Будь-яка інша записується в заголовок версії 3 (див. DWT.pack_header): сам заголовок
+    лежить там само, що й раніше, а дані починаються з наступного рядка блоків 2x2 - по
+    bits_per_block бітів на блок: для кожної вибраної підсмуги (у порядку SUBBANDS)
+    вибрані площини від старшої до молодшої.
+
+    Коефіцієнт підсмуги береться як w = (сума блоку зі знаками + BIAS) >> 1 (див. Haar.block_sums);
+    для LL біти 1..7 w збігаються з бітами цілої частини LL. Біт 0 не використовується:
+    його зміна потребувала б зсуву пікселів на пів рівня яскравості. Розкладки, що зсувають
+    пікселі більше ніж на MAX_PIXEL_SHIFT (див. pixel_shift), відхиляються: після обмеження
+    0..255 їхні дані не відновлюються.
+    """
+
+    SUBBANDS = ("LL", "LH", "HL", "HH")  # Порядок сум у Haar.block_sums
+    PLANES = range(1, 8)  # Допустимі бітові площини
+    DEFAULT = {"planes": (4, 3), "subbands": ("LL",)}
+    BIAS = 512  # Зсув сум деталей (-510..510) у невід'ємні; парний, тож біти 1..7 LL не змінюються
+    LIMITS = {"LL": (256, 766), "LH": (1, 511), "HL": (1, 511), "HH": (1, 511)}  # Досяжні значення w
+    MAX_PIXEL_SHIFT = 32  # Найбільший допустимий зсув пікселя (LL+HH 2-5, усі підсмуги 3-4)
+
+    @staticmethod
+    def parse_planes(planes):
+        """
+        Розбирає перелік бітових площин.
+
+        :param planes: Рядок ("3,4", "2-5"), ціле число або послідовність номерів площин.
+        :return: Кортеж площин від старшої до молодшої.
+        :raises ValueError: Якщо площин немає або вони поза межами 1..7.
+        """
+        if isinstance(planes, int):
+            planes = [planes]
+        elif isinstance(planes, str):
+            numbers = []
+            for item in planes.replace(" ", "").split(","):
+                first, _, last = item.partition("-")
+                numbers += range(int(first), int(last or first) + 1)
+            planes = numbers
+        planes = tuple(sorted({int(plane) for plane in planes}, reverse=True))
+        if not planes or any(plane not in Layout.PLANES for plane in planes):
+            raise ValueError(f"Бітові площини мають бути в межах 1..7, отримано: {planes}")
+        return planes
+
+    @staticmethod
+    def parse_subbands(subbands):
+        """
+        Розбирає перелік підсмуг.
+
+        :param subbands: Рядок ("LL,HH") або послідовність назв із SUBBANDS.
+        :return: Кортеж підсмуг у порядку SUBBANDS.
+        :raises ValueError: Якщо підсмуг немає або назва невідома.
+        """
+        if isinstance(subbands, str):
+            subbands = subbands.replace(" ", "").split(",")
+        chosen = {name.upper() for name in subbands}
+        if not chosen or not chosen <= set(Layout.SUBBANDS):
+            raise ValueError(f"Підсмуги мають бути з {', '.join(Layout.SUBBANDS)}, отримано: {sorted(chosen)}")
+        return tuple(name for name in Layout.SUBBANDS if name in chosen)
+
+    @staticmethod
+    def make(planes=None, subbands=None):
+        """
+        Створює розкладку.
+
+        :param planes: Бітові площини (див. parse_planes); None - 3 і 4.
+        :param subbands: Підсмуги (див. parse_subbands); None - лише LL.
+        :return: Словник {"planes": кортеж, "subbands": кортеж}.
+        :raises ValueError: Якщо площини чи підсмуги недопустимі або розкладка зсуває пікселі
+                            більше ніж на MAX_PIXEL_SHIFT.
+        """
+        layout = {"planes": Layout.DEFAULT["planes"] if planes is None else Layout.parse_planes(planes),
+                  "subbands": Layout.DEFAULT["subbands"] if subbands is None else Layout.parse_subbands(subbands)}
+        shift = Layout.pixel_shift(layout)
+        if shift > Layout.MAX_PIXEL_SHIFT:
+            raise ValueError(f"Розкладка {','.join(layout['subbands'])} з площинами {layout['planes']} зсуває пікселі "
+                             f"до ±{shift}, допустимо ±{Layout.MAX_PIXEL_SHIFT}: обмеження 0..255 зруйнує дані. "
+                             f"Візьміть молодші площини або менше підсмуг.")
+        return layout
+
+    @staticmethod
+    def pixel_shift(layout):
+        """
+        Оцінює найбільший зсув пікселя блоку під час вбудовування.
+
+        Кожен коефіцієнт зміщується не більше ніж на 2 ** старша площина (див. embed), а піксель
+        змінюється на половину суми змін усіх підсмуг блоку (див. Haar.apply_block_delta).
+
+        :param layout: Розкладка (див. make).
+        :return: Зсув пікселя в рівнях яскравості (8 для розкладки за замовчуванням).
+        """
+        return len(layout["subbands"]) << layout["planes"][0] >> 1
+
+    @staticmethod
+    def per_channel(layout):
+        """
+        Приводить розкладку до окремої розкладки для кожного каналу.
+
+        :param layout: None, словник з planes/subbands (для всіх каналів) або список із трьох (R, G, B).
+        :return: Список із трьох розкладок (див. make).
+        """
+        if layout is None or isinstance(layout, dict):
+            layout = [layout] * 3
+        elif len(layout) != 3:
+            raise ValueError("Розкладка задається для всіх каналів разом або окремо для R, G, B.")
+        return [Layout.make(**(item or {})) for item in layout]
+
+    @staticmethod
+    def is_default(layout):
+        """ :return: True, якщо розкладка - біти 3-4 LL (формат версії 2). """
+        return layout == Layout.DEFAULT
+
+    @staticmethod
+    def bits_per_block(layout):
+        """ :return: Кількість бітів даних в одному блоці 2x2. """
+        return len(layout["planes"]) * len(layout["subbands"])
+
+    @staticmethod
+    def to_masks(layout):
+        """
+        :param layout: Розкладка (див. make).
+        :return: Кортеж (маска площин, маска підсмуг) для заголовка версії 3.
+        """
+        return (sum(1 << plane for plane in layout["planes"]),
+                sum(1 << Layout.SUBBANDS.index(name) for name in layout["subbands"]))
+
+    @staticmethod
+    def from_masks(plane_mask, subband_mask):
+        """
+        :param plane_mask: Маска площин із заголовка.
+        :param subband_mask: Маска підсмуг із заголовка.
+        :return: Розкладка або None, якщо маски недопустимі.
+        """
+        if not plane_mask or plane_mask & 1 or not subband_mask or subband_mask >> len(Layout.SUBBANDS):
+            return None
+        try:
+            return Layout.make([plane for plane in Layout.PLANES if plane_mask >> plane & 1],
+                               [name for index, name in enumerate(Layout.SUBBANDS) if subband_mask >> index & 1])
+        except ValueError:  # Таку розкладку кодер не записує
+            return None
+
+    @staticmethod
+    def allocate(length, capacities):
+        """
+        Ділить повідомлення між каналами пропорційно їхній місткості.
+
+        :param length: Довжина повідомлення в байтах.
+        :param capacities: Місткість кожного каналу в байтах.
+        :return: Список довжин частин (у сумі length, кожна не більша за місткість свого каналу).
+        :raises ValueError: Якщо повідомлення не вміщується.
+        """
+        total = sum(capacities)
+        if length > total:
+            raise ValueError(f"Повідомлення не вміщується в зображення: потрібно {length} байтів, доступно {total}.")
+        if not length:
+            return [0] * len(capacities)
+        sizes = [length * capacity // total for capacity in capacities]
+        # Залишок (менший за кількість каналів) - каналам з найбільшою дробовою частиною: у них є місце
+        order = sorted(range(len(capacities)), key=lambda index: -(length * capacities[index] % total))
+        for index in order[:length - sum(sizes)]:
+            sizes[index] += 1
+        return sizes
+
+    @staticmethod
+    def embed(sums, bits, layout):
+        """
+        Записує біти в суми блоків і перетворює їх на зміну коефіцієнтів (на місці).
+
+        Для кожного коефіцієнта береться найближче до поточного w значення з потрібними бітами
+        (варіанти відрізняються на 2 ** (старша площина + 1)) у межах LIMITS, тож коефіцієнт
+        зміщується не більше ніж на половину цього кроку. Зміна завжди парна: пікселі
+        змінюються на цілі значення, а решта підсмуг блоку - ні (див. Haar.apply_block_delta).
+
+        :param sums: Масив int16 (4, рядки, стовпці) з Haar.block_sums; стає зміною коефіцієнтів.
+        :param bits: Масив бітів (0/1) для перших блоків у row-major порядку, по bits_per_block на блок.
+        :param layout: Розкладка (див. make).
+        :return: sums із зміною коефіцієнтів (нулі в невибраних підсмугах і після останнього блоку).
+        """
+        planes, subbands = layout["planes"], layout["subbands"]
+        flat = sums.reshape(4, -1)
+        per_block = Layout.bits_per_block(layout)
+        count = -(-len(bits) // per_block)
+        if count > flat.shape[1]:
+            raise ValueError(f"Бітів ({len(bits)}) більше, ніж вміщують {flat.shape[1]} блоків.")
+        if len(bits) < count * per_block:
+            bits = np.concatenate([bits, np.zeros(count * per_block - len(bits), dtype=np.uint8)])
+        bits = bits.reshape(count, len(subbands), len(planes))
+
+        mask, step = sum(1 << plane for plane in planes), 1 << (planes[0] + 1)
+        for index, name in enumerate(Layout.SUBBANDS):
+            coefficients = flat[index]
+            if name not in subbands:
+                coefficients[:] = 0
+                continue
+            position = subbands.index(name)
+            whole = coefficients[:count] + Layout.BIAS
+            whole >>= 1
+            target = whole & ~mask
+            for plane_index, plane in enumerate(planes):
+                target |= bits[:, position, plane_index].astype(np.int16) << plane
+            # Найближчий варіант, а потім - у межах досяжних значень
+            target[target - whole > step // 2] -= step
+            target[whole - target > step // 2] += step
+            low, high = Layout.LIMITS[name]
+            target[target < low] += step
+            target[target > high] -= step
+            np.subtract(target, whole, out=coefficients[:count])
+            coefficients[count:] = 0
+        return sums
+
+    @staticmethod
+    def extract(sums, layout, count):
+        """
+        Читає біти з сум блоків (див. embed).
+
+        :param sums: Масив int16 (4, рядки, стовпці) з Haar.block_sums.
+        :param layout: Розкладка (див. make).
+        :param count: Кількість перших блоків (row-major).
+        :return: Масив бітів np.uint8 довжиною count * bits_per_block.
+        """
+        planes, subbands = layout["planes"], layout["subbands"]
+        flat = sums.reshape(4, -1)
+        bits = np.empty((count, len(subbands), len(planes)), dtype=np.uint8)
+        for position, name in enumerate(subbands):
+            whole = flat[Layout.SUBBANDS.index(name), :count] + Layout.BIAS
+            whole >>= 1
+            for plane_index, plane in enumerate(planes):
+                bits[:, position, plane_index] = (whole >> plane) & 1
+        return bits.reshape(-1)
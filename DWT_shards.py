@@ -0,0 +1,282 @@
+import argparse  # Розбір аргументів командного рядка
+import os  # Робота з шляхами та випадковий ідентифікатор набору
+import struct  # Пакування заголовка шарда
+import sys  # Потоки stdout/stderr
+from multiprocessing import Pool  # Паралельне вбудовування та декодування шардів
+
+import numpy as np  # Розмір .npy без читання пікселів
+from PIL import Image  # Розмір зображення з заголовка файлу, без декодування пікселів
+
+from DWT import DWT
+from DWT_cli import add_layout_arguments, layout_option, nsym_value
+
+
+class Shards:
+    """
+    Розподіл одного великого повідомлення між кількома зображеннями-носіями.
+
+    Повідомлення стискається один раз (DWT.pack_message), ділиться на шматки за
+    місткістю кожного носія, і кожен шматок вбудовується як двійкове повідомлення
+    з заголовком шарда: ідентифікатор набору, номер шарда, кількість шардів і
+    загальна довжина. Декодер приймає стеганозображення в будь-якому порядку.
+    """
+
+    SHARD_MAGIC = b'DS'
+    SHARD_VERSION = 1
+    # сигнатура, версія, прапорці повідомлення (DWT.FLAG_*), ідентифікатор набору, номер шарда, кількість шардів,
+    # загальна довжина повідомлення
+    SHARD_HEADER = struct.Struct('>2sBB8sHHQ')
+
+    @staticmethod
+    def pack_header(flags, set_id, index, count, length):
+        """
+        Пакує заголовок шарда.
+
+        :param flags: Прапорці повідомлення (DWT.FLAG_*).
+        :param set_id: Ідентифікатор набору (8 байтів).
+        :param index: Номер шарда.
+        :param count: Кількість шардів.
+        :param length: Загальна довжина (стисненого) повідомлення.
+        :return: Байти заголовка.
+        """
+        return Shards.SHARD_HEADER.pack(Shards.SHARD_MAGIC, Shards.SHARD_VERSION, flags, set_id, index, count, length)
+
+    @staticmethod
+    def read_header(data):
+        """
+        Читає заголовок шарда з початку декодованого повідомлення.
+
+        :param data: Декодоване повідомлення (bytes) або None.
+        :return: Словник (flags, set_id, index, count, length) або None, якщо це не шард.
+        """
+        if not isinstance(data, bytes) or len(data) < Shards.SHARD_HEADER.size:
+            return None
+        magic, version, flags, set_id, index, count, length = Shards.SHARD_HEADER.unpack_from(data)
+        if magic != Shards.SHARD_MAGIC or version != Shards.SHARD_VERSION:
+            return None
+        return {"flags": flags, "set_id": set_id, "index": index, "count": count, "length": length}
+
+    @staticmethod
+    def join(pieces, header):
+        """
+        Збирає повідомлення з тіл шардів.
+
+        :param pieces: Словник {номер шарда: байти без заголовка}.
+        :param header: Заголовок будь-якого шарда набору (див. read_header).
+        :return: Декодоване повідомлення (рядок або bytes).
+        :raises ValueError: Якщо бракує шардів або довжина не збігається.
+        """
+        missing = [index for index in range(header["count"]) if index not in pieces]
+        if missing:
+            raise ValueError(f"Бракує шардів {missing} з {header['count']}.")
+        payload = b"".join(pieces[index] for index in range(header["count"]))
+        if len(payload) != header["length"]:
+            raise ValueError(f"Довжина зібраного повідомлення {len(payload)} не збігається з {header['length']}.")
+        return DWT.unpack_message(payload, {"version": DWT.HEADER_VERSION, "flags": header["flags"]})
+
+    @staticmethod
+    def image_shape(path):
+        """
+        Читає розмір зображення з заголовка файлу, не завантажуючи пікселі.
+
+        :param path: Шлях до зображення (.npy - з заголовка масиву).
+        :return: Кортеж (висота, ширина).
+        """
+        if path.lower().endswith(".npy"):
+            return tuple(np.load(path, mmap_mode="r").shape[:2])
+        with Image.open(path) as image:
+            width, height = image.size
+        return height, width
+
+    @staticmethod
+    def carrier_capacity(path, nsym=DWT.DEFAULT_NSYM, layout=None):
+        """
+        Обчислює, скільки байтів повідомлення вміщує носій як шард.
+
+        :param path: Шлях до зображення-носія.
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param layout: Розкладка даних (див. DWT.plan); None - біти 3-4 LL.
+        :return: Місткість у байтах (без заголовка шарда).
+        """
+        return max(DWT.capacity(Shards.image_shape(path), nsym, layout) - Shards.SHARD_HEADER.size, 0)
+
+    @staticmethod
+    def plan(paths, length, nsym=DWT.DEFAULT_NSYM, layout=None):
+        """
+        Розподіляє повідомлення між носіями до початку вбудовування.
+
+        Носії заповнюються по черзі; зайві носії не використовуються.
+
+        :param paths: Шляхи до зображень-носіїв.
+        :param length: Довжина (стисненого) повідомлення в байтах.
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param layout: Розкладка даних (див. DWT.plan); щільніша розкладка - менше носіїв.
+        :return: Список кортежів (шлях, початок, кінець) для кожного шарда.
+        :raises ValueError: Якщо сумарної місткості носіїв не вистачає.
+        """
+        shards = []
+        start = 0
+        total = 0
+        for path in paths:
+            capacity = Shards.carrier_capacity(path, nsym, layout)
+            total += capacity
+            if capacity and (start < length or not shards):  # Порожнє повідомлення - один шард
+                shards.append((path, start, min(start + capacity, length)))
+                start = shards[-1][2]
+        if start < length or not shards:
+            raise ValueError(f"Повідомлення не вміщується в носії: потрібно {length} байтів, доступно {total}.")
+        return shards
+
+    @staticmethod
+    def embed_shard(task):
+        """
+        Вбудовує один шард у робочому процесі.
+
+        :param task: Кортеж (шлях носія, шлях результату (None - сам носій), байти шарда з заголовком, nsym, розкладка,
+                     дозвіл перезапису носія).
+        :return: Шлях до збереженого зображення.
+        """
+        path, output_path, shard, nsym, layout, overwrite = task
+        # Повідомлення вже стиснене цілком, шард не стискається повторно
+        return DWT.encode_message(path, shard, output_path, nsym, workers=1, compression=None, layout=layout,
+                                  overwrite=overwrite)
+
+    @staticmethod
+    def encode_sharded(paths, message, output_dir=None, nsym=DWT.DEFAULT_NSYM,
+                       compression=DWT.DEFAULT_COMPRESSION, workers=None, layout=None, overwrite=False):
+        """
+        Вбудовує повідомлення, розділене на шарди, у кілька носіїв паралельно.
+
+        :param paths: Шляхи до зображень-носіїв (використовуються по черзі).
+        :param message: Повідомлення для вбудовування (рядок або bytes).
+        :param output_dir: Каталог для стеганозображень (None - лише з overwrite=True: перезапис носіїв).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+        :param workers: Кількість процесів (None - кількість ядер).
+        :param layout: Розкладка даних у кожному носії (див. DWT.plan); None - біти 3-4 LL.
+        :param overwrite: True - дозволити перезапис носіїв (див. DWT.output_target).
+        :return: Список шляхів до стеганозображень у порядку шардів.
+        :raises ValueError: Якщо місткості не вистачає, два шарди потрапили б в один файл (однакові імена
+                            носіїв з різних каталогів) або результат перезаписав би носій без overwrite.
+        """
+        if not output_dir and not overwrite:
+            raise ValueError("Не вказано каталог для стеганозображень; щоб перезаписати носії, передайте overwrite=True.")
+        payload, flags = DWT.pack_message(message, compression)
+        shards = Shards.plan(paths, len(payload), nsym, layout)
+        set_id = os.urandom(8)  # Відрізняє шарди різних повідомлень
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        tasks, targets = [], {}
+        for index, (path, start, stop) in enumerate(shards):
+            header = Shards.pack_header(flags, set_id, index, len(shards), len(payload))
+            output_path = os.path.join(output_dir, os.path.basename(path)) if output_dir else None
+            target = os.path.realpath(output_path or path)
+            if target in targets:  # Інакше пізніший шард мовчки затер би попередній, і набір не зібрати
+                raise ValueError(f"Шарди {targets[target]} і {index} записувалися б в один файл {target}: "
+                                 f"перейменуйте носії або не повторюйте їх.")
+            targets[target] = index
+            tasks.append((path, output_path, header + payload[start:stop], nsym, layout, overwrite))
+
+        with Pool(processes=min(workers or os.cpu_count() or 1, len(tasks))) as pool:
+            return pool.map(Shards.embed_shard, tasks, chunksize=1)
+
+    @staticmethod
+    def read_shard(path):
+        """
+        Декодує шард з одного стеганозображення у робочому процесі.
+
+        :param path: Шлях до стеганозображення.
+        :return: Кортеж (шлях, байти шарда з заголовком або None, якщо шарда немає).
+        """
+        try:
+            image = DWT.read_image(path)  # Як і решта рушія: .npy та формати cv2
+        except (OSError, ValueError):
+            return path, None
+        data = DWT.decode_array(image, workers=1)
+        return path, data if Shards.read_header(data) else None
+
+    @staticmethod
+    def decode_sharded(paths, workers=None):
+        """
+        Збирає повідомлення з шардів у будь-якому порядку.
+
+        Зображення декодуються потоком у пулі процесів; у пам'яті тримаються лише
+        байти шардів. Щойно зібрано всі шарди, решта файлів не обробляється.
+
+        :param paths: Шляхи до стеганозображень (список або ітератор, порядок не важливий).
+        :param workers: Кількість процесів (None - кількість ядер).
+        :return: Декодоване повідомлення (рядок або bytes).
+        :raises ValueError: Якщо знайдено не всі шарди.
+        """
+        pieces = {}
+        expected = None  # Заголовок першого знайденого шарда
+        with Pool(processes=workers) as pool:
+            for path, data in pool.imap_unordered(Shards.read_shard, paths):
+                header = Shards.read_header(data)
+                if header is None:
+                    print(f"{path}: шард не знайдено", file=sys.stderr)
+                    continue
+                if expected is None:
+                    expected = header
+                elif any(header[key] != expected[key] for key in ("flags", "set_id", "count", "length")):
+                    print(f"{path}: шард іншого повідомлення, пропускаємо", file=sys.stderr)
+                    continue
+                pieces[header["index"]] = data[Shards.SHARD_HEADER.size:]
+                if len(pieces) == header["count"]:
+                    break  # Усі шарди зібрано - решту файлів не декодуємо
+
+        if expected is None:
+            raise ValueError("Не знайдено жодного шарда.")
+        return Shards.join(pieces, expected)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split one payload across several carrier images.")
+    parser.add_argument("mode", choices=("encode", "decode"))
+    parser.add_argument("images", nargs="+", help="Carrier images (encode) or stego images in any order (decode).")
+    parser.add_argument("-m", "--message", help="Message to embed.")
+    parser.add_argument("--message-file", help="Read the message to embed from a UTF-8 text file.")
+    parser.add_argument("--payload-file", help="Embed the raw bytes of this file.")
+    parser.add_argument("-o", "--output", help="Encode: directory for stego images. Decode: write the payload here.")
+    parser.add_argument("--in-place", action="store_true", help="Encode: overwrite the carrier images.")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--nsym", type=nsym_value, default=DWT.DEFAULT_NSYM, metavar="1-254",
+                        help="Reed-Solomon parity bytes per block.")
+    parser.add_argument("--compression", choices=("auto", "zlib", "lzma", "none"), default="auto",
+                        help="Payload compression (auto = only when it makes the payload smaller).")
+    add_layout_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.mode == "encode":
+        message = args.message
+        if args.message_file:
+            with open(args.message_file, encoding="utf-8") as message_file:
+                message = message_file.read()
+        if args.payload_file:
+            with open(args.payload_file, "rb") as payload_file:
+                message = payload_file.read()
+        if message is None:
+            parser.error("encode mode needs --message, --message-file or --payload-file")
+        if not args.output and not args.in_place:
+            parser.error("encode mode needs --output or --in-place")
+        outputs = Shards.encode_sharded(args.images, message, args.output, args.nsym,
+                                        None if args.compression == "none" else args.compression, args.workers,
+                                        layout_option(args), args.in_place)
+        for output in outputs:
+            print(output)
+        return 0
+
+    message = Shards.decode_sharded(args.images, args.workers)
+    if args.output:
+        with open(args.output, "wb") as output:
+            output.write(message if isinstance(message, bytes) else message.encode('utf-8'))
+    elif isinstance(message, bytes):
+        sys.stdout.buffer.write(message)
+    else:
+        print(message)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
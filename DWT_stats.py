@@ -0,0 +1,131 @@
+import time  # Вимірювання часу етапів
+
+
+class Stats:
+    """
+    Збирає час, кількість оброблених байтів і розмір виділених масивів для кожного етапу
+    кодування/декодування (і для кожного каналу).
+
+    Кожен запис - словник {stage, channel, seconds, bytes, allocated}. Якщо задано callback,
+    він викликається для кожного запису (наприклад, для експорту метрик у Prometheus).
+    Рушій заздалегідь повідомляє, скільки етапів каналів (смуги, див. DWT.embed_stages) виконає -
+    з цього рахується progress.
+    """
+
+    def __init__(self, callback=None):
+        """
+        :param callback: Функція callback(record), що викликається після кожного етапу.
+        """
+        self.callback = callback
+        self.records = []
+        self.expected = []  # Очікувані кількості етапів каналів (список: expect викликають потоки каналів)
+
+    def stage(self, name, channel=None):
+        """
+        Повертає контекстний менеджер, що вимірює етап.
+
+        Усередині блоку можна доповнити запис: record["bytes"] = ..., record["allocated"] = ...
+
+        :param name: Назва етапу (imread, forward_ll, embed, ...).
+        :param channel: Назва каналу ("R", "G", "B") або None для етапів усього зображення.
+        :return: Контекстний менеджер, що повертає словник запису.
+        """
+        return _Stage(self, {"stage": name, "channel": channel, "seconds": 0.0, "bytes": 0, "allocated": 0})
+
+    def expect(self, count):
+        """
+        Додає (або, з від'ємним count, уточнює) очікувану кількість етапів каналів.
+
+        :param count: Кількість записів з channel, які рушій ще створить.
+        """
+        self.expected.append(count)
+
+    def progress(self):
+        """
+        :return: Частка виконаних етапів каналів 0..1 або None, якщо рушій не повідомив їхньої кількості.
+        """
+        expected = sum(self.expected)
+        if expected <= 0:
+            return None
+        return min(sum(1 for record in self.records if record["channel"] is not None) / expected, 1.0)
+
+    def add(self, record):
+        """
+        Додає готовий запис і передає його у callback.
+
+        :param record: Словник запису.
+        """
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def summary(self):
+        """
+        Підсумовує записи за етапами (по всіх каналах).
+
+        :return: Словник {етап: {"seconds", "bytes", "allocated", "calls"}} у порядку виконання.
+        """
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record["stage"], {"seconds": 0.0, "bytes": 0, "allocated": 0, "calls": 0})
+            total["seconds"] += record["seconds"]
+            total["bytes"] += record["bytes"]
+            total["allocated"] += record["allocated"]
+            total["calls"] += 1
+        return totals
+
+    def total_seconds(self):
+        """
+        :return: Сумарний час усіх етапів у секундах.
+        """
+        return sum(record["seconds"] for record in self.records)
+
+
+class _Stage:
+    """ Контекстний менеджер одного етапу Stats. """
+
+    def __init__(self, stats, record):
+        self.stats = stats
+        self.record = record
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        self.record["seconds"] = time.perf_counter() - self.start
+        self.stats.add(self.record)
+        return False
+
+
+class _NullStage:
+    """ Порожній етап: нічого не вимірює і нічого не зберігає. """
+
+    def __init__(self):
+        self.record = {}
+
+    def __enter__(self):
+        return self.record
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullStats:
+    """
+    Вимкнена інструментація: той самий інтерфейс, що й Stats, майже без витрат.
+    """
+
+    _stage = _NullStage()
+
+    def stage(self, name, channel=None):
+        return self._stage
+
+    def expect(self, count):
+        pass
+
+    def add(self, record):
+        pass
+
+
+NULL_STATS = NullStats()
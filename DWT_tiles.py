@@ -0,0 +1,256 @@
+import os  # Робота з шляхами
+import shutil  # Потокове копіювання вхідного файлу у вихідний
+import struct  # Розбір заголовка TIFF
+
+import numpy as np  # Бібліотека для роботи з числовими масивами
+
+from DWT import DWT
+from DWT_haar import Haar
+from DWT_layout import Layout
+
+
+class Tiles:
+    """
+    Поблокова (тайлова) обробка дуже великих зображень через відображення файлу в пам'ять.
+
+    Зображення не завантажується повністю: Хаар-перетворення та вбудовування
+    виконуються по тайлах, вирівняних на блоки 2x2, і записуються лише ті тайли,
+    де лежать дані. Пікова пам'ять обмежена параметром memory_budget.
+    """
+
+    DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024  # 256 МБ робочої пам'яті
+    # Робоча пам'ять на коефіцієнт LL тайла: суми блоків uint16, що стають зміною int16 на місці (2), символи
+    # тайла (1) і робочий масив int16 Haar.apply_ll_delta (2); читання - суми (2) і символи (1)
+    BYTES_PER_COEFF = 5
+
+    TIFF_TYPES = {3: 'H', 4: 'I'}  # SHORT, LONG
+    TIFF_TAGS = {256: "width", 257: "height", 258: "bits", 259: "compression", 273: "offsets",
+                 277: "samples", 278: "rows_per_strip", 279: "byte_counts", 284: "planar"}
+
+    @staticmethod
+    def read_tiff_layout(path):
+        """
+        Читає розташування пікселів у нестисненому TIFF зі смугами (strips).
+
+        :param path: Шлях до файлу TIFF.
+        :return: Кортеж (зміщення пікселів у файлі, висота, ширина, кількість каналів).
+        """
+        with open(path, "rb") as tiff:
+            order = {b"II": "<", b"MM": ">"}.get(tiff.read(2))
+            if order is None:
+                raise ValueError("Файл не є TIFF!")
+            magic, ifd_offset = struct.unpack(order + "HI", tiff.read(6))
+            if magic != 42:
+                raise ValueError("Підтримується лише класичний TIFF (не BigTIFF).")
+
+            tiff.seek(ifd_offset)
+            (count,) = struct.unpack(order + "H", tiff.read(2))
+            tags = {}
+            for _ in range(count):
+                tag, kind, length, value = struct.unpack(order + "HHI4s", tiff.read(12))
+                if tag not in Tiles.TIFF_TAGS or kind not in Tiles.TIFF_TYPES:
+                    continue
+                item = Tiles.TIFF_TYPES[kind]
+                size = struct.calcsize(item) * length
+                if size > 4:
+                    position = tiff.tell()
+                    tiff.seek(struct.unpack(order + "I", value)[0])
+                    value = tiff.read(size)
+                    tiff.seek(position)
+                tags[Tiles.TIFF_TAGS[tag]] = struct.unpack(order + item * length, value[:size])
+
+        if tags.get("compression", (1,))[0] != 1 or tags.get("planar", (1,))[0] != 1:
+            raise ValueError("Підтримується лише нестиснений TIFF з перемежованими каналами.")
+        samples = tags.get("samples", (1,))[0]
+        if samples < 3 or any(bits != 8 for bits in tags.get("bits", (8,))):
+            raise ValueError("Підтримується лише 8-бітний кольоровий TIFF.")
+
+        offsets, byte_counts = tags["offsets"], tags["byte_counts"]
+        for offset, byte_count, next_offset in zip(offsets, byte_counts, offsets[1:]):
+            if offset + byte_count != next_offset:
+                raise ValueError("Смуги TIFF не йдуть підряд - відображення у пам'ять неможливе.")
+        return offsets[0], tags["height"][0], tags["width"][0], samples
+
+    @staticmethod
+    def open_image(path, mode="r", shape=None):
+        """
+        Відображає зображення у пам'ять без повного завантаження.
+
+        Підтримуються .npy (BGR, як у cv2), сирі файли .raw/.bin (BGR, потрібен shape)
+        та нестиснений TIFF зі смугами (RGB).
+
+        :param path: Шлях до зображення.
+        :param mode: Режим np.memmap: "r" - читання, "r+" - читання та запис.
+        :param shape: Розмір сирого файлу (висота, ширина, канали).
+        :return: Кортеж (масив np.memmap, індекси каналів R, G, B).
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".npy":
+            return np.load(path, mmap_mode=mode), DWT.RGB_CHANNELS
+        if ext in (".raw", ".bin"):
+            if shape is None:
+                raise ValueError("Для сирого файлу потрібно вказати shape=(висота, ширина, канали).")
+            return np.memmap(path, dtype=np.uint8, mode=mode, shape=tuple(shape)), DWT.RGB_CHANNELS
+        if ext in (".tif", ".tiff"):
+            offset, height, width, samples = Tiles.read_tiff_layout(path)
+            image = np.memmap(path, dtype=np.uint8, mode=mode, offset=offset, shape=(height, width, samples))
+            return image, (0, 1, 2)
+        raise ValueError(f"Формат {ext} не підтримується тайловим режимом, використайте DWT.encode_message.")
+
+    @staticmethod
+    def tile_shape(ll_cols, memory_budget):
+        """
+        Обчислює розмір тайла в коефіцієнтах LL для заданого бюджету пам'яті.
+
+        :param ll_cols: Ширина LL.
+        :param memory_budget: Бюджет робочої пам'яті в байтах.
+        :return: Кортеж (рядки, стовпці) тайла в LL.
+        """
+        coeffs = max(1, memory_budget // Tiles.BYTES_PER_COEFF)
+        tile_cols = min(ll_cols, coeffs)
+        return max(1, coeffs // tile_cols), tile_cols
+
+    @staticmethod
+    def embed_channel(channel, encoded_part, memory_budget):
+        """
+        Вбудовує закодовану частину (див. DWT.encode_parts) в один канал по тайлах.
+
+        Арифметика та сама, що й у DWT.embed_part: цілі суми блоків (Haar.forward_sums),
+        DWT.embed_sums і точна Haar.apply_ll_delta - результат збігається з DWT.encode_array.
+
+        :param channel: Канал зображення (вид на np.memmap), змінюється на місці.
+        :param encoded_part: Байти частини, по 4 коефіцієнти на байт.
+        :param memory_budget: Бюджет робочої пам'яті в байтах.
+        """
+        ll_rows, ll_cols = Haar.ll_shape(channel.shape)
+        tile_rows, tile_cols = Tiles.tile_shape(ll_cols, memory_budget)
+        count = len(encoded_part) * 4
+        used_rows = -(-count // ll_cols)
+        # Символи рядками LL: символи тайла - прямокутник цього масиву
+        symbols = np.zeros((used_rows, ll_cols), dtype=np.uint8)
+        symbols.reshape(-1)[:count] = DWT.bytes_to_symbols(encoded_part)
+
+        for row in range(0, used_rows, tile_rows):
+            rows = min(tile_rows, used_rows - row)
+            # Дані закінчуються в останньому рядку: у тайлі це завжди префікс у row-major порядку
+            last_cols = count - (used_rows - 1) * ll_cols if row + rows == used_rows else ll_cols
+            for col in range(0, ll_cols, tile_cols):
+                cols = min(tile_cols, ll_cols - col)
+                tile_count = (rows - 1) * cols + min(max(last_cols - col, 0), cols)
+                if tile_count == 0:
+                    continue  # Тайл без даних не читається і не записується
+
+                # Тайли вирівняні на блоки 2x2, тож LL тайла збігається з LL усього каналу
+                tile = channel[2 * row:2 * (row + rows), 2 * col:2 * (col + cols)]
+                sums = Haar.forward_sums(tile, out=Haar.buffer("sums", Haar.ll_shape(tile.shape), np.uint16))
+                tile_symbols = symbols[row:row + rows, col:col + cols].reshape(-1)[:tile_count]
+                delta = DWT.embed_sums(sums, tile_symbols, out=sums.view(np.int16))  # Зміна LL на місці сум
+                Haar.apply_ll_delta(tile, delta)
+
+    @staticmethod
+    def read_channel_bytes(channel, start, count, memory_budget):
+        """
+        Читає байти даних каналу смугами рядків LL.
+
+        :param channel: Канал зображення (вид на np.memmap).
+        :param start: Індекс першого байта.
+        :param count: Кількість байтів.
+        :param memory_budget: Бюджет робочої пам'яті в байтах.
+        :return: Масив np.uint8.
+        """
+        ll_rows, ll_cols = Haar.ll_shape(channel.shape)
+        first, stop = start * 4, (start + count) * 4
+        band_rows = max(1, memory_budget // Tiles.BYTES_PER_COEFF // ll_cols)
+
+        symbols = []
+        for row in range(first // ll_cols, min(-(-stop // ll_cols), ll_rows), band_rows):
+            band = channel[2 * row:2 * (row + band_rows)]
+            offset = row * ll_cols
+            sums = Haar.forward_sums(band, out=Haar.buffer("sums", Haar.ll_shape(band.shape), np.uint16))
+            band_symbols = DWT.extract_symbols(sums)
+            symbols.append(band_symbols[max(first - offset, 0):max(stop - offset, 0)])
+        return DWT.symbols_to_bytes(np.concatenate(symbols)) if symbols else np.zeros(0, np.uint8)
+
+    @staticmethod
+    def encode_tiled(image_path, message, output_path=None, nsym=DWT.DEFAULT_NSYM,
+                     memory_budget=DEFAULT_MEMORY_BUDGET, shape=None, compression=DWT.DEFAULT_COMPRESSION,
+                     overwrite=False):
+        """
+        Вбудовує повідомлення у велике зображення по тайлах.
+
+        :param image_path: Шлях до зображення (.npy, .raw/.bin або нестиснений TIFF).
+        :param message: Повідомлення для вбудовування (рядок або bytes).
+        :param output_path: Куди зберегти результат (None - лише з overwrite=True: змінити вхідний файл на місці).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param memory_budget: Бюджет робочої пам'яті в байтах.
+        :param shape: Розмір сирого файлу (висота, ширина, канали).
+        :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+        :param overwrite: True - дозволити зміну вхідного файлу (див. DWT.output_target).
+        :return: Шлях до збереженого зображення.
+        """
+        output_path = DWT.output_target(image_path, output_path, overwrite)
+        if os.path.realpath(output_path) != os.path.realpath(image_path):
+            shutil.copyfile(image_path, output_path)  # Потокове копіювання, без завантаження в пам'ять
+
+        image, channels = Tiles.open_image(output_path, "r+", shape)
+        ll_rows, ll_cols = Haar.ll_shape(image.shape)
+        encoded_parts = DWT.encode_parts(message, nsym, ll_rows * ll_cols, compression)
+        for part, index in zip(encoded_parts, channels):
+            Tiles.embed_channel(image[:, :, index], part, memory_budget)
+        image.flush()
+        return output_path
+
+    @staticmethod
+    def update_tiled(image_path, message, nsym=DWT.DEFAULT_NSYM, shape=None, compression=DWT.DEFAULT_COMPRESSION):
+        """
+        Замінює повідомлення у великому зображенні на місці (див. DWT.update_channel).
+
+        Читаються лише рядки, які займає нове повідомлення, а у файл потрапляють лише
+        змінені блоки 2x2 - обсяг запису залежить від розміру зміни, а не зображення.
+
+        :param image_path: Шлях до зображення (.npy, .raw/.bin або нестиснений TIFF).
+        :param message: Нове повідомлення (рядок або bytes).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param shape: Розмір сирого файлу (висота, ширина, канали).
+        :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+        :return: Кількість змінених блоків 2x2 (сумарно по каналах).
+        """
+        image, channels = Tiles.open_image(image_path, "r+", shape)
+        ll_rows, ll_cols = Haar.ll_shape(image.shape)
+        encoded_parts = DWT.encode_parts(message, nsym, ll_rows * ll_cols, compression)
+        changed = sum(DWT.update_channel(image[:, :, index], part) for part, index in zip(encoded_parts, channels))
+        if changed:
+            image.flush()
+        return changed
+
+    @staticmethod
+    def decode_tiled(image_path, memory_budget=DEFAULT_MEMORY_BUDGET, shape=None):
+        """
+        Декодує повідомлення з великого зображення, читаючи лише рядки із заголовком і даними.
+
+        :param image_path: Шлях до зображення (.npy, .raw/.bin або нестиснений TIFF).
+        :param memory_budget: Бюджет робочої пам'яті в байтах.
+        :param shape: Розмір сирого файлу (висота, ширина, канали).
+        :return: Декодоване повідомлення (рядок або bytes).
+        """
+        image, channels = Tiles.open_image(image_path, "r", shape)
+        parts = []
+        for index in channels:
+            channel = image[:, :, index]
+            ll_rows, ll_cols = Haar.ll_shape(channel.shape)
+            header_size = max(header_format.size for header_format in DWT.HEADER_FORMATS.values())
+            header = DWT.read_header(Haar.forward_ll(channel, rows=-(-header_size * 4 // ll_cols)))
+            if header is None:
+                # Старий формат зі стоп-байтом потребує всієї підсмуги LL
+                parts.append(DWT.decode_channel(channel))
+                continue
+            if header["length"] == 0:
+                parts.append((b"", header))
+                continue
+            encoded_length = DWT.rs_encoded_length(header["length"], header["nsym"])
+            if Layout.is_default(header["layout"]):
+                data = Tiles.read_channel_bytes(channel, header["size"], encoded_length, memory_budget)
+            else:
+                data = DWT.read_layout_bytes(channel, header["layout"], encoded_length)  # Смугами рядків блоків
+            parts.append((DWT.decode_payload(data, header["nsym"]), header))
+        return DWT.join_parts(parts)
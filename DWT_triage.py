@@ -0,0 +1,204 @@
+import argparse  # Розбір аргументів командного рядка
+import json  # Потоковий вивід результатів у форматі JSONL
+import struct  # Фрагменти PNG
+import sys  # Потоки stdout/stderr
+import time  # Вимірювання часу
+import zlib  # Часткове розпакування IDAT (лише верхні рядки PNG)
+
+import cv2  # Бібліотека для роботи з зображеннями
+import numpy as np  # Бібліотека для роботи з числовими масивами
+
+from DWT import DWT
+from DWT_haar import Haar
+from DWT_layout import Layout
+
+
+class Triage:
+    """
+    Швидка перевірка "чи є повідомлення?" без повного декодування.
+
+    Читаються лише верхні рядки зображення (для PNG - без розпакування решти файлу),
+    обчислюються перші рядки LL кожного каналу і перевіряється заголовок DWT.
+    Старі зображення зі стоп-байтом заголовка не мають і таким способом не виявляються.
+    """
+
+    PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}  # Каналів у пікселі за типом кольору PNG
+    READ_CHUNK = 1 << 16  # Байтів IDAT, що читаються з диска за раз
+
+    @staticmethod
+    def header_rows(width):
+        """
+        Обчислює, скільки рядків пікселів потрібно для заголовка.
+
+        :param width: Ширина зображення.
+        :return: Кількість рядків пікселів.
+        """
+        header_size = max(header_format.size for header_format in DWT.HEADER_FORMATS.values())
+        ll_cols = (width + 1) // 2
+        return 2 * -(-header_size * 4 // ll_cols)
+
+    @staticmethod
+    def read_top_rows(path):
+        """
+        Читає верхні рядки зображення, потрібні для заголовка.
+
+        Для PNG без черезрядкової розгортки розпаковуються лише ці рядки (див. read_png_rows), .npy
+        відображається у пам'ять; інші формати читаються повністю через cv2.
+
+        :param path: Шлях до зображення.
+        :return: Зображення BGR (uint8) з верхніми рядками.
+        """
+        if path.lower().endswith(".npy"):
+            image = np.load(path, mmap_mode="r")  # З диска читаються лише верхні рядки
+            return np.ascontiguousarray(image[:Triage.header_rows(image.shape[1])])
+        image = Triage.read_png_rows(path)
+        if image is not None:
+            return image
+
+        full = cv2.imread(path)
+        if full is None:
+            raise ValueError(f"Не вдалося прочитати зображення: {path}")
+        return full[:Triage.header_rows(full.shape[1])]
+
+    @staticmethod
+    def png_chunk(kind, data):
+        """ :return: Фрагмент PNG: довжина, тип, дані, CRC32. """
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    @staticmethod
+    def read_png_rows(path):
+        """
+        Читає верхні рядки PNG (див. header_rows), розпаковуючи лише початок потоку IDAT.
+
+        З розпакованих рядків і фрагментів перед IDAT (PLTE, tRNS, ...) складається менший PNG
+        із тим самим заголовком, крім висоти; його декодує cv2, тож пікселі збігаються з cv2.imread
+        повного файлу для будь-якого типу кольору й глибини.
+
+        :param path: Шлях до зображення.
+        :return: Зображення BGR (uint8) з верхніми рядками або None - не PNG, черезрядкова розгортка,
+                 орієнтація EXIF чи пошкоджений файл (тоді зображення читається повністю).
+        """
+        with open(path, "rb") as png:
+            if png.read(len(Triage.PNG_SIGNATURE)) != Triage.PNG_SIGNATURE:
+                return None
+            header, chunks, filtered, need = None, [], b"", 0
+            decompressor = zlib.decompressobj()
+            while True:
+                prefix = png.read(8)
+                if len(prefix) < 8:
+                    return None
+                length, kind = struct.unpack(">I4s", prefix)
+                if kind == b"IDAT" and header is not None:
+                    while length and len(filtered) < need:
+                        piece = png.read(min(length, Triage.READ_CHUNK))
+                        if not piece:
+                            return None
+                        length -= len(piece)
+                        filtered += decompressor.decompress(piece, need - len(filtered))
+                    if len(filtered) >= need:
+                        break  # Решта файлу не читається і не розпаковується
+                    png.seek(length + 4, 1)  # CRC
+                    continue
+                data = png.read(length)
+                png.seek(4, 1)  # CRC
+                if kind == b"IHDR" and len(data) == 13:
+                    width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", data)
+                    if interlace or color not in Triage.PNG_CHANNELS or not width or not height:
+                        return None
+                    rows = min(Triage.header_rows(width), height)
+                    need = rows * (1 + -(-width * depth * Triage.PNG_CHANNELS[color] // 8))  # Байт фільтра + рядок
+                    header = struct.pack(">II", width, rows) + data[8:]
+                elif kind in (b"IDAT", b"IEND", b"eXIf") or header is None:
+                    return None  # IDAT до IHDR, немає даних або орієнтація EXIF змінює верхні рядки
+                else:
+                    chunks.append(Triage.png_chunk(kind, data))
+
+        top = (Triage.PNG_SIGNATURE + Triage.png_chunk(b"IHDR", header) + b"".join(chunks)
+               + Triage.png_chunk(b"IDAT", zlib.compress(filtered[:need], 1)) + Triage.png_chunk(b"IEND", b""))
+        return cv2.imdecode(np.frombuffer(top, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    @staticmethod
+    def inspect_array(image):
+        """
+        Перевіряє заголовки каналів R, G, B у верхніх рядках зображення.
+
+        :param image: Зображення BGR (можна лише верхні рядки, див. header_rows).
+        :return: Словник: payload (так/ні), channels (каналів із заголовком), length (заявлена довжина
+                 повідомлення, байтів), encoded (байтів у зображенні разом з RS), version, nsym, binary, compressed;
+                 для заголовків версії 3 - ще layout (розкладки каналів R, G, B, див. DWT_layout).
+        """
+        result = {"payload": False, "channels": 0, "length": 0, "encoded": 0}
+        layouts = []
+        for index in DWT.RGB_CHANNELS:
+            header = DWT.read_header(Haar.forward_ll(image[:, :, index]))
+            layouts.append(header and header["layout"])
+            if header is None:
+                continue
+            result["channels"] += 1
+            result["length"] += header["length"]
+            result["encoded"] += header["size"] + DWT.rs_encoded_length(header["length"], header["nsym"])
+            result.update(version=header["version"], nsym=header["nsym"],
+                          binary=bool(header["flags"] & DWT.FLAG_BINARY),
+                          compressed=bool(header["flags"] & (DWT.FLAG_ZLIB | DWT.FLAG_LZMA)))
+        if any(layout is not None and not Layout.is_default(layout) for layout in layouts):
+            result["layout"] = layouts
+        result["payload"] = result["channels"] == len(DWT.RGB_CHANNELS)
+        return result
+
+    @staticmethod
+    def inspect(path):
+        """
+        Перевіряє одне зображення.
+
+        :param path: Шлях до зображення.
+        :return: Словник з результатом (див. inspect_array) і полями path, seconds, error.
+        """
+        start = time.perf_counter()
+        try:
+            result = {"path": path, **Triage.inspect_array(Triage.read_top_rows(path))}
+        except Exception as e:
+            result = {"path": path, "payload": False, "error": f"{type(e).__name__}: {e}"}
+        result["seconds"] = round(time.perf_counter() - start, 6)
+        return result
+
+    @staticmethod
+    def scan(paths, workers=None, chunksize=16):
+        """
+        Паралельно перевіряє багато зображень.
+
+        :param paths: Шляхи до зображень.
+        :param workers: Кількість процесів (None - кількість ядер).
+        :param chunksize: Кількість зображень, що передаються процесу за раз.
+        :return: Генератор результатів у порядку вхідного списку.
+        """
+        from multiprocessing import Pool  # Лише для сканування: inspect (і DWT_cli inspect) обходиться без нього
+
+        with Pool(processes=workers) as pool:
+            yield from pool.imap(Triage.inspect, paths, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quickly find images that carry a DWT payload (header check only).")
+    parser.add_argument("source", help="Directory, glob pattern or manifest (.jsonl or list of paths).")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--chunksize", type=int, default=16, help="Images sent to a worker at a time.")
+    parser.add_argument("--all", action="store_true", help="Report every image, not only candidates.")
+    args = parser.parse_args(argv)
+
+    from DWT_batch import collect_items  # Разом з DWT_cache - лише для розбору джерела
+    paths = [item["path"] for item in collect_items(args.source)]
+    found = 0
+    start = time.perf_counter()
+    for result in Triage.scan(paths, args.workers, args.chunksize):
+        found += result["payload"]
+        if result["payload"] or args.all:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    elapsed = time.perf_counter() - start
+    print(f"Перевірено: {len(paths)}, з повідомленням: {found}, "
+          f"{len(paths) / elapsed if elapsed else 0.0:.1f} зображень/с", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
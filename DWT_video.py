@@ -0,0 +1,252 @@
+import argparse  # Розбір аргументів командного рядка
+import itertools  # Обмеження кількості кадрів, що читаються
+import os  # Випадковий ідентифікатор набору, кількість ядер
+import sys  # Потоки stdout/stderr
+from collections import deque  # Черга кадрів в обробці (у порядку надходження)
+from concurrent.futures import Future, ThreadPoolExecutor  # Паралельна обробка кадрів
+
+import cv2  # Бібліотека для роботи з зображеннями та відео
+
+from DWT import DWT
+from DWT_cli import nsym_value
+from DWT_shards import Shards
+from DWT_stats import NULL_STATS
+
+
+class Video:
+    """
+    Потокове вбудовування повідомлення у кадри відео без втрат (FFV1 або PNG у MKV/AVI).
+
+    Кадри читаються по одному, повідомлення ділиться на шарди за місткістю кадру
+    (заголовок шарда - як у DWT_shards), і кожен кадр обробляється звичайним
+    вбудовуванням у LL у пулі потоків. Кадри записуються в початковому порядку,
+    а в обробці одночасно перебуває не більше queue_size кадрів, тож пам'ять не
+    залежить від довжини відео.
+    """
+
+    CODECS = {"ffv1": "FFV1", "png": "png "}  # Лише кодеки без втрат - інакше повідомлення зруйнується
+    DEFAULT_CODEC = "ffv1"
+    WORKERS = min(4, os.cpu_count() or 1)
+
+    @staticmethod
+    def open_capture(path):
+        """
+        Відкриває відео для читання.
+
+        :param path: Шлях до відео.
+        :return: cv2.VideoCapture.
+        """
+        capture = cv2.VideoCapture(path, cv2.CAP_FFMPEG)
+        if not capture.isOpened():
+            raise FileNotFoundError(f"Не вдалося відкрити відео: {path}")
+        return capture
+
+    @staticmethod
+    def frames(capture):
+        """
+        Лінивий генератор кадрів.
+
+        :param capture: cv2.VideoCapture.
+        :return: Генератор кадрів BGR (uint8).
+        """
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                return
+            yield frame
+
+    @staticmethod
+    def frame_capacity(shape, nsym=DWT.DEFAULT_NSYM):
+        """
+        Обчислює, скільки байтів повідомлення вміщує один кадр.
+
+        :param shape: Розмір кадру (висота, ширина[, канали]).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :return: Місткість у байтах (без заголовка шарда).
+        """
+        return max(DWT.capacity(shape, nsym) - Shards.SHARD_HEADER.size, 0)
+
+    @staticmethod
+    def ordered(items, queue_size):
+        """
+        Повертає результати в порядку надходження, тримаючи в обробці не більше queue_size елементів.
+
+        :param items: Ітератор Future або готових значень.
+        :param queue_size: Максимальна кількість елементів у черзі.
+        :return: Генератор результатів.
+        """
+        pending = deque()
+        for item in items:
+            pending.append(item)
+            if len(pending) >= queue_size:
+                head = pending.popleft()
+                yield head.result() if isinstance(head, Future) else head
+        while pending:
+            head = pending.popleft()
+            yield head.result() if isinstance(head, Future) else head
+
+    @staticmethod
+    def encode_video(video_path, message, output_path, nsym=DWT.DEFAULT_NSYM, compression=DWT.DEFAULT_COMPRESSION,
+                     codec=DEFAULT_CODEC, workers=None, queue_size=None):
+        """
+        Вбудовує повідомлення у відео, записуючи результат без втрат.
+
+        Кадри після кінця повідомлення копіюються без змін.
+
+        :param video_path: Шлях до вхідного відео.
+        :param message: Повідомлення для вбудовування (рядок або bytes).
+        :param output_path: Шлях до вихідного відео (.mkv або .avi).
+        :param nsym: Кількість перевірочних байтів Reed-Solomon.
+        :param compression: Стиснення повідомлення: "auto", "zlib", "lzma" або None.
+        :param codec: Кодек без втрат: "ffv1" або "png".
+        :param workers: Кількість потоків (None - Video.WORKERS).
+        :param queue_size: Кадрів в обробці одночасно (None - 2 * workers).
+        :return: Кількість кадрів, що несуть повідомлення.
+        :raises ValueError: Якщо кодек не без втрат, результат збігається з вхідним відео
+                            або повідомлення не вміщується.
+        """
+        output_path = DWT.output_target(video_path, output_path)  # Перезапис неможливий: відео читається під час запису
+        if codec not in Video.CODECS:
+            raise ValueError(f"Кодек {codec} не підтримується: потрібен кодек без втрат ({', '.join(Video.CODECS)}).")
+        workers = workers or Video.WORKERS
+        queue_size = queue_size or 2 * workers
+
+        capture = Video.open_capture(video_path)
+        frames = Video.frames(capture)
+        first = next(frames, None)
+        if first is None:
+            capture.release()
+            raise ValueError("Відео не містить кадрів.")
+
+        payload, flags = DWT.pack_message(message, compression)
+        chunk = Video.frame_capacity(first.shape, nsym)
+        count = max(1, -(-len(payload) // chunk)) if chunk else 0
+        available = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if not chunk or 0 < available < count:
+            capture.release()
+            raise ValueError(f"Повідомлення не вміщується у відео: потрібно {count} кадрів, доступно {available}.")
+
+        set_id = os.urandom(8)
+        height, width = first.shape[:2]
+        writer = cv2.VideoWriter(output_path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*Video.CODECS[codec]),
+                                 capture.get(cv2.CAP_PROP_FPS) or 25.0, (width, height))
+        if not writer.isOpened():
+            capture.release()
+            raise ValueError(f"Не вдалося створити відео: {output_path}")
+
+        def jobs(executor):
+            for index, frame in enumerate(Video.frames_with_first(first, frames)):
+                if index >= count:
+                    yield frame  # Кадр без даних - лише копіюється
+                    continue
+                shard = Shards.pack_header(flags, set_id, index, count, len(payload)) + \
+                    payload[index * chunk:(index + 1) * chunk]
+                yield executor.submit(DWT.encode_array, frame, shard, nsym, False, NULL_STATS, 1, None)
+
+        written = 0
+        try:
+            with ThreadPoolExecutor(workers, "dwt-frame") as executor:
+                for frame in Video.ordered(jobs(executor), queue_size):
+                    writer.write(frame)
+                    written += 1
+        finally:
+            writer.release()
+            capture.release()
+        if written < count:
+            raise ValueError(f"Відео закінчилося раніше: записано {written} з {count} кадрів із даними.")
+        return count
+
+    @staticmethod
+    def frames_with_first(first, frames):
+        """
+        Повертає вже прочитаний перший кадр, а за ним решту кадрів.
+
+        :param first: Перший кадр.
+        :param frames: Генератор решти кадрів.
+        :return: Генератор кадрів.
+        """
+        yield first
+        yield from frames
+
+    @staticmethod
+    def decode_video(video_path, workers=None, queue_size=None):
+        """
+        Декодує повідомлення з відео, зупиняючись, щойно зібрано всі шарди.
+
+        :param video_path: Шлях до відео.
+        :param workers: Кількість потоків (None - Video.WORKERS).
+        :param queue_size: Кадрів в обробці одночасно (None - 2 * workers).
+        :return: Декодоване повідомлення (рядок або bytes).
+        """
+        workers = workers or Video.WORKERS
+        queue_size = queue_size or 2 * workers
+        capture = Video.open_capture(video_path)
+        frames = Video.frames(capture)
+        try:
+            # Перший кадр декодується одразу: його заголовок визначає, скільки кадрів читати далі
+            first = next(frames, None)
+            data = DWT.decode_array(first, workers=1) if first is not None else None
+            expected = Shards.read_header(data)
+            if expected is None:
+                raise ValueError("Відео не містить повідомлення.")
+            pieces = {expected["index"]: data[Shards.SHARD_HEADER.size:]}
+
+            with ThreadPoolExecutor(workers, "dwt-frame") as executor:
+                jobs = (executor.submit(DWT.decode_array, frame, NULL_STATS, 1)
+                        for frame in itertools.islice(frames, expected["count"] - 1))
+                for data in Video.ordered(jobs, queue_size):
+                    header = Shards.read_header(data)
+                    if header is None or header["set_id"] != expected["set_id"]:
+                        break  # Шарди йдуть у перших кадрах підряд
+                    pieces[header["index"]] = data[Shards.SHARD_HEADER.size:]
+        finally:
+            capture.release()
+        return Shards.join(pieces, expected)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Embed a payload into lossless video frames (FFV1/PNG).")
+    parser.add_argument("mode", choices=("encode", "decode"))
+    parser.add_argument("video", help="Input video.")
+    parser.add_argument("output", nargs="?", help="Encode: output video (.mkv/.avi). Decode: write the payload here.")
+    parser.add_argument("-m", "--message", help="Message to embed.")
+    parser.add_argument("--message-file", help="Read the message to embed from a UTF-8 text file.")
+    parser.add_argument("--payload-file", help="Embed the raw bytes of this file.")
+    parser.add_argument("--codec", choices=tuple(Video.CODECS), default=Video.DEFAULT_CODEC, help="Lossless codec.")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Frame worker threads.")
+    parser.add_argument("--queue-size", type=int, default=None, help="Frames in flight (default 2 x workers).")
+    parser.add_argument("--nsym", type=nsym_value, default=DWT.DEFAULT_NSYM, metavar="1-254",
+                        help="Reed-Solomon parity bytes per block.")
+    parser.add_argument("--compression", choices=("auto", "zlib", "lzma", "none"), default="auto",
+                        help="Payload compression (auto = only when it makes the payload smaller).")
+    args = parser.parse_args(argv)
+
+    if args.mode == "encode":
+        message = args.message
+        if args.message_file:
+            with open(args.message_file, encoding="utf-8") as message_file:
+                message = message_file.read()
+        if args.payload_file:
+            with open(args.payload_file, "rb") as payload_file:
+                message = payload_file.read()
+        if message is None or args.output is None:
+            parser.error("encode mode needs an output video and --message, --message-file or --payload-file")
+        count = Video.encode_video(args.video, message, args.output, args.nsym,
+                                   None if args.compression == "none" else args.compression,
+                                   args.codec, args.workers, args.queue_size)
+        print(f"Повідомлення записано в {count} кадрів: {args.output}", file=sys.stderr)
+        return 0
+
+    message = Video.decode_video(args.video, args.workers, args.queue_size)
+    if args.output:
+        with open(args.output, "wb") as output:
+            output.write(message if isinstance(message, bytes) else message.encode('utf-8'))
+    elif isinstance(message, bytes):
+        sys.stdout.buffer.write(message)
+    else:
+        print(message)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import numpy as np  # Бібліотека для роботи з числовими масивами
+
+
+class Enhance:
+    """
+    Яскравість, контраст і насиченість за один прохід NumPy.
+
+    Відтворює ланцюжок ImageEnhance.Brightness -> Contrast -> Color з PIL:
+    яскравість і контраст - це одна таблиця (LUT) на 256 значень, а насиченість -
+    змішування кожного пікселя з його яскравістю L = 0.299 R + 0.587 G + 0.114 B.
+    """
+
+    GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    CHUNK_ROWS = 512  # Рядків за раз, щоб не тримати float-копію всього зображення
+
+    @staticmethod
+    def contrast_mean(rgb, brightness):
+        """
+        Обчислює середню яскравість після зміни яскравості (опорне значення для контрасту).
+
+        Зазвичай обчислюється на зменшеній копії (проксі), щоб попередній перегляд
+        і збереження в повній роздільній здатності використовували одне значення.
+
+        :param rgb: Зображення RGB (uint8).
+        :param brightness: Коефіцієнт яскравості.
+        :return: Середнє значення L (ціле, як у PIL).
+        """
+        brightened = np.clip(rgb[..., :3].astype(np.float32) * brightness, 0, 255)
+        return int(float((brightened @ Enhance.GRAY_WEIGHTS).mean()) + 0.5)
+
+    @staticmethod
+    def lut(brightness, contrast, mean):
+        """
+        Будує таблицю для яскравості та контрасту.
+
+        :param brightness: Коефіцієнт яскравості.
+        :param contrast: Коефіцієнт контрасту.
+        :param mean: Опорне середнє значення для контрасту.
+        :return: Масив float32 з 256 значень.
+        """
+        values = np.clip(np.arange(256, dtype=np.float32) * brightness, 0, 255)
+        return np.clip(mean + (values - mean) * contrast, 0, 255)
+
+    @staticmethod
+    def apply(rgb, brightness, contrast, saturation, mean=None):
+        """
+        Застосовує яскравість, контраст і насиченість до зображення.
+
+        :param rgb: Зображення RGB або RGBA (uint8); альфа-канал не змінюється.
+        :param brightness: Коефіцієнт яскравості (1 - без змін).
+        :param contrast: Коефіцієнт контрасту (1 - без змін).
+        :param saturation: Коефіцієнт насиченості (1 - без змін).
+        :param mean: Опорне середнє для контрасту (None - обчислити з rgb).
+        :return: Нове зображення uint8 того ж розміру.
+        """
+        if mean is None:
+            mean = Enhance.contrast_mean(rgb, brightness)
+        table = Enhance.lut(brightness, contrast, mean)
+
+        result = rgb.copy()
+        for start in range(0, rgb.shape[0], Enhance.CHUNK_ROWS):
+            block = table[rgb[start:start + Enhance.CHUNK_ROWS, :, :3]]  # float32, яскравість і контраст
+            gray = (block @ Enhance.GRAY_WEIGHTS)[..., None]
+            block -= gray
+            block *= saturation
+            block += gray
+            np.clip(block, 0, 255, out=block)
+            result[start:start + Enhance.CHUNK_ROWS, :, :3] = block + 0.5  # Округлення до найближчого
+        return result
@@ -4,17 +4,60 @@ from tkinter import filedialog, Label, Frame, StringVar
 from PIL import Image, ImageTk
 from tkinter.scrolledtext import ScrolledText
 from tkinter import Scale, Frame
-from PIL import ImageEnhance
+from PIL import ImageOps
+import functools
+import os
+import queue
+import threading
 
 from DWT import DWT
+from DWT_cache import DecodeCache
+from DWT_stats import Stats
+from Enhance import Enhance
+import numpy as np
+
+
+@functools.lru_cache(maxsize=32)
+def load_thumbnail(path, mtime, size):
+    """
+    Завантажує зменшену копію зображення (результат кешується за шляхом і часом зміни файлу).
+
+    JPEG декодується одразу зі зменшенням (draft / DCT scaling), тож повне
+    зображення в пам'ять не потрапляє.
+
+    :param path: Шлях до зображення.
+    :param mtime: Час зміни файлу (частина ключа кешу).
+    :param size: Максимальний розмір (ширина, висота).
+    :return: Зображення PIL (не змінювати - воно спільне для кешу).
+    """
+    with Image.open(path) as image:
+        image.draft("RGB", size)
+        image.thumbnail(size)
+        return image
+
+
+class JobCancelled(Exception):
+    """ Завдання скасоване користувачем """
+
 
 class Window:
+
+    PREVIEW_SIZE = (300, 300)  # Розмір зменшеної копії для показу та попереднього перегляду
+    PREVIEW_DELAY_MS = 60  # Затримка (debounce) перерахунку перегляду під час руху повзунків
+
     def __init__(self, root):
         self.root = root
         self.selected_image_path = None
-        self.selected_image = None
+        self.selected_image = None  # Оригінал у повній роздільній здатності (завантажується лише за потреби)
         self.image_label = None
+        self.preview_source = None  # Зменшена копія оригіналу (проксі) для швидкого перегляду
+        self.preview_image = None  # Проксі з поточними значеннями повзунків
+        self.preview_job = None  # Відкладений перерахунок перегляду (root.after)
         self.mode = StringVar(value=None)  # Спочатку режим не вибрано
+        self.job = None  # Фоновий потік поточного завдання
+        self.job_events = queue.Queue()  # Повідомлення від фонового потоку до головного
+        self.job_cancel = threading.Event()
+        self.decode_cache = DecodeCache(max_entries=64)  # Повторне "Extract" того ж файлу без декодування
         self.setup_ui()
 
     def setup_ui(self):
@@ -141,6 +184,16 @@ class Window:
         )
         self.btn_action.pack(pady=10)
         self.btn_action.configure(width=20)
+
+        # Прогрес і скасування фонового завдання (показуються лише під час виконання)
+        self.progress = ttk.Progressbar(self.input_frame, bootstyle="info-striped", maximum=1.0, length=200)
+        self.btn_cancel = ttk.Button(
+            self.input_frame,
+            text="Cancel",
+            bootstyle="secondary-outline",
+            command=self.cancel_job
+        )
+        self.btn_cancel.configure(width=20)
         
         # Спочатку нічого не показуємо (режим буде встановлено в set_mode)
         self.hide_all_input_fields()
@@ -170,21 +223,24 @@ class Window:
         brightness_label = ttk.Label(self.modify_frame, text="Brightness", bootstyle="primary")
         brightness_label.pack(padx=10, pady=5)
 
-        self.brightness_slider = ttk.Scale(self.modify_frame, from_=0, to=2, orient="horizontal", bootstyle="info", length=200)
+        self.brightness_slider = ttk.Scale(self.modify_frame, from_=0, to=2, orient="horizontal", bootstyle="info", length=200,
+                                        command=self.schedule_preview)
         self.brightness_slider.set(1)
         self.brightness_slider.pack(padx=10, pady=10)
 
         contrast_label = ttk.Label(self.modify_frame, text="Contrast", bootstyle="primary")
         contrast_label.pack(padx=10, pady=5)
 
-        self.contrast_slider = ttk.Scale(self.modify_frame, from_=0, to=2, orient="horizontal", bootstyle="info", length=200)
+        self.contrast_slider = ttk.Scale(self.modify_frame, from_=0, to=2, orient="horizontal", bootstyle="info", length=200,
+                                        command=self.schedule_preview)
         self.contrast_slider.set(1)
         self.contrast_slider.pack(padx=10, pady=10)
 
         saturation_label = ttk.Label(self.modify_frame, text="Saturation", bootstyle="primary")
         saturation_label.pack(padx=10, pady=5)
 
-        self.saturation_slider = ttk.Scale(self.modify_frame, from_=0, to=2, orient="horizontal", bootstyle="info", length=200)
+        self.saturation_slider = ttk.Scale(self.modify_frame, from_=0, to=2, orient="horizontal", bootstyle="info", length=200,
+                                        command=self.schedule_preview)
         self.saturation_slider.set(1)
         self.saturation_slider.pack(padx=10, pady=10)
 
@@ -268,14 +324,35 @@ class Window:
             self.selected_image_path = file_path
             print(f"Зображення вибрано: {self.selected_image_path}")
 
+            self.selected_image = None
+            self.reset_preview()
+
+    def full_image(self):
+        """ Повертає оригінал у повній роздільній здатності, декодуючи його лише при першому зверненні """
+        if self.selected_image is None and self.selected_image_path:
             self.selected_image = Image.open(self.selected_image_path)
-            self.display_image()
+        return self.selected_image
+
+    def reset_preview(self, image=None):
+        """
+        Будує проксі, скидає повзунки та показує зображення.
+
+        :param image: Зображення в пам'яті, з якого зробити проксі (None - з кешу мініатюр за шляхом).
+        """
+        if image is None:
+            path = self.selected_image_path
+            self.preview_source = load_thumbnail(path, os.stat(path).st_mtime_ns, self.PREVIEW_SIZE)
+        else:
+            self.preview_source = ImageOps.contain(image, self.PREVIEW_SIZE)  # Зміна розміру зображення
+        self.preview_image = None
+        for slider in (self.brightness_slider, self.contrast_slider, self.saturation_slider):
+            slider.set(1)
+        self.display_image()
 
     def display_image(self):
         """ Відображає зображення у вікні """
-        if self.selected_image:
-            img = self.selected_image.copy()
-            img.thumbnail((300, 300))  # Зміна розміру зображення
+        if self.preview_source:
+            img = self.preview_image or self.preview_source
             img_tk = ImageTk.PhotoImage(img)
             self.image_label.config(image=img_tk)
             self.image_label.image = img_tk  # Зберігаємо посилання, щоб не видалилось
@@ -297,28 +374,52 @@ class Window:
         elif mode == "modify":
             print("Modify functionality is handled by sliders")
             
-    def apply_image_changes(self):
-        """ Застосовує зміни на зображенні на основі значень повзунків """
-        if self.selected_image:
-            # Застосовуємо яскравість, контраст і насиченість
-            enhancer_brightness = ImageEnhance.Brightness(self.selected_image)
-            enhanced_image = enhancer_brightness.enhance(self.brightness_slider.get())
+    def slider_values(self):
+        """ Повертає (яскравість, контраст, насиченість) з повзунків """
+        return self.brightness_slider.get(), self.contrast_slider.get(), self.saturation_slider.get()
+
+    def enhance(self, image, mean=None):
+        """
+        Застосовує значення повзунків до зображення PIL одним проходом NumPy (див. Enhance).
+
+        :param image: Зображення PIL.
+        :param mean: Опорне середнє для контрасту (None - обчислити з image).
+        :return: Нове зображення PIL.
+        """
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+        brightness, contrast, saturation = self.slider_values()
+        pixels = Enhance.apply(np.asarray(image), brightness, contrast, saturation, mean)
+        return Image.fromarray(pixels, image.mode)
+
+    def schedule_preview(self, _value=None):
+        """ Відкладає перерахунок перегляду, доки повзунок рухається (debounce) """
+        if self.preview_job is not None:
+            self.root.after_cancel(self.preview_job)
+        self.preview_job = self.root.after(self.PREVIEW_DELAY_MS, self.apply_image_changes)
 
-            enhancer_contrast = ImageEnhance.Contrast(enhanced_image)
-            enhanced_image = enhancer_contrast.enhance(self.contrast_slider.get())
-
-            enhancer_saturation = ImageEnhance.Color(enhanced_image)
-            enhanced_image = enhancer_saturation.enhance(self.saturation_slider.get())
-
-            # Оновлюємо зображення
-            self.selected_image = enhanced_image
+    def apply_image_changes(self):
+        """ Застосовує зміни повзунків до проксі (оригінал не змінюється) """
+        self.preview_job = None
+        if self.preview_source:
+            self.preview_image = self.enhance(self.preview_source)
             self.display_image()
-            
-            return enhanced_image  # Повертаємо модифіковане зображенняОновлюємо відображення
+            return self.preview_image
+
+    def render_full_resolution(self):
+        """
+        Застосовує значення повзунків до оригіналу в повній роздільній здатності.
+        Контраст рахується від того ж середнього, що й у перегляді.
+        """
+        if self.slider_values() == (1, 1, 1):
+            return self.full_image()
+        preview_rgb = np.asarray(self.preview_source.convert("RGB"))
+        mean = Enhance.contrast_mean(preview_rgb, self.brightness_slider.get())
+        return self.enhance(self.full_image(), mean)
 
     def save_image(self):
         """ Зберігає модифіковане зображення """
-        if not self.selected_image:
+        if not self.selected_image_path:
             print("Помилка: Немає зображення для збереження!")
             return
         
@@ -331,12 +432,15 @@ class Window:
         
         if file_path:
             try:
-                # Зберігаємо зображення у вибраному форматі
-                self.selected_image.save(file_path)
+                # Зберігаємо зображення у вибраному форматі (повна роздільна здатність рахується лише тут)
+                image = self.render_full_resolution()
+                image.save(file_path)
                 print(f"Зображення збережено у: {file_path}")
                 
                 # Оновлюємо шлях до поточного зображення
                 self.selected_image_path = file_path
+                self.selected_image = image
+                self.reset_preview(image)
             except Exception as e:
                 print(f"Помилка при збереженні: {e}")
 
@@ -346,22 +450,124 @@ class Window:
             self.show_message("Error", "Please enter text to embed")
             return
             
-        try:
-            DWT.encode_message(image_path, text)
+        # Вибір місця для збереження (вхідне зображення не перезаписується)
+        output_path = filedialog.asksaveasfilename(
+            title="Save Stego Image As",
+            defaultextension=".png",
+            filetypes=[("PNG files", "*.png"), ("BMP files", "*.bmp"), ("WebP (lossless)", "*.webp"),
+                       ("TIFF files", "*.tif;*.tiff")]
+        )
+        if not output_path:
+            return
+
+        def done(result):
+            self.selected_image_path = result
+            self.selected_image = None  # Стеганозображення декодується лише якщо знадобиться
             self.show_message("Success", "Text embedded successfully!")
-        except Exception as e:
-            self.show_message("Error", f"Failed to embed text: {str(e)}")
+
+        self.start_job(
+            lambda stats: DWT.encode_message(image_path, text, output_path, stats=stats),
+            done, "Failed to embed text"
+        )
 
     def extract_text(self, image_path):
         """ Витягування тексту з зображення """
-        try:
-            decoded_message = DWT.decode_message(image_path)
-            if decoded_message:
+        def done(decoded_message):
+            if isinstance(decoded_message, bytes) and decoded_message:
+                # Вбудовано довільні байти (файл), а не текст - пропонуємо зберегти
+                output_path = filedialog.asksaveasfilename(title="Save Extracted Data As")
+                if output_path:
+                    with open(output_path, "wb") as output:
+                        output.write(decoded_message)
+                    self.show_message("Success", f"Extracted {len(decoded_message)} bytes")
+            elif decoded_message:
                 self.show_output_field(decoded_message)
             else:
                 self.show_message("Info", "No hidden message found")
-        except Exception as e:
-            self.show_message("Error", f"Failed to extract text: {str(e)}")
+
+        self.start_job(
+            lambda stats: DWT.decode_message(image_path, stats=stats, cache=self.decode_cache),
+            done, "Failed to extract text"
+        )
+
+    def start_job(self, work, on_done, error_text):
+        """
+        Запускає важку операцію у фоновому потоці, щоб вікно не зависало.
+
+        Прогрес надходить з етапів конвеєра DWT (через callback DWT_stats.Stats): рушій заздалегідь
+        повідомляє кількість етапів каналів (по смугах, див. Stats.expect), а головний потік
+        забирає частку виконаних опитуванням через root.after.
+
+        :param work: Функція work(stats), що виконує кодування або декодування.
+        :param on_done: Викликається в головному потоці з результатом work.
+        :param error_text: Текст повідомлення про помилку.
+        """
+        if self.job is not None:
+            return  # Попереднє завдання ще виконується
+
+        self.job_cancel.clear()
+
+        def on_stage(record):
+            # Викликається у фоновому потоці після кожного етапу
+            if self.job_cancel.is_set() and record["stage"] != "imwrite":
+                raise JobCancelled()
+            progress = stats.progress()
+            if progress is not None:
+                self.job_events.put(("progress", min(progress, 0.99)))  # 1.0 - лише після imwrite і done
+
+        stats = Stats(callback=on_stage)
+
+        def run():
+            try:
+                self.job_events.put(("done", work(stats)))
+            except JobCancelled:
+                self.job_events.put(("cancelled", None))
+            except Exception as e:
+                self.job_events.put(("error", e))
+
+        self.btn_action.configure(state="disabled")
+        self.progress["value"] = 0
+        self.progress.pack(pady=5)
+        self.btn_cancel.configure(state="normal")
+        self.btn_cancel.pack(pady=5)
+
+        self.job = threading.Thread(target=run, daemon=True)
+        self.job.start()
+        self.root.after(50, self.poll_job, on_done, error_text)
+
+    def poll_job(self, on_done, error_text):
+        """ Забирає повідомлення фонового потоку (виконується в головному потоці) """
+        while True:
+            try:
+                kind, value = self.job_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.progress["value"] = value
+                continue
+
+            self.finish_job()
+            if kind == "done":
+                on_done(value)
+            elif kind == "error":
+                self.show_message("Error", f"{error_text}: {str(value)}")
+            else:
+                self.show_message("Info", "Operation cancelled")
+            return
+        self.root.after(50, self.poll_job, on_done, error_text)
+
+    def finish_job(self):
+        """ Повертає інтерфейс у стан очікування після завершення завдання """
+        self.job = None
+        self.progress.pack_forget()
+        self.btn_cancel.pack_forget()
+        self.btn_action.configure(state="normal")
+
+    def cancel_job(self):
+        """ Просить фоновий потік зупинитися після поточного етапу """
+        if self.job is not None:
+            self.job_cancel.set()
+            self.btn_cancel.configure(state="disabled")
 
     def show_message(self, title, message):
         """ Показує повідомлення у вікні """
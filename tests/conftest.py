@@ -0,0 +1,21 @@
+import os  # Шлях до модулів репозиторію
+import sys  # Модулі DWT_* лежать у корені репозиторію, а не в пакеті
+
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from DWT_bench import make_carrier  # noqa: E402
+
+
+@pytest.fixture
+def carrier():
+    """ :return: Функція size, seed -> гладке кольорове зображення BGR (див. DWT_bench.make_carrier). """
+    return make_carrier
+
+
+@pytest.fixture
+def rng():
+    """ :return: Відтворюваний генератор випадкових чисел. """
+    return np.random.default_rng(0)
@@ -0,0 +1,81 @@
+import io  # Потік JSONL-результатів
+import json  # Розбір результатів
+
+import pytest
+
+import DWT_batch
+from DWT import DWT
+
+
+@pytest.fixture
+def sources(tmp_path, carrier):
+    """ :return: Шляхи до двох зображень з однаковим ім'ям у різних каталогах і ще одного. """
+    paths = []
+    for index, name in enumerate(("a/x.png", "b/x.png", "b/y.png")):
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        DWT.write_image(str(path), carrier(64, index))
+        paths.append(str(path))
+    return paths
+
+
+def run(mode, items, **options):
+    """ :return: Кортеж (підсумок, список результатів). """
+    results = io.StringIO()
+    summary = DWT_batch.run_batch(mode, items, workers=2, results=results, **options)
+    return summary, [json.loads(line) for line in results.getvalue().splitlines()]
+
+
+def test_encode_decode_round_trip(tmp_path, sources):
+    items = [{"path": path, "message": f"message {index}"} for index, path in enumerate(sources[1:])]
+    summary, results = run("encode", items, output_dir=str(tmp_path / "out"))
+    assert summary["failed"] == 0
+    assert [result["path"] for result in results] == sources[1:]
+    decoded = run("decode", [{"path": result["output"]} for result in results])[1]
+    assert [result["message"] for result in decoded] == ["message 0", "message 1"]
+
+
+def test_colliding_outputs_refused(tmp_path, sources):
+    items = [{"path": path, "message": path} for path in sources]
+    summary, results = run("encode", items, output_dir=str(tmp_path / "out"))
+    assert summary["failed"] == 2
+    assert [result["ok"] for result in results] == [False, False, True]
+    assert "x.png" in results[0]["error"] and "output" not in results[0]
+    assert not (tmp_path / "out" / "x.png").exists()
+    assert DWT.decode_message(results[2]["output"]) == sources[2]
+
+
+def test_output_format_collision(tmp_path, sources):
+    bmp = sources[2][:-4] + ".bmp"
+    DWT.write_image(bmp, DWT.read_image(sources[2]))
+    summary = run("encode", [{"path": sources[2], "message": "a"}, {"path": bmp, "message": "b"}],
+                  output_format=".png", overwrite=True)[0]
+    assert summary["failed"] == 2
+
+
+def test_refuses_overwrite(sources):
+    summary, results = run("encode", [{"path": sources[0], "message": "x"}])
+    assert summary["failed"] == 1 and "overwrite" in results[0]["error"]
+
+
+def test_worker_cache_persists(tmp_path, sources):
+    stego = str(tmp_path / "stego.png")
+    DWT.encode_message(sources[0], "cached", stego)
+    DWT_batch.init_worker(str(tmp_path / "cache"))
+    task = ("decode", {"path": stego}, None, False, 1, DWT.DEFAULT_NSYM, None, None, None, None, False)
+    assert [DWT_batch.run_item(task)["message"] for _ in range(2)] == ["cached", "cached"]
+    assert DWT_batch.worker_cache.stats()["hits"] == 1
+    DWT_batch.init_worker()
+
+
+def test_main_resume(tmp_path, sources, capsys):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text("\n".join(json.dumps({"path": path, "message": "m"}) for path in sources[1:]),
+                        encoding="utf-8")
+    results = tmp_path / "results.jsonl"
+    arguments = ["encode", str(manifest), "-o", str(tmp_path / "out"), "-r", str(results), "-j", "1"]
+    assert DWT_batch.main(arguments) == 0
+    assert DWT_batch.main(arguments + ["--resume"]) == 0
+    assert len(results.read_text(encoding="utf-8").splitlines()) == 2
+    with pytest.raises(SystemExit):
+        DWT_batch.main(["encode", str(manifest)])  # Без -o, --output-format чи --in-place
@@ -0,0 +1,54 @@
+import os  # Файли дискового кешу
+
+from DWT import DWT
+from DWT_cache import DecodeCache
+
+
+def test_disk_cache_shared(tmp_path):
+    first = DecodeCache(directory=str(tmp_path))
+    first.put("key", "повідомлення")
+    first.put("binary", b"\x00\x01")
+    second = DecodeCache(directory=str(tmp_path))
+    assert second.get("key") == "повідомлення"
+    assert second.get("binary") == b"\x00\x01"
+    assert second.get("missing") is None
+
+
+def test_failed_decodes_not_cached(tmp_path):
+    cache = DecodeCache(directory=str(tmp_path))
+    for value in ("", b"", None):
+        cache.put("key", value)
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
+    with open(tmp_path / "old", "wb") as entry:
+        entry.write(DecodeCache.TEXT)  # Порожній запис старої версії
+    assert cache.get("old") is None
+
+
+def test_lru_eviction():
+    cache = DecodeCache(max_entries=2)
+    for key in "abc":
+        cache.put(key, key)
+    assert cache.get("a") is None and cache.get("c") == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_decode_message_uses_cache(tmp_path, carrier):
+    source, stego = str(tmp_path / "in.png"), str(tmp_path / "out.png")
+    DWT.write_image(source, carrier(128))
+    DWT.encode_message(source, "cached", stego)
+    cache = DecodeCache()
+    assert DWT.decode_message(stego, cache=cache) == "cached"
+    assert DWT.decode_message(stego, cache=cache) == "cached"
+    assert cache.stats()["hits"] == 1
+
+
+def test_clear_keeps_foreign_files(tmp_path, carrier):
+    image = str(tmp_path / "image.png")
+    DWT.write_image(image, carrier(64))
+    cache = DecodeCache(max_entries=1, directory=str(tmp_path))
+    cache.put(cache.key(image), "запис")
+    cache.put("0" * DecodeCache.KEY_LENGTH, "витісняє попередній")  # Витіснення не зачіпає image.png
+    assert sorted(os.listdir(tmp_path)) == ["0" * DecodeCache.KEY_LENGTH, "image.png"]
+    cache.clear()
+    assert os.listdir(tmp_path) == ["image.png"]
@@ -0,0 +1,103 @@
+import json  # Розбір JSONL-виводу
+import os  # Каталог модулів для підпроцесу
+import subprocess  # Холодний запуск без GUI
+import sys  # Інтерпретатор для підпроцесу
+
+import pytest
+
+import DWT_cli
+from DWT import DWT
+
+
+@pytest.fixture
+def image(tmp_path, carrier):
+    """ :return: Шлях до носія PNG 128x128. """
+    path = str(tmp_path / "carrier.png")
+    DWT.write_image(path, carrier(128))
+    return path
+
+
+def test_defaults_match_engine():
+    assert DWT_cli.DEFAULT_NSYM == DWT.DEFAULT_NSYM
+    assert set(DWT_cli.PNG_STRATEGY_CHOICES) == set(DWT.PNG_STRATEGIES)
+    assert set(DWT_cli.TIFF_COMPRESSION_CHOICES) == set(DWT.TIFF_COMPRESSIONS)
+
+
+def test_encode_decode(tmp_path, image, capsys):
+    stego = str(tmp_path / "stego.png")
+    assert DWT_cli.main(["encode", image, stego, "-m", "привіт", "--png-level", "1"]) == 0
+    assert capsys.readouterr().out.strip() == stego
+    assert DWT_cli.main(["decode", stego]) == 0
+    assert capsys.readouterr().out.strip() == "привіт"
+
+
+def test_payload_file_round_trip(tmp_path, image):
+    payload, stego, output = tmp_path / "payload.bin", str(tmp_path / "stego.png"), tmp_path / "payload.out"
+    payload.write_bytes(bytes(range(256)))
+    assert DWT_cli.main(["encode", image, stego, "--payload-file", str(payload), "--compression", "none"]) == 0
+    assert DWT_cli.main(["decode", stego, "-o", str(output)]) == 0
+    assert output.read_bytes() == payload.read_bytes()
+
+
+def test_decode_many_prints_jsonl(tmp_path, image, capsys):
+    stego = str(tmp_path / "stego.png")
+    DWT.encode_message(image, "jsonl", stego)
+    assert DWT_cli.main(["decode", stego, stego, "--cache-dir", str(tmp_path / "cache")]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [{"path": stego, "message": "jsonl"}] * 2
+
+
+def test_encode_refuses_overwrite(image, capsys):
+    with open(image, "rb") as source:
+        original = source.read()
+    assert DWT_cli.main(["encode", image, image, "-m", "x"]) == 1
+    assert "ValueError" in capsys.readouterr().err
+    with open(image, "rb") as source:
+        assert source.read() == original
+    with pytest.raises(SystemExit):
+        DWT_cli.main(["encode", image, "-m", "x"])  # Без виходу й без --in-place
+    assert DWT_cli.main(["encode", image, "--in-place", "-m", "на місці"]) == 0
+    assert DWT.decode_message(image) == "на місці"
+
+
+@pytest.mark.parametrize("value", ["0", "255", "x"])
+def test_nsym_range(image, value):
+    with pytest.raises(SystemExit):
+        DWT_cli.main(["encode", image, "out.png", "-m", "x", "--nsym", value])
+
+
+def test_update(tmp_path, image, capsys):
+    stego = str(tmp_path / "stego.png")
+    DWT.encode_message(image, "token-0001", stego)
+    assert DWT_cli.main(["update", stego, "-m", "token-0002"]) == 0
+    assert capsys.readouterr().out.strip() == stego
+    assert DWT.decode_message(stego) == "token-0002"
+
+
+def test_inspect_and_plan(tmp_path, image, capsys):
+    stego = str(tmp_path / "stego.png")
+    DWT.encode_message(image, "inspect", stego)
+    assert DWT_cli.main(["inspect", stego]) == 0
+    assert json.loads(capsys.readouterr().out)["payload"]
+    assert DWT_cli.main(["inspect", image]) == 1
+    capsys.readouterr()
+    assert DWT_cli.main(["plan", image, "--length", "10", "--planes", "2-5"]) == 0
+    assert json.loads(capsys.readouterr().out)["fits"]
+    assert DWT_cli.main(["plan", image, "--length", str(10 ** 6)]) == 1
+
+
+def test_layout_option():
+    parser = DWT_cli.build_parser()
+    args = parser.parse_args(["plan", "x.png", "--planes", "3-4/3-4/2-5", "--subbands", "LL"])
+    assert DWT_cli.layout_option(args) == [{"planes": "3-4", "subbands": "LL"}, {"planes": "3-4", "subbands": "LL"},
+                                           {"planes": "2-5", "subbands": "LL"}]
+    with pytest.raises(ValueError):
+        DWT_cli.layout_option(parser.parse_args(["plan", "x.png", "--planes", "3-4/2-5"]))
+
+
+def test_cold_start_skips_gui_imports():
+    code = "import sys, DWT_cli; DWT_cli.build_parser(); print(sorted({'cv2', 'numpy', 'tkinter', 'matplotlib'} & " \
+           "set(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(DWT_cli.__file__))).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,79 @@
+import os  # Права файлу сокета
+import stat  # Режим файлу сокета
+import threading  # Демон у фоновому потоці
+import time  # Очікування запуску демона
+
+import cv2  # Байти носія PNG
+import pytest
+
+from DWT import DWT
+from DWT_client import DaemonClient, DaemonError
+from DWT_daemon import Daemon
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """ :return: Демон на тимчасовому сокеті, запущений у фоновому потоці (зупиняється після тесту). """
+    previous = os.umask(0o022)  # Сокет не має успадкувати навіть права на читання для інших
+    instance = Daemon(str(tmp_path / "dwt.sock"), workers=2, cache_dir=str(tmp_path / "cache"))
+    thread = threading.Thread(target=instance.serve_forever, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while instance.listener is None or not os.path.exists(instance.socket_path):
+            assert time.monotonic() < deadline, "демон не запустився"
+            time.sleep(0.01)
+        yield instance
+    finally:
+        os.umask(previous)
+        instance.stop()
+        thread.join(5)
+    assert not thread.is_alive() and not os.path.exists(instance.socket_path)
+
+
+@pytest.fixture
+def carrier_png(carrier):
+    """ :return: Байти носія PNG 128x128. """
+    return cv2.imencode(".png", carrier(128))[1].tobytes()
+
+
+def test_socket_owner_only(daemon):
+    assert stat.S_IMODE(os.stat(daemon.socket_path).st_mode) == 0o600
+    current = os.umask(0o022)
+    assert current == 0o022  # umask процесу відновлено після bind()
+
+
+def test_second_daemon_refused(daemon):
+    with pytest.raises(RuntimeError):
+        Daemon(daemon.socket_path).bind()
+
+
+@pytest.mark.parametrize("shared_memory", [False, True])
+def test_encode_decode_bytes(daemon, carrier_png, shared_memory):
+    with DaemonClient(daemon.socket_path) as client:
+        assert client.ping()
+        stego = client.encode(carrier_png, "через демон", shared_memory=shared_memory)
+        assert client.decode(stego, shared_memory=shared_memory) == "через демон"
+        assert client.triage(stego, shared_memory=shared_memory)["payload"]
+        assert client.encode(carrier_png, b"\x00\xff", compression=None) != stego
+
+
+def test_paths_and_cache(tmp_path, daemon, carrier_png):
+    source, output = tmp_path / "in.png", str(tmp_path / "out.png")
+    source.write_bytes(carrier_png)
+    with DaemonClient(daemon.socket_path) as client:
+        assert client.encode(str(source), "шлях", output) == output
+        assert [client.decode(output) for _ in range(2)] == ["шлях", "шлях"]
+        assert client.stats()["cache"]["hits"] >= 1
+        with pytest.raises(DaemonError):
+            client.encode(str(source), "x", str(source))  # Без overwrite вхідне зображення не перезаписується
+    assert DWT.decode_message(output) == "шлях"
+
+
+def test_bad_request(daemon):
+    with DaemonClient(daemon.socket_path) as client:
+        with pytest.raises(DaemonError):
+            client.decode(b"not an image")
+        with pytest.raises(DaemonError):
+            client.request({"op": "unknown"})
+        assert client.ping()  # З'єднання лишається робочим після помилок
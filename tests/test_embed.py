@@ -0,0 +1,51 @@
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+
+from DWT import DWT
+
+
+@pytest.mark.parametrize("shape", [(5, 7), (64, 64), (33, 17)])
+def test_vectorized_embed_matches_scalar(rng, shape):
+    matrix = rng.uniform(-30, 500, shape)
+    matrix[0, :3] = [-0.5, -0.2, 0.0]  # Від'ємні та нульові коефіцієнти
+    for count in (1, 2, 7, matrix.size * 2 - 1, matrix.size * 2):
+        bits = "".join(rng.choice(["0", "1"], count))
+        scalar, vectorized = matrix.copy(), matrix.copy()
+        DWT.embed_bits_with_rs_scalar(scalar, bits)
+        DWT.embed_bits_with_rs(vectorized, bits)
+        np.testing.assert_array_equal(vectorized, scalar)
+
+
+def test_vectorized_embed_fortran_order(rng):
+    matrix = np.asfortranarray(rng.uniform(0, 500, (9, 9)))
+    scalar = np.ascontiguousarray(matrix)
+    DWT.embed_bits_with_rs(matrix, "0110" * 20)
+    DWT.embed_bits_with_rs_scalar(scalar, "0110" * 20)
+    np.testing.assert_array_equal(matrix, scalar)
+
+
+def test_embed_overflow_raises(rng):
+    with pytest.raises(ValueError):
+        DWT.embed_bits_with_rs(rng.uniform(0, 255, (2, 2)), "01" * 5)
+
+
+def test_extract_reads_embedded_bytes(rng):
+    data = rng.integers(0, 256, 300, dtype=np.uint8)
+    matrix = rng.uniform(0, 255, (40, 40))
+    DWT.embed_bits_with_rs(matrix, DWT.bytes_to_symbols(data.tobytes()))
+    np.testing.assert_array_equal(DWT.extract_bytes(matrix, 0, len(data)), data)
+    np.testing.assert_array_equal(DWT.extract_bytes(matrix, 10, 20), data[10:30])
+
+
+@pytest.mark.parametrize("message", ["", "a", "hello world!", "Привіт, світе! " * 40, b"\x00\xff" * 100])
+def test_encode_array_round_trip(carrier, message):
+    image = carrier(128)
+    stego = DWT.encode_array(image, message)
+    assert DWT.decode_array(stego) == message
+    assert np.abs(stego.astype(int) - image).max() <= 12  # Біти 3-4 LL: зміна LL до ±24, пікселя - до ±12
+
+
+def test_bytes_round_trip(carrier):
+    data = DWT.image_to_bytes(carrier(64))
+    stego = DWT.encode_bytes(data, b"\x01\x02payload")
+    assert DWT.decode_bytes(stego) == b"\x01\x02payload"
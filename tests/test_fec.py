@@ -0,0 +1,46 @@
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+import reedsolo  # Еталонний кодек
+
+from DWT_fec import Fec
+
+
+@pytest.mark.parametrize("nsym", [1, 2, 10, 20, 40, 254])
+@pytest.mark.parametrize("length", [1, 5, 234, 235, 236, 1000])
+def test_encode_matches_reedsolo(rng, nsym, length):
+    data = rng.integers(0, 256, length, dtype=np.uint8).tobytes()
+    encoded = Fec.encode(data, nsym)
+    assert encoded == bytes(reedsolo.RSCodec(nsym).encode(data))
+    assert Fec.decode(encoded, nsym) == data
+
+
+@pytest.mark.parametrize("nsym", [2, 10, 20])
+def test_decode_corrects_errors(rng, nsym):
+    data = rng.integers(0, 256, 600, dtype=np.uint8).tobytes()
+    damaged = bytearray(Fec.encode(data, nsym))
+    for start in range(0, len(damaged), Fec.NSIZE):  # nsym // 2 помилок у кожному блоці
+        block = min(Fec.NSIZE, len(damaged) - start)
+        for position in rng.choice(block, nsym // 2, replace=False):
+            damaged[start + position] ^= 0xFF
+    assert Fec.decode(damaged, nsym) == data
+    assert bytes(reedsolo.RSCodec(nsym).decode(damaged)[0]) == data
+
+
+def test_decode_uncorrectable_raises():
+    damaged = bytearray(Fec.encode(b"payload" * 10, 4))
+    damaged[:4] = b"\x00\x00\x00\x00" if damaged[:4] != b"\x00\x00\x00\x00" else b"\x01\x01\x01\x01"
+    with pytest.raises(reedsolo.ReedSolomonError):
+        Fec.decode(damaged, 4)
+
+
+def test_empty_data():
+    assert Fec.encode(b"", 20) == b""
+    assert Fec.decode(b"", 20) == b""
+
+
+@pytest.mark.parametrize("nsym", [0, -1, 255, 300])
+def test_nsym_out_of_range(nsym):
+    with pytest.raises(ValueError):
+        Fec.encode(b"data", nsym)
+    with pytest.raises(ValueError):
+        Fec.decode(b"data", nsym)
@@ -0,0 +1,72 @@
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+import pywt  # Еталонне повне перетворення
+
+from DWT import DWT
+from DWT_haar import Haar
+
+SHAPES = [(64, 64), (31, 47), (2, 3), (1, 1)]
+
+
+def dwt2(channel):
+    """ pywt.dwt2 з коефіцієнтами, округленими до точних кратних 0.5 (прибирає похибку 1 / sqrt(2)). """
+    ll, details = pywt.dwt2(channel.astype(np.float64), 'haar')
+    return np.round(ll * 2) / 2, tuple(np.round(detail * 2) / 2 for detail in details)
+
+
+def idwt2(coefficients, shape):
+    """ pywt.idwt2, обрізаний до shape і округлений до точних кратних 0.5. """
+    return np.round(pywt.idwt2(coefficients, 'haar')[:shape[0], :shape[1]] * 2) / 2
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_forward_ll_matches_pywt(rng, shape):
+    channel = rng.integers(0, 256, shape, dtype=np.uint8)
+    expected = dwt2(channel)[0]
+    assert Haar.ll_shape(shape) == expected.shape
+    np.testing.assert_array_equal(Haar.forward_ll(channel), expected.astype(np.float32))
+    np.testing.assert_array_equal(Haar.forward_sums(channel), expected * 2)
+    rows = max(expected.shape[0] // 2, 1)
+    np.testing.assert_array_equal(Haar.forward_ll(channel, rows=rows), expected[:rows].astype(np.float32))
+
+
+def test_forward_ll_channel_view(rng):
+    image = rng.integers(0, 256, (33, 20, 3), dtype=np.uint8)
+    for index in range(3):
+        np.testing.assert_array_equal(Haar.forward_ll(image[:, :, index]), dwt2(image[:, :, index])[0])
+
+
+@pytest.mark.parametrize("shape", [(64, 64), (31, 47)])
+def test_block_sums_match_pywt(rng, shape):
+    channel = rng.integers(0, 256, shape, dtype=np.uint8)
+    ll, (lh, hl, hh) = dwt2(channel)
+    rows, cols = shape[0] // 2, shape[1] // 2  # Лише повні блоки
+    sums = Haar.block_sums(channel)
+    for actual, expected in zip(sums, (ll, lh, hl, hh)):
+        np.testing.assert_array_equal(actual, expected[:rows, :cols] * 2)
+
+
+@pytest.mark.parametrize("shape", [(64, 64), (31, 47)])
+def test_apply_ll_delta_matches_idwt(rng, shape):
+    channel = rng.integers(0, 256, shape, dtype=np.uint8)
+    ll, details = dwt2(channel)
+    delta = rng.integers(-24, 25, ll.shape).astype(np.int16)
+    expected = idwt2((ll + delta, details), shape)
+    Haar.apply_ll_delta(channel, delta)
+    np.testing.assert_array_equal(channel, np.clip(np.floor(expected), 0, 255))
+
+
+def test_apply_block_delta_matches_idwt(rng):
+    channel = rng.integers(64, 192, (32, 48), dtype=np.uint8)  # Без обмеження 0..255
+    delta = rng.integers(-8, 9, (4, 16, 24)).astype(np.int16) * 2
+    ll, (lh, hl, hh) = dwt2(channel)
+    expected = idwt2((ll + delta[0], (lh + delta[1], hl + delta[2], hh + delta[3])), channel.shape)
+    assert Haar.apply_block_delta(channel, delta.copy()) == 0
+    np.testing.assert_array_equal(channel, expected)
+
+
+def test_ll_only_engine_readable_by_pywt(carrier):
+    message = "LL-only engine"
+    stego = DWT.encode_array(carrier(128), message)
+    matrices = [pywt.dwt2(stego[:, :, index].astype(np.float64), 'haar')[0] for index in DWT.RGB_CHANNELS]
+    assert DWT.decode_matrices(matrices) == message
@@ -0,0 +1,57 @@
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+
+from DWT import DWT
+from DWT_haar import Haar
+from DWT_layout import Layout
+
+LAYOUTS = [None, {"planes": "2-5"}, {"planes": "3-4", "subbands": "LL,LH,HL,HH"},
+           {"planes": "1-5", "subbands": "LL,HH"},
+           [None, {"planes": "3-4"}, {"planes": "2-5", "subbands": "LL,HL"}]]
+
+
+@pytest.mark.parametrize("shape", [(256, 256), (301, 257), (64, 90)])
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_full_capacity_round_trip(carrier, rng, shape, layout):
+    image = carrier(max(shape))[:shape[0], :shape[1]].copy()
+    usable = DWT.plan(image.shape, DWT.DEFAULT_NSYM, layout)["usable_bytes"]
+    message = rng.integers(0, 256, usable, dtype=np.uint8).tobytes()
+    stego = DWT.encode_array(image, message, compression=None, layout=layout)
+    assert DWT.decode_array(stego) == message
+    assert np.abs(stego.astype(int) - image).max() <= Layout.MAX_PIXEL_SHIFT
+    with pytest.raises(ValueError):
+        DWT.encode_array(image, message + b"x", compression=None, layout=layout)
+
+
+def test_denser_layout_has_more_capacity():
+    shape = (512, 512, 3)
+    assert DWT.capacity(shape) < DWT.capacity(shape, layout={"planes": "2-5"}) < \
+        DWT.capacity(shape, layout={"planes": "2-5", "subbands": "LL,HH"})
+
+
+@pytest.mark.parametrize("planes, subbands", [("2-5", "LL,LH,HL,HH"), ("1-7", "LL"), ("1-6", "LL,HH")])
+def test_clipping_layouts_refused(planes, subbands):
+    with pytest.raises(ValueError):
+        Layout.make(planes, subbands)
+    assert Layout.from_masks(*Layout.to_masks({"planes": tuple(range(int(planes[-1]), int(planes[0]) - 1, -1)),
+                                               "subbands": tuple(subbands.split(","))})) is None
+
+
+def test_masks_round_trip():
+    layout = Layout.make("2-5", "LL,HL")
+    assert Layout.from_masks(*Layout.to_masks(layout)) == layout
+
+
+def test_header_must_fit_in_ll(carrier):
+    with pytest.raises(ValueError):
+        DWT.encode_array(carrier(8), "x", layout={"planes": "2-5"})
+    with pytest.raises(ValueError):
+        DWT.encode_array(carrier(8), "x")
+
+
+def test_ll_reader_refuses_layout(carrier):
+    stego = DWT.encode_array(carrier(128), "layout", layout={"planes": "2-5"})
+    matrices = [Haar.forward_ll(stego[:, :, index]) for index in DWT.RGB_CHANNELS]
+    with pytest.raises(ValueError):
+        DWT.decode_matrices(matrices)
+    assert DWT.decode_array(stego) == "layout"
@@ -0,0 +1,61 @@
+import struct  # Заголовок версії 1
+import zlib  # CRC заголовка
+
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+import reedsolo  # Старий формат кодувався reedsolo напряму
+
+from DWT import DWT
+from DWT_fec import Fec
+
+
+def embed_parts(image, parts):
+    """ Вбудовує готові байти частин у біти 3-4 LL каналів R, G, B. """
+    for part, index in zip(parts, DWT.RGB_CHANNELS):
+        DWT.embed_part(image[:, :, index], part)
+    return image
+
+
+def test_stop_byte_image(carrier):
+    # Старий кодер: повідомлення зі стоп-байтом ділилося на три частини, кожна - ще й зі стоп-байтом
+    message = "hello"
+    chunks = [b"he", b"ll", b"o"]
+    rs = reedsolo.RSCodec(DWT.DEFAULT_NSYM)
+    image = embed_parts(carrier(128), [bytes(rs.encode(chunk + b"\x00")) for chunk in chunks])
+    assert DWT.decode_array(image) == message
+
+
+def test_stop_byte_matrix(rng):
+    matrix = rng.uniform(0, 255, (64, 64))
+    encoded = bytes(reedsolo.RSCodec(DWT.DEFAULT_NSYM).encode(b"legacy text\x00"))
+    DWT.embed_bits_with_rs(matrix, DWT.bytes_to_symbols(encoded))
+    assert DWT.read_header(matrix) is None
+    assert DWT.decode_message_with_rs(matrix) == "legacy text"
+
+
+@pytest.mark.parametrize("nsym", [10, 20])
+def test_version_1_header(carrier, nsym):
+    message = "caf\xe9 latin-1"
+    payload = message.encode("latin-1")
+    parts = [payload[:5], payload[5:10], payload[10:]]
+    encoded = []
+    for part in parts:
+        body = DWT.HEADER_FORMATS[1].pack(DWT.HEADER_MAGIC, 1, nsym, len(part), 0)[:-2]
+        encoded.append(body + struct.pack(">H", zlib.crc32(body) & 0xFFFF) + Fec.encode(part, nsym))
+    image = embed_parts(carrier(128), encoded)
+    assert DWT.decode_array(image) == message
+
+
+def test_header_with_bad_crc_is_ignored(rng):
+    header = bytearray(DWT.pack_header(10, 20))
+    header[-1] ^= 0xFF
+    matrix = rng.uniform(0, 255, (16, 16))
+    DWT.embed_bits_with_rs(matrix, DWT.bytes_to_symbols(bytes(header)))
+    assert DWT.read_header(matrix) is None
+
+
+def test_current_header_round_trip(rng):
+    matrix = rng.uniform(0, 255, (16, 16))
+    DWT.embed_bits_with_rs(matrix, DWT.bytes_to_symbols(DWT.pack_header(123, 7, DWT.FLAG_BINARY)))
+    header = DWT.read_header(matrix)
+    assert (header["version"], header["nsym"], header["flags"], header["length"]) == (2, 7, DWT.FLAG_BINARY, 123)
@@ -0,0 +1,63 @@
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+import reedsolo  # Старий формат зі стоп-байтом
+
+from DWT import DWT
+from DWT_stats import NULL_STATS, Stats
+
+
+def channel_records(stats):
+    return sum(1 for record in stats.records if record["channel"] is not None)
+
+
+@pytest.mark.parametrize("layout", [None, {"planes": "2-5", "subbands": "LL,HH"}])
+@pytest.mark.parametrize("length", [0, 10, 30000])
+def test_encode_expects_every_band(carrier, rng, layout, length):
+    image = carrier(512)
+    message = rng.integers(0, 256, length, dtype=np.uint8).tobytes()
+    stats = Stats()
+    DWT.encode_array(image, message, compression=None, stats=stats, layout=layout)
+    assert sum(stats.expected) == channel_records(stats)
+    assert stats.progress() == 1.0
+
+
+def test_large_payload_spans_several_bands(carrier, rng):
+    message = rng.integers(0, 256, DWT.capacity((1200, 1200)), dtype=np.uint8).tobytes()
+    stats = Stats()
+    DWT.encode_array(carrier(1200), message, compression=None, stats=stats)
+    assert sum(record["stage"] == "embed" for record in stats.records) > 3  # Більше ніж смуга на канал
+    assert sum(stats.expected) == channel_records(stats)
+
+
+@pytest.mark.parametrize("layout", [None, {"planes": "2-5"}])
+def test_update_expects_stages(carrier, layout):
+    stego = DWT.encode_array(carrier(256), "token-0001", layout=layout)
+    for message in ("token-0002", "token-0002"):  # Друге оновлення нічого не змінює (без етапу patch)
+        stats = Stats()
+        DWT.update_array(stego, message, stats=stats, layout=layout)
+        assert sum(stats.expected) == channel_records(stats)
+
+
+@pytest.mark.parametrize("message, layout", [("hello", None), ("", None), ("layout", {"planes": "2-5"})])
+def test_decode_expects_stages(carrier, message, layout):
+    stego = DWT.encode_array(carrier(128), message, layout=layout)
+    stats = Stats()
+    assert DWT.decode_array(stego, stats=stats) == message
+    assert sum(stats.expected) == channel_records(stats)
+    assert stats.progress() == 1.0
+
+
+def test_decode_legacy_expects_stages(carrier):
+    image = carrier(128)
+    encoded = bytes(reedsolo.RSCodec(DWT.DEFAULT_NSYM).encode(b"x\x00"))
+    for index in DWT.RGB_CHANNELS:
+        DWT.embed_part(image[:, :, index], encoded)
+    stats = Stats()
+    DWT.decode_array(image, stats=stats)
+    assert sum(stats.expected) == channel_records(stats)
+
+
+def test_progress_unknown_without_expectations():
+    stats = Stats()
+    assert stats.progress() is None
+    NULL_STATS.expect(5)  # Вимкнена інструментація приймає той самий виклик
@@ -0,0 +1,69 @@
+import os  # Шляхи до носіїв
+
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+
+from DWT import DWT
+from DWT_shards import Shards
+
+
+@pytest.fixture
+def carriers(tmp_path, carrier):
+    """ :return: Шляхи до трьох носіїв 128x128 у каталозі in. """
+    directory = tmp_path / "in"
+    directory.mkdir()
+    paths = []
+    for seed in range(3):
+        path = str(directory / f"carrier{seed}.png")
+        DWT.write_image(path, carrier(128, seed))
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def payload(rng):
+    return rng.integers(0, 256, 4000, dtype=np.uint8).tobytes()  # Не стискається і не вміщується в один носій
+
+
+def test_round_trip_any_order(tmp_path, carriers, payload):
+    outputs = Shards.encode_sharded(carriers, payload, str(tmp_path / "out"), workers=2)
+    assert len(outputs) > 1
+    assert Shards.decode_sharded(outputs[::-1], workers=2) == payload
+
+
+def test_text_round_trip_npy(tmp_path, carrier):
+    paths = []
+    for seed in range(2):
+        path = str(tmp_path / f"carrier{seed}.npy")
+        np.save(path, carrier(128, seed))
+        paths.append(path)
+    message = "Привіт " * 50
+    outputs = Shards.encode_sharded(paths, message, str(tmp_path / "out"), workers=1)
+    assert all(output.endswith(".npy") for output in outputs)
+    assert Shards.decode_sharded(outputs, workers=1) == message
+
+
+def test_missing_shard(tmp_path, carriers, payload):
+    outputs = Shards.encode_sharded(carriers, payload, str(tmp_path / "out"), workers=2)
+    with pytest.raises(ValueError):
+        Shards.decode_sharded(outputs[1:], workers=2)
+
+
+def test_payload_too_large(tmp_path, carriers, rng):
+    capacity = sum(Shards.carrier_capacity(path) for path in carriers)
+    with pytest.raises(ValueError):
+        Shards.plan(carriers, capacity + 1)
+    with pytest.raises(ValueError):
+        Shards.encode_sharded(carriers, rng.integers(0, 256, capacity + 1, dtype=np.uint8).tobytes(),
+                              str(tmp_path / "out"), compression=None)
+
+
+def test_refuses_overwrite_and_collisions(tmp_path, carriers, payload):
+    with pytest.raises(ValueError):
+        Shards.encode_sharded(carriers, payload)  # Без каталогу і без overwrite
+    other = tmp_path / "other"
+    other.mkdir()
+    duplicate = str(other / os.path.basename(carriers[0]))
+    DWT.write_image(duplicate, DWT.read_image(carriers[1]))
+    with pytest.raises(ValueError):
+        Shards.encode_sharded([carriers[0], duplicate, carriers[2]], payload, str(tmp_path / "out"))
@@ -0,0 +1,45 @@
+import cv2  # Нестиснений TIFF
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+
+from DWT import DWT
+from DWT_tiles import Tiles
+
+MESSAGE = "tiled message! " * 200
+
+
+@pytest.fixture
+def image(rng):
+    return cv2.GaussianBlur(rng.integers(0, 256, (301, 257, 3), dtype=np.uint8), (15, 15), 5)
+
+
+@pytest.mark.parametrize("memory_budget", [Tiles.BYTES_PER_COEFF * 50, 128 * 50, 1 << 20])
+def test_npy_matches_encode_array(tmp_path, image, memory_budget):
+    source, output = tmp_path / "in.npy", tmp_path / "out.npy"
+    np.save(source, image)
+    Tiles.encode_tiled(str(source), MESSAGE, str(output), memory_budget=memory_budget)
+    np.testing.assert_array_equal(np.load(output), DWT.encode_array(image, MESSAGE))
+    np.testing.assert_array_equal(np.load(source), image)  # Вхідний файл не змінено
+    assert Tiles.decode_tiled(str(output), memory_budget=memory_budget) == MESSAGE
+
+
+def test_raw_in_place(tmp_path, image):
+    path = tmp_path / "image.raw"
+    image.tofile(path)
+    with pytest.raises(ValueError):
+        Tiles.encode_tiled(str(path), MESSAGE, shape=image.shape)  # Без overwrite вхідний файл не змінюється
+    Tiles.encode_tiled(str(path), MESSAGE, shape=image.shape, memory_budget=5000, overwrite=True)
+    stego = np.fromfile(path, np.uint8).reshape(image.shape)
+    np.testing.assert_array_equal(stego, DWT.encode_array(image, MESSAGE))
+    assert Tiles.decode_tiled(str(path), shape=image.shape) == MESSAGE
+
+
+def test_tiff(tmp_path, image):
+    source, output = tmp_path / "in.tif", tmp_path / "out.tif"
+    cv2.imwrite(str(source), image, [cv2.IMWRITE_TIFF_COMPRESSION, 1])
+    Tiles.encode_tiled(str(source), MESSAGE, str(output), memory_budget=10000)
+    stego = cv2.imread(str(output))
+    np.testing.assert_array_equal(stego, DWT.encode_array(image, MESSAGE))
+    assert Tiles.decode_tiled(str(output)) == MESSAGE
+    assert DWT.decode_array(stego) == MESSAGE
+
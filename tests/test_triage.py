@@ -0,0 +1,52 @@
+import cv2  # Еталонне повне декодування
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+from PIL import Image  # PNG з палітрою, відтінками сірого і прозорістю
+
+from DWT import DWT
+from DWT_triage import Triage
+
+WRITERS = {
+    "rgb": lambda path, image: cv2.imwrite(path, image),
+    "rgb_level9": lambda path, image: cv2.imwrite(path, image, [cv2.IMWRITE_PNG_COMPRESSION, 9]),
+    "rgba": lambda path, image: Image.fromarray(np.dstack([image, image[:, :, 0]])).save(path),
+    "gray": lambda path, image: Image.fromarray(image[:, :, 1]).save(path),
+    "palette": lambda path, image: Image.fromarray(image).quantize(16).save(path),
+    "rgb16": lambda path, image: cv2.imwrite(path, image.astype(np.uint16) * 257),
+}
+
+
+@pytest.mark.parametrize("kind", WRITERS)
+@pytest.mark.parametrize("shape", [(512, 512), (300, 37), (3, 8)])
+def test_png_top_rows_match_full_decode(tmp_path, rng, kind, shape):
+    path = str(tmp_path / "image.png")
+    WRITERS[kind](path, rng.integers(0, 256, (*shape, 3), dtype=np.uint8))
+    full = cv2.imread(path)
+    top = Triage.read_png_rows(path)
+    np.testing.assert_array_equal(top, full[:min(Triage.header_rows(shape[1]), shape[0])])
+
+
+def test_falls_back_for_other_formats(tmp_path, carrier):
+    path = str(tmp_path / "image.bmp")
+    cv2.imwrite(path, carrier(64))
+    assert Triage.read_png_rows(path) is None
+    np.testing.assert_array_equal(Triage.read_top_rows(path), cv2.imread(path)[:Triage.header_rows(64)])
+
+
+def test_truncated_png(tmp_path, carrier):
+    path = str(tmp_path / "image.png")
+    cv2.imwrite(path, carrier(64))
+    with open(path, "rb") as image_file:
+        data = image_file.read()
+    with open(path, "wb") as image_file:
+        image_file.write(data[:60])
+    assert Triage.read_png_rows(path) is None
+
+
+def test_inspect(tmp_path, carrier):
+    clean, stego = str(tmp_path / "clean.png"), str(tmp_path / "stego.png")
+    DWT.write_image(clean, carrier(128))
+    DWT.encode_message(clean, "hello", stego, compression=None)
+    assert Triage.inspect(clean)["payload"] is False
+    result = Triage.inspect(stego)
+    assert result["payload"] is True and result["length"] == len("hello")
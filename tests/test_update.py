@@ -0,0 +1,61 @@
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+
+from DWT import DWT
+from DWT_tiles import Tiles
+
+CHANGES = [("token-AAAA-0001", "token-AAAA-0002"), ("x" * 50, "short"), ("short", "y" * 200),
+           (b"\x00" * 30, b"\x01" * 30)]
+
+
+@pytest.mark.parametrize("shape", [(301, 257, 3), (64, 64, 3)])
+@pytest.mark.parametrize("old, new", CHANGES)
+def test_update_matches_full_encode(rng, shape, old, new):
+    image = rng.integers(0, 256, shape, dtype=np.uint8)  # Шум: обмеження 0..255 теж має збігатися
+    stego = DWT.encode_array(image, old, compression=None)
+    updated = stego.copy()
+    DWT.update_array(updated, new, compression=None)
+    np.testing.assert_array_equal(updated, DWT.encode_array(stego, new, compression=None))
+
+
+@pytest.mark.parametrize("old, new", CHANGES)
+def test_update_decodes(carrier, old, new):
+    updated = DWT.encode_array(carrier(128), old, compression=None)
+    DWT.update_array(updated, new, compression=None)
+    assert DWT.decode_array(updated) == new
+
+
+def test_update_touches_only_changed_blocks(carrier):
+    stego = DWT.encode_array(carrier(256), "token-0001", compression=None)
+    updated = stego.copy()
+    changed = DWT.update_array(updated, "token-0002", compression=None)
+    # Змінюються лише символи останнього байта повідомлення та перевірочні байти Reed-Solomon
+    assert 0 < changed <= 3 * (1 + DWT.DEFAULT_NSYM) * 4
+    assert np.count_nonzero(np.any(updated != stego, axis=2)) <= changed * 4
+    assert DWT.update_array(updated, "token-0002", compression=None) == 0
+
+
+def test_update_with_layout_matches_full_encode(carrier):
+    layout = {"planes": "2-5", "subbands": "LL,HH"}
+    stego = DWT.encode_array(carrier(256), "hello world" * 50, layout=layout)
+    updated = stego.copy()
+    DWT.update_array(updated, "hello there" * 50, layout=layout)
+    np.testing.assert_array_equal(updated, DWT.encode_array(stego, "hello there" * 50, layout=layout))
+    assert DWT.decode_array(updated) == "hello there" * 50
+
+
+def test_update_message_file(tmp_path, carrier):
+    source, output = str(tmp_path / "in.png"), str(tmp_path / "out.png")
+    DWT.write_image(source, carrier(128))
+    DWT.encode_message(source, "first", output)
+    DWT.update_message(output, "second")
+    assert DWT.decode_message(output) == "second"
+
+
+def test_update_tiled_matches_encode_array(tmp_path, carrier):
+    path = tmp_path / "image.npy"
+    stego = DWT.encode_array(carrier(256), "token-0001", compression=None)
+    np.save(path, stego)
+    assert Tiles.update_tiled(str(path), "token-0002", compression=None) > 0
+    np.testing.assert_array_equal(np.load(path), DWT.encode_array(stego, "token-0002", compression=None))
+    assert Tiles.decode_tiled(str(path)) == "token-0002"
@@ -0,0 +1,49 @@
+import cv2  # Запис тестового відео
+import numpy as np  # Бібліотека для роботи з числовими масивами
+import pytest
+
+import DWT_video
+from DWT_video import Video
+
+
+@pytest.fixture
+def video(tmp_path, carrier):
+    """ :return: Шлях до короткого відео FFV1 з п'яти різних кадрів. """
+    path = str(tmp_path / "input.mkv")
+    writer = cv2.VideoWriter(path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*Video.CODECS["ffv1"]), 25.0, (128, 96))
+    if not writer.isOpened():
+        pytest.skip("OpenCV зібрано без FFmpeg/FFV1")
+    for index in range(5):
+        writer.write(np.ascontiguousarray(carrier(128, index)[:96]))
+    writer.release()
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_round_trip_spans_frames(tmp_path, video, rng, workers):
+    message = rng.integers(0, 256, 2 * Video.frame_capacity((96, 128, 3)) + 10, dtype=np.uint8).tobytes()
+    output = str(tmp_path / "output.mkv")
+    assert Video.encode_video(video, message, output, compression=None, workers=workers) == 3
+    assert Video.decode_video(output, workers=workers) == message
+
+
+def test_message_too_long(tmp_path, video):
+    with pytest.raises(ValueError):
+        Video.encode_video(video, b"x" * (6 * Video.frame_capacity((96, 128, 3))), str(tmp_path / "output.mkv"),
+                           compression=None)
+
+
+def test_refuses_input_as_output(video):
+    with open(video, "rb") as source:
+        original = source.read()
+    with pytest.raises(ValueError):
+        Video.encode_video(video, "hello", video)
+    with open(video, "rb") as source:
+        assert source.read() == original
+
+
+def test_main(tmp_path, video, capsys):
+    output = str(tmp_path / "output.mkv")
+    assert DWT_video.main(["encode", video, output, "-m", "привіт"]) == 0
+    assert DWT_video.main(["decode", output]) == 0
+    assert capsys.readouterr().out.strip() == "привіт"